@@ -7,6 +7,11 @@ import datetime
 import jwt
 from dotenv import load_dotenv
 import os
+import sys
+
+# Token verification is shared with the AutoCreate services (backend/app/utils)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from app.utils.jwt_auth import AuthError, TokenVerifier
 
 load_dotenv()
 
@@ -16,6 +21,9 @@ CORS(app)
 # Load secret key from environment or generate one
 SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_urlsafe(32)
 
+# Verified tokens are cached until they expire
+token_verifier = TokenVerifier(SECRET_KEY)
+
 # Initialize Supabase client
 supabase: Client = create_client(
     os.environ.get('SUPABASE_URL'),
@@ -156,17 +164,11 @@ def complete_onboarding():
         
         # Verify token
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-            user_id = payload['user_id']
-        except jwt.ExpiredSignatureError:
-            return jsonify({
-                'success': False,
-                'error': 'Token has expired'
-            }), 401
-        except jwt.InvalidTokenError:
+            user_id = token_verifier.user_id(token)
+        except AuthError as e:
             return jsonify({
                 'success': False,
-                'error': 'Invalid token'
+                'error': str(e)
             }), 401
         
         data = request.get_json()
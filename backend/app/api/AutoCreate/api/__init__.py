@@ -1 +0,0 @@
-# API services package
@@ -1,17 +1,10 @@
 # audience_step.py
 from flask import Blueprint, request, jsonify
-import os
-import jwt
 import traceback
 from dotenv import load_dotenv
 
-# Try to import supabase
-try:
-    from supabase import create_client
-    SUPABASE_AVAILABLE = True
-except ImportError:
-    SUPABASE_AVAILABLE = False
-    print("⚠ Supabase not installed. Using mock client.")
+from clients import get_supabase, supabase_configured
+from unified_db import handle_campaign_save, require_user
 
 load_dotenv()
 
@@ -22,56 +15,38 @@ load_dotenv()
 audience_bp = Blueprint("audience", __name__)
 
 # --------------------------------------------------
-# JWT Config
+# Supabase setup
 # --------------------------------------------------
 
-SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-in-prod")
+# Mock Supabase (dev fallback when the shared client is not configured)
+class MockSupabase:
+    def table(self, _):
+        return self
 
-# --------------------------------------------------
-# Supabase setup
-# --------------------------------------------------
+    def select(self, *_): return self
+    def insert(self, *_): return self
+    def update(self, *_): return self
+    def eq(self, *_): return self
 
-if SUPABASE_AVAILABLE and os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY"):
-    supabase = create_client(
-        os.getenv("SUPABASE_URL"),
-        os.getenv("SUPABASE_KEY")
-    )
-else:
-    # Mock Supabase (dev fallback)
-    class MockSupabase:
-        def table(self, _):
-            return self
-
-        def select(self, *_): return self
-        def insert(self, *_): return self
-        def update(self, *_): return self
-        def eq(self, *_): return self
-
-        def execute(self):
-            return type("obj", (), {
-                "data": [{
-                    "id": 1,
-                    "demographics": ["male", "female"],
-                    "age_range_min": 25,
-                    "age_range_max": 45,
-                    "selected_interests": [{"id": "fitness"}],
-                    "target_locations": [{"name": "India"}],
-                    "campaign_status": "draft"
-                }]
-            })
-
-    supabase = MockSupabase()
+    def execute(self):
+        return type("obj", (), {
+            "data": [{
+                "id": 1,
+                "demographics": ["male", "female"],
+                "age_range_min": 25,
+                "age_range_max": 45,
+                "selected_interests": [{"id": "fitness"}],
+                "target_locations": [{"name": "India"}],
+                "campaign_status": "draft"
+            }]
+        })
+
+mock_supabase = MockSupabase()
 
-# --------------------------------------------------
-# Helpers
-# --------------------------------------------------
 
-def decode_jwt_token(token: str) -> str:
-    payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise ValueError("user_id missing in token")
-    return str(user_id)
+def supabase_client():
+    """Shared Supabase client, created on first use; the mock when not configured"""
+    return get_supabase() or mock_supabase
 
 # --------------------------------------------------
 # Rich Data for Frontend
@@ -242,16 +217,11 @@ PRESET_LOCATIONS = [
 # --------------------------------------------------
 
 @audience_bp.route("/api/audience/targeting", methods=["POST"])
-def save_audience_targeting():
+@require_user
+def save_audience_targeting(user_id):
     try:
         data = request.get_json()
 
-        token = data.get("user_id")
-        if not token:
-            return jsonify({"error": "Missing auth token"}), 401
-
-        user_id = decode_jwt_token(token)
-
         audience_data = {
             "demographics": data["demographics"],
             "age_range_min": data["age_range_min"],
@@ -262,20 +232,20 @@ def save_audience_targeting():
 
         campaign_id = data.get("campaign_id")
 
-        if campaign_id:
-            response = supabase.table("auto_create") \
-                .update(audience_data) \
-                .eq("id", int(campaign_id)) \
-                .eq("user_id", user_id) \
-                .execute()
-        else:
-            response = supabase.table("auto_create") \
-                .insert({
-                    "user_id": user_id,
-                    "campaign_status": "draft",
-                    **audience_data
-                }) \
-                .execute()
+        if not campaign_id:
+            # Update the active campaign or create it, like every other wizard step
+            # (a plain insert would clash with the one-active-campaign-per-user index)
+            result = handle_campaign_save(supabase_client(), user_id, audience_data,
+                                          defaults={"campaign_status": "draft"})
+            if not result["success"]:
+                return jsonify({"error": result["error"]}), 500
+            return jsonify({"success": True, "campaign_id": result["campaign_id"]}), 200
+
+        response = supabase_client().table("auto_create") \
+            .update(audience_data) \
+            .eq("id", int(campaign_id)) \
+            .eq("user_id", user_id) \
+            .execute()
 
         if not response.data:
             return jsonify({"error": "Database operation failed"}), 500
@@ -291,15 +261,10 @@ def save_audience_targeting():
 
 
 @audience_bp.route("/api/audience/targeting/<campaign_id>", methods=["GET"])
-def get_audience_targeting(campaign_id):
+@require_user
+def get_audience_targeting(campaign_id, user_id):
     try:
-        token = request.headers.get("Authorization", "").replace("Bearer ", "")
-        if not token:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        user_id = decode_jwt_token(token)
-
-        response = supabase.table("auto_create") \
+        response = supabase_client().table("auto_create") \
             .select("*") \
             .eq("id", int(campaign_id)) \
             .eq("user_id", user_id) \
@@ -385,7 +350,7 @@ def health():
     return jsonify({
         "status": "healthy",
         "service": "audience-targeting",
-        "supabase": bool(supabase),
+        "supabase": supabase_configured(),
         "interests_count": len(PRESET_INTERESTS),
         "locations_count": len(PRESET_LOCATIONS)
     }), 200
\ No newline at end of file
@@ -0,0 +1,122 @@
+# benchmark_imports.py - Import-time and client-construction benchmark for the AutoCreate service
+"""
+Each module is imported in a fresh interpreter, so every timing is a cold
+import. For each one the script also reports which shared clients were built
+during the import (expected: none, they are created on first use).
+
+    python benchmark_imports.py              # all blueprints + main
+    python benchmark_imports.py --repeat 5 --top 15
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MODULES = [
+    "clients",
+    "audience_step",
+    "budget_testing",
+    "campaign_goal",
+    "copy_messaging",
+    "creative_assets",
+    "main",
+]
+
+# Cold import of one module; prints seconds and the clients built meanwhile
+IMPORT_SNIPPET = """
+import json, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+from clients import registry
+print(json.dumps({{"seconds": elapsed, "clients": sorted(registry.initialized())}}))
+"""
+
+# Build the app, then ask for every client twice: each must be constructed once
+ON_DEMAND_SNIPPET = """
+import json
+from main import app
+from clients import registry
+before = sorted(registry.initialized())
+first = [id(registry.get(name)) for name in ("groq", "supabase", "runway")]
+second = [id(registry.get(name)) for name in ("groq", "supabase", "runway")]
+print(json.dumps({"before": before, "after": registry.initialized(), "same_instances": first == second}))
+"""
+
+
+def run_python(code, *flags):
+    result = subprocess.run([sys.executable, *flags, "-c", code], cwd=BASE_DIR,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    return result
+
+
+def time_import(module, repeat):
+    runs = []
+    for _ in range(repeat):
+        output = run_python(IMPORT_SNIPPET.format(module=module)).stdout.strip().splitlines()[-1]
+        runs.append(json.loads(output))
+    seconds = [r["seconds"] for r in runs]
+    return {
+        "median_ms": statistics.median(seconds) * 1000,
+        "min_ms": min(seconds) * 1000,
+        "clients": runs[-1]["clients"],
+    }
+
+
+def slowest_imports(module, top):
+    """Top `top` packages by cumulative import time (python -X importtime)"""
+    stderr = run_python(f"import {module}", "-X", "importtime").stderr
+    by_package = {}
+    for line in stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        if package != module:
+            by_package[package] = max(by_package.get(package, 0), int(cumulative_us))
+    return sorted(((us, name) for name, us in by_package.items()), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="cold imports per module (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="slowest third-party imports to list for main")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    print(f"{'module':<18}{'median':>10}{'min':>10}  clients built at import")
+    for module in args.modules:
+        try:
+            stats = time_import(module, args.repeat)
+        except RuntimeError as e:
+            print(f"{module:<18}{'failed':>10}{'':>10}  {e}")
+            continue
+        print(f"{module:<18}{stats['median_ms']:>8.0f}ms{stats['min_ms']:>8.0f}ms  {', '.join(stats['clients']) or '-'}")
+
+    if args.top:
+        try:
+            print("\nSlowest imports under main (cumulative):")
+            for us, name in slowest_imports("main", args.top):
+                print(f"  {us / 1000:>8.1f}ms  {name}")
+        except RuntimeError as e:
+            print(f"  failed: {e}")
+
+    try:
+        result = json.loads(run_python(ON_DEMAND_SNIPPET).stdout.strip().splitlines()[-1])
+        print(f"\nClients after create_app(): {', '.join(result['before']) or 'none'}")
+        for name, seconds in sorted(result["after"].items()):
+            print(f"  {name:<10} built once on demand in {seconds * 1000:.0f}ms")
+        print(f"  repeated lookups return the same instance: {result['same_instances']}")
+    except RuntimeError as e:
+        print(f"\nOn-demand check failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
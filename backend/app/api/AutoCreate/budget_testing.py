@@ -1,21 +1,14 @@
 # budget_testing.py
 from flask import Blueprint, request, jsonify
-import os
 from dotenv import load_dotenv
-import jwt
 
 from unified_db import (
-    decode_jwt_token,
+    require_user,
     handle_campaign_save,
     get_active_campaign
 )
 
-# Supabase
-try:
-    from supabase import create_client
-    SUPABASE_AVAILABLE = True
-except ImportError:
-    SUPABASE_AVAILABLE = False
+from clients import get_supabase
 
 load_dotenv()
 
@@ -25,36 +18,31 @@ budget_testing_bp = Blueprint("budget_testing", __name__)
 # Supabase setup
 # --------------------------------------------------
 
-if SUPABASE_AVAILABLE and os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY"):
-    supabase = create_client(
-        os.getenv("SUPABASE_URL"),
-        os.getenv("SUPABASE_KEY")
-    )
-else:
-    class MockSupabase:
-        def table(self, _): return self
-        def select(self, *_): return self
-        def update(self, *_): return self
-        def eq(self, *_): return self
-        def execute(self):
-            return type("obj", (), {"data": [{"id": 1}]})
-    supabase = MockSupabase()
+class MockSupabase:
+    def table(self, _): return self
+    def select(self, *_): return self
+    def update(self, *_): return self
+    def eq(self, *_): return self
+    def execute(self):
+        return type("obj", (), {"data": [{"id": 1}]})
+
+mock_supabase = MockSupabase()
+
+
+def supabase_client():
+    """Shared Supabase client, created on first use; the mock when not configured"""
+    return get_supabase() or mock_supabase
 
 # --------------------------------------------------
 # Routes
 # --------------------------------------------------
 
 @budget_testing_bp.route("/api/budget-testing/save", methods=["POST"])
-def save_budget_testing():
+@require_user
+def save_budget_testing(user_id):
     try:
         data = request.get_json()
 
-        token = data.get("user_id")
-        if not token:
-            return jsonify({"error": "Missing auth token"}), 401
-
-        user_id = decode_jwt_token(token)
-
         budget_type = data["budget_type"]
         budget_amount = float(data["budget_amount"])
         campaign_duration = int(data["campaign_duration"])
@@ -70,6 +58,8 @@ def save_budget_testing():
 
         campaign_id = data.get("campaign_id")
 
+        supabase = supabase_client()
+
         save_result = handle_campaign_save(
             supabase,
             user_id,
@@ -80,18 +70,21 @@ def save_budget_testing():
         if not save_result["success"]:
             return jsonify({"error": save_result["error"]}), 500
 
-        campaign_result = get_active_campaign(
-            supabase,
-            user_id,
-            save_result["campaign_id"]
-        )
+        # The upsert RPC returns the saved row; only the legacy path needs a re-read
+        campaign = save_result.get("campaign")
+        if campaign is None:
+            campaign = get_active_campaign(
+                supabase,
+                user_id,
+                save_result["campaign_id"]
+            )["campaign"] or {}
 
         projections = calculate_projections(
             budget_type,
             budget_amount,
             campaign_duration,
             selected_tests,
-            campaign_result["campaign"].get("campaign_goal")
+            campaign.get("campaign_goal")
         )
 
         return jsonify({
@@ -105,14 +98,9 @@ def save_budget_testing():
 
 
 @budget_testing_bp.route("/api/budget-testing/<campaign_id>", methods=["GET"])
-def get_budget_testing(campaign_id):
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
-    if not token:
-        return jsonify({"error": "Unauthorized"}), 401
-
-    user_id = decode_jwt_token(token)
-
-    response = supabase.table("auto_create") \
+@require_user
+def get_budget_testing(campaign_id, user_id):
+    response = supabase_client().table("auto_create") \
         .select("*") \
         .eq("id", int(campaign_id)) \
         .eq("user_id", user_id) \
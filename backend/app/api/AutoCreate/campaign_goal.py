@@ -3,44 +3,30 @@
 Campaign Goal Service (Blueprint version – Railway compatible)
 """
 
-import os
-import jwt
 import traceback
 from flask import Blueprint, request, jsonify
 from dotenv import load_dotenv
-from supabase import create_client, Client
+
+from clients import get_supabase, supabase_configured
+from unified_db import handle_campaign_save, require_user
 
 load_dotenv()
 
 campaign_goal_bp = Blueprint("campaign_goal", __name__)
 
-# --------------------------------------------------
-# Environment & Supabase
-# --------------------------------------------------
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key")
-
-supabase: Client | None = (
-    create_client(SUPABASE_URL, SUPABASE_KEY)
-    if SUPABASE_URL and SUPABASE_KEY
-    else None
-)
+# Columns of a campaign created by this step (an existing active campaign keeps its own)
+NEW_CAMPAIGN_DEFAULTS = {
+    "campaign_status": "draft",
+    "budget_amount": 0,
+    "campaign_duration": 30
+}
 
 # --------------------------------------------------
 # Helpers
 # --------------------------------------------------
 
-def decode_jwt_token(token: str) -> str:
-    payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise ValueError("user_id missing in token")
-    return str(user_id)
-
-
 def save_campaign_goal(user_id: str, goal: str, campaign_id: str | None):
+    supabase = get_supabase()
     if not supabase:
         return None, "Supabase not configured"
 
@@ -57,18 +43,13 @@ def save_campaign_goal(user_id: str, goal: str, campaign_id: str | None):
                 return None, "Campaign not found or access denied"
             return campaign_id, None
 
-        res = supabase.table("auto_create").insert({
-            "user_id": user_id,
-            "campaign_goal": goal,
-            "campaign_status": "draft",
-            "budget_amount": 0,
-            "campaign_duration": 30
-        }).execute()
-
-        if not res.data:
-            return None, "Failed to create campaign"
+        # Update the active campaign or create it, like every other wizard step
+        # (a plain insert would clash with the one-active-campaign-per-user index)
+        result = handle_campaign_save(supabase, user_id, {"campaign_goal": goal}, defaults=NEW_CAMPAIGN_DEFAULTS)
+        if not result["success"]:
+            return None, result["error"]
 
-        return str(res.data[0]["id"]), None
+        return str(result["campaign_id"]), None
 
     except Exception as e:
         print(traceback.format_exc())
@@ -79,22 +60,20 @@ def save_campaign_goal(user_id: str, goal: str, campaign_id: str | None):
 # --------------------------------------------------
 
 @campaign_goal_bp.route("/api/campaign-goal", methods=["POST"])
-def create_campaign_goal():
+@require_user
+def create_campaign_goal(user_id):
     try:
         data = request.get_json()
 
         goal = data.get("goal")
-        token = data.get("user_id")
         campaign_id = data.get("campaign_id")
 
-        if not goal or not token:
-            return jsonify({"error": "Missing goal or auth token"}), 400
+        if not goal:
+            return jsonify({"error": "Missing goal"}), 400
 
         if goal not in ["awareness", "consideration", "conversions", "retention"]:
             return jsonify({"error": "Invalid campaign goal"}), 400
 
-        user_id = decode_jwt_token(token)
-
         campaign_id, err = save_campaign_goal(user_id, goal, campaign_id)
         if err:
             return jsonify({"error": err}), 500
@@ -110,16 +89,14 @@ def create_campaign_goal():
 
 
 @campaign_goal_bp.route("/api/campaign-goal/<campaign_id>", methods=["PUT"])
-def update_campaign_goal(campaign_id):
+@require_user
+def update_campaign_goal(campaign_id, user_id):
     try:
         data = request.get_json()
         goal = data.get("goal")
-        token = data.get("user_id")
-
-        if not goal or not token:
-            return jsonify({"error": "Missing goal or auth token"}), 400
 
-        user_id = decode_jwt_token(token)
+        if not goal:
+            return jsonify({"error": "Missing goal"}), 400
 
         campaign_id, err = save_campaign_goal(user_id, goal, campaign_id)
         if err:
@@ -139,5 +116,5 @@ def health():
     return jsonify({
         "status": "healthy",
         "service": "campaign-goal",
-        "supabase": bool(supabase)
+        "supabase": supabase_configured()
     }), 200
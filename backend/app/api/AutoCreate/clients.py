@@ -0,0 +1,103 @@
+# clients.py - External clients shared by every AutoCreate blueprint, created on first use
+import os
+import sys
+import time
+import logging
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Shared pooled Runway client lives in backend/app/integrations
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class ClientRegistry:
+    """
+    Named client factories. Each client is built the first time it is asked
+    for and then shared, so importing a blueprint costs nothing and a process
+    never holds two Groq or Supabase clients. A factory may return None (not
+    configured); that answer is cached too. Factories may get other clients
+    from the registry.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._clients = {}
+        self._init_seconds = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory):
+        self._factories[name] = factory
+
+    def get(self, name: str):
+        client = self._clients.get(name, _MISSING)
+        if client is not _MISSING:
+            return client
+
+        with self._lock:
+            if name not in self._clients:
+                started = time.perf_counter()
+                self._clients[name] = self._factories[name]()
+                self._init_seconds[name] = time.perf_counter() - started
+                status = "ready" if self._clients[name] is not None else "not configured"
+                logger.info(f"🔌 {name} client {status} ({self._init_seconds[name] * 1000:.0f} ms)")
+            return self._clients[name]
+
+    def initialized(self) -> dict:
+        """Clients built so far and how long each took, in seconds"""
+        with self._lock:
+            return dict(self._init_seconds)
+
+
+def _create_groq():
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        logger.warning("⚠ GROQ_API_KEY not set")
+        return None
+    from groq import Groq
+    return Groq(api_key=api_key)
+
+
+def supabase_configured() -> bool:
+    """Whether Supabase credentials are set (without building the client)"""
+    return bool(os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY"))
+
+
+def _create_supabase():
+    if not supabase_configured():
+        return None
+    try:
+        from supabase import create_client
+    except ImportError:
+        logger.warning("⚠ Supabase not installed")
+        return None
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+
+def _create_runway():
+    # Process-wide keep-alive pool; reads RUNWAY_API_KEY itself
+    from app.integrations.http_client import get_runway_client
+    return get_runway_client()
+
+
+registry = ClientRegistry()
+registry.register("groq", _create_groq)
+registry.register("supabase", _create_supabase)
+registry.register("runway", _create_runway)
+
+
+def get_groq():
+    return registry.get("groq")
+
+
+def get_supabase():
+    return registry.get("supabase")
+
+
+def get_runway():
+    return registry.get("runway")
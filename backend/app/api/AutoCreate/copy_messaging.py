@@ -2,15 +2,13 @@
 import os
 import json
 import uuid
-import jwt
 import logging
 from flask import Blueprint, request, jsonify
-from groq import Groq
-from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from clients import get_groq, get_supabase, supabase_configured
 from unified_db import (
-    decode_jwt_token,
+    require_user,
     handle_campaign_save,
     get_active_campaign
 )
@@ -34,46 +32,25 @@ copy_messaging_bp = Blueprint("copy_messaging", __name__)
 # Environment
 # --------------------------------------------------
 
-JWT_SECRET = os.getenv("SECRET_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 # --------------------------------------------------
-# Clients
+# Clients (shared registry, created on first use)
 # --------------------------------------------------
 
-groq_client = Groq(api_key=GROQ_API_KEY)
 GROQ_MODEL = "llama-3.3-70b-versatile"
 
-supabase: Client | None = (
-    create_client(SUPABASE_URL, SUPABASE_KEY)
-    if SUPABASE_URL and SUPABASE_KEY
-    else None
-)
+
+def groq_client():
+    client = get_groq()
+    if client is None:
+        raise RuntimeError("GROQ_API_KEY not configured")
+    return client
 
 # --------------------------------------------------
 # Helpers
 # --------------------------------------------------
 
-def decode_user_id_from_token(token: str):
-    try:
-        try:
-            return str(uuid.UUID(token))
-        except ValueError:
-            pass
-
-        if token.startswith("Bearer "):
-            token = token[7:]
-
-        decoded = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        return decoded.get("user_id")
-
-    except Exception as e:
-        logger.error(f"JWT decode failed: {e}")
-        return None
-
-
 def generate_copy_with_groq(message: str, tone: str):
     system_prompt = f"""
     You are an expert copywriter.
@@ -112,7 +89,7 @@ def generate_copy_with_groq(message: str, tone: str):
     IMPORTANT: Return ONLY the JSON object, no other text.
     """
 
-    chat = groq_client.chat.completions.create(
+    chat = groq_client().chat.completions.create(
         model=GROQ_MODEL,
         messages=[
             {"role": "system", "content": system_prompt},
@@ -226,7 +203,7 @@ def analyze_copy(selected_copy: dict):
     }}
     """
 
-    chat = groq_client.chat.completions.create(
+    chat = groq_client().chat.completions.create(
         model=GROQ_MODEL,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.5,
@@ -265,20 +242,16 @@ def analyze_copy(selected_copy: dict):
 # --------------------------------------------------
 
 @copy_messaging_bp.route("/api/generate-copy", methods=["POST"])
-def generate_copy():
+@require_user
+def generate_copy(user_id):
     data = request.get_json()
 
     message = data.get("message")
     tone = data.get("tone", "energetic")
-    token = data.get("user_id")
     campaign_id = data.get("campaign_id", str(uuid.uuid4()))
 
-    if not message or not token:
-        return jsonify({"error": "Missing message or user token"}), 400
-
-    user_id = decode_user_id_from_token(token)
-    if not user_id:
-        return jsonify({"error": "Invalid token"}), 401
+    if not message:
+        return jsonify({"error": "Missing message"}), 400
 
     try:
         copy_data = generate_copy_with_groq(message, tone)
@@ -299,19 +272,15 @@ def generate_copy():
 
 
 @copy_messaging_bp.route("/api/analyze-copy", methods=["POST"])
-def analyze_copy_route():
+@require_user
+def analyze_copy_route(user_id):
     data = request.get_json()
 
     selected_copy = data.get("selected_copy")
-    token = data.get("user_id")
 
-    if not selected_copy or not token:
+    if not selected_copy:
         return jsonify({"error": "Missing data"}), 400
 
-    user_id = decode_user_id_from_token(token)
-    if not user_id:
-        return jsonify({"error": "Invalid token"}), 401
-
     try:
         analysis = analyze_copy(selected_copy)
 
@@ -328,19 +297,17 @@ def analyze_copy_route():
 
 
 @copy_messaging_bp.route("/api/save-campaign", methods=["POST"])
-def save_campaign():
+@require_user
+def save_campaign(user_id):
     data = request.get_json()
 
-    token = data.get("user_id")
     campaign_id = data.get("campaign_id")
     messaging_tone = data.get("messaging_tone")
     post_caption = data.get("post_caption")
 
-    if not all([token, campaign_id, messaging_tone, post_caption]):
+    if not all([campaign_id, messaging_tone, post_caption]):
         return jsonify({"error": "Missing fields"}), 400
 
-    user_id = decode_jwt_token(token)
-
     caption_text = (
         f"{post_caption.get('headline','')}\n\n"
         f"{post_caption.get('body','')}\n\n"
@@ -348,7 +315,7 @@ def save_campaign():
     )
 
     save_result = handle_campaign_save(
-        supabase,
+        get_supabase(),
         user_id,
         {
             "messaging_tone": messaging_tone,
@@ -372,5 +339,5 @@ def health():
         "status": "healthy",
         "service": "copy-messaging",
         "groq": bool(GROQ_API_KEY),
-        "supabase": bool(supabase)
+        "supabase": supabase_configured()
     }), 200
\ No newline at end of file
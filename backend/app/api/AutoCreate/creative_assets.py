@@ -1,14 +1,26 @@
 # creative_assets.py - Fixed video generation function
 import os
-import base64
+import sys
 import uuid
-import json
 import time
-import requests
-from flask import Blueprint, request, jsonify
+import hashlib
+import shutil
+from flask import Blueprint, request, jsonify, send_from_directory
 from dotenv import load_dotenv
 import logging
 import mimetypes
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Shared helpers live in backend/app/utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from app.utils.ratios import resolve_ratio, valid_ratios
+from clients import registry, get_runway
+from creative_store import create_store
+from reference_images import decode_upload, store_upload, ReferenceUploader
+from runway_poller import RunwayPoller
+from video_sequence import VideoSequencePipeline, plan_chains
 
 # Load environment variables
 load_dotenv()
@@ -32,34 +44,68 @@ RUNWAY_HEADERS = {
     "Content-Type": "application/json",
 }
 
+IMAGE_MODEL = "gen4_image"
+VIDEO_MODEL = "veo3.1"
+
+# Square for social media/product images, HD landscape for video
+DEFAULT_IMAGE_RATIO = "1024:1024"
+DEFAULT_VIDEO_RATIO = "1280:720"
+
 # Valid ratios for Runway ML API (from error message)
-VALID_RATIOS = [
-    "1024:1024",  # Square
-    "1080:1080",  # Square HD
-    "1168:880",   # Desktop
-    "1360:768",   # Widescreen
-    "1440:1080",  # 4:3 HD
-    "1080:1440",  # Portrait HD
-    "1808:768",   # Ultra Wide
-    "1920:1080",  # Full HD
-    "1080:1920",  # Portrait Full HD
-    "2112:912",   # Super Wide
-    "1280:720",   # HD
-    "720:1280",   # Portrait HD
-    "720:720",    # Square Mobile
-    "960:720",    # 4:3 Mobile
-    "720:960",    # Portrait Mobile
-    "1680:720"    # Cinematic
-]
-
-# In-memory storage for tasks (in production, use a database)
-tasks_store = {}
-generation_tasks = {}  # Separate storage for tracking individual tasks
+VALID_RATIOS = valid_ratios(IMAGE_MODEL)
+VALID_VIDEO_RATIOS = valid_ratios(VIDEO_MODEL)
+
+# Generated assets live on disk; records keep only a reference and a URL
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIRS = {
+    "image": os.path.join(BASE_DIR, "generated_images"),
+    "video": os.path.join(BASE_DIR, "generated_videos"),
+}
+ASSET_EXTENSIONS = {"image": "png", "video": "mp4"}
+ASSET_BASE_URL = os.environ.get('ASSET_BASE_URL', f"http://localhost:{os.environ.get('PORT', 5050)}")
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Product images are uploaded to Runway once per content hash and sent by URI
+registry.register("reference_uploader", lambda: ReferenceUploader(get_runway()))
+
+def get_reference_uploader() -> ReferenceUploader:
+    return registry.get("reference_uploader")
+
+# Variations per /api/generate-assets call (overridable per request with "variations")
+DEFAULT_VARIATIONS = int(os.environ.get('ASSET_VARIATIONS', 5))
+MAX_VARIATIONS = int(os.environ.get('MAX_ASSET_VARIATIONS', 10))
+
+# Segments in a stitched /api/generate-video-sequence ad (one sequence_video_prompts entry each)
+DEFAULT_SEQUENCE_SEGMENTS = 5
+
+# Task creation: parallel requests per call, and a process-wide cap on request rate
+SUBMIT_CONCURRENCY = int(os.environ.get('RUNWAY_SUBMIT_CONCURRENCY', 3))
+SUBMIT_RATE_PER_SECOND = float(os.environ.get('RUNWAY_SUBMIT_RATE', 2))
+
+# Storage for campaigns and tasks: in-memory by default, SQLite/Postgres for several workers
+creative_store = create_store()  # Campaigns, generation tasks and assets (see CREATIVE_STORE_URL)
 
 # -----------------------------
 # Helper Functions
 # -----------------------------
 
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads"""
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+submit_limiter = RateLimiter(SUBMIT_RATE_PER_SECOND)
+
 def get_image_as_data_uri(image_path_or_data: str, filename: str = None) -> str:
     """
     Convert image to data URI format as per Runway documentation
@@ -95,47 +141,25 @@ def get_image_as_data_uri(image_path_or_data: str, filename: str = None) -> str:
         # Default to JPEG
         return f"data:image/jpeg;base64,{image_path_or_data}"
 
-def save_image_locally(image_data: str, filename: str) -> str:
-    """Save base64 image data to local file system"""
-    try:
-        # Create output directory if it doesn't exist
-        output_dir = "uploaded_images"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Decode base64 data
-        if ',' in image_data:
-            image_data = image_data.split(',')[1]
-        image_bytes = base64.b64decode(image_data)
-        
-        # Save file
-        filepath = os.path.join(output_dir, filename)
-        with open(filepath, "wb") as f:
-            f.write(image_bytes)
-        
-        logger.info(f"Image saved to: {filepath}")
-        return filepath
-    except Exception as e:
-        logger.error(f"Error saving image: {e}")
-        return None
-
-def create_image_generation_task(image_data_uri: str, prompt_text: str, variation_number: int = 1):
+def create_image_generation_task(image_uri: str, prompt_text: str, variation_number: int = 1,
+                                 aspect_ratio: str = None):
     """
     Create image generation task using Runway ML with proper format as per documentation
     Uses @product to reference the uploaded image in the prompt
     """
     try:
-        # Choose a valid ratio - using 1:1 square for product images
-        ratio = "1024:1024"  # Square ratio for social media/product images
+        # Snap the requested ratio to one gen4_image accepts (square by default)
+        ratio = resolve_ratio(IMAGE_MODEL, aspect_ratio or DEFAULT_IMAGE_RATIO)
         
         # Prepare request payload according to Runway documentation
         # Use @product to reference the uploaded image in the prompt
         payload = {
-            "model": "gen4_image",  # Using gen4_image model as per documentation
+            "model": IMAGE_MODEL,  # Using gen4_image model as per documentation
             "ratio": ratio,
             "promptText": f"@product {prompt_text}",
             "referenceImages": [
                 {
-                    "uri": image_data_uri,
+                    "uri": image_uri,
                     "tag": "product"
                 }
             ]
@@ -145,9 +169,8 @@ def create_image_generation_task(image_data_uri: str, prompt_text: str, variatio
         logger.info(f"Prompt: {prompt_text[:100]}...")
         
         # Make API call
-        response = requests.post(
-            f"{RUNWAY_BASE_URL}/v1/text_to_image",
-            headers=RUNWAY_HEADERS,
+        response = get_runway().post(
+            "/v1/text_to_image",
             json=payload,
             timeout=30
         )
@@ -173,7 +196,8 @@ def create_image_generation_task(image_data_uri: str, prompt_text: str, variatio
         logger.error(f"Error creating image generation task: {e}")
         raise
 
-def create_video_generation_task(image_data_uri: str, prompt_text: str, variation_number: int = 1):
+def create_video_generation_task(image_uri: str, prompt_text: str, variation_number: int = 1,
+                                 aspect_ratio: str = None):
     """
     Create video generation task using Runway ML
     Based on the working template from the user
@@ -186,20 +210,19 @@ def create_video_generation_task(image_data_uri: str, prompt_text: str, variatio
         clean_prompt = prompt_text.replace("@product", "").strip()
         
         payload = {
-            "model": "veo3.1",
-            "promptImage": image_data_uri,  # Single image as data URI
+            "model": VIDEO_MODEL,
+            "promptImage": image_uri,  # runway:// URI, or a data URI as fallback
             "promptText": clean_prompt,
-            "ratio": "1280:720",  # Valid ratio for video
+            "ratio": resolve_ratio(VIDEO_MODEL, aspect_ratio or DEFAULT_VIDEO_RATIO),  # Valid ratio for video
             "duration": 4,  # Must be 4, 6, or 8 seconds
         }
         
         logger.info(f"Creating video generation task with prompt: {clean_prompt[:100]}...")
-        logger.info(f"Using image data URI: {image_data_uri[:80]}...")
+        logger.info(f"Using reference image: {image_uri[:80]}...")
         
         # Make API call
-        response = requests.post(
-            f"{RUNWAY_BASE_URL}/v1/image_to_video",
-            headers=RUNWAY_HEADERS,
+        response = get_runway().post(
+            "/v1/image_to_video",
             json=payload,
             timeout=30
         )
@@ -230,118 +253,187 @@ def create_video_generation_task(image_data_uri: str, prompt_text: str, variatio
         logger.error(f"Error creating video generation task: {e}")
         raise
 
-def poll_task_status(task_id: str):
-    """Poll Runway ML task status with better logging"""
-    max_attempts = 300  # 5 minutes with 1-second intervals (videos take longer)
-    attempt = 0
-    
-    logger.info(f"Starting to poll task: {task_id}")
-    
-    while attempt < max_attempts:
-        try:
-            # Get task status
-            response = requests.get(
-                f"{RUNWAY_BASE_URL}/v1/tasks/{task_id}",
-                headers=RUNWAY_HEADERS,
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Task status check failed: {response.status_code}")
-                time.sleep(2)
-                attempt += 1
-                continue
-            
-            task = response.json()
-            status = task.get("status")
-            
-            logger.info(f"Task {task_id} status: {status} (attempt {attempt + 1}/{max_attempts})")
-            
-            if status == "SUCCEEDED":
-                output_url = task.get("output", [])[0] if task.get("output") else None
-                if output_url:
-                    logger.info(f"Task {task_id} succeeded! Output URL: {output_url[:50]}...")
-                    return {
-                        "success": True,
-                        "status": status,
-                        "output_url": output_url,
-                        "task_id": task_id
-                    }
-                else:
-                    logger.error(f"Task succeeded but no output URL: {task}")
-            
-            elif status == "FAILED":
-                error_message = task.get("error", {}).get("message", "Unknown error")
-                logger.error(f"Task {task_id} failed: {error_message}")
-                return {
-                    "success": False,
-                    "status": status,
-                    "error": error_message
-                }
-            elif status == "CANCELED":
-                logger.error(f"Task {task_id} was canceled")
-                return {
-                    "success": False,
-                    "status": status,
-                    "error": "Task was canceled"
-                }
-            
-            # Wait before next poll (longer for videos)
-            time.sleep(2)
-            attempt += 1
-            
-        except Exception as e:
-            logger.error(f"Error polling task {task_id}: {e}")
-            time.sleep(2)
-            attempt += 1
-    
-    logger.error(f"Task {task_id} polling timeout after {max_attempts} seconds")
-    return {
-        "success": False,
-        "status": "TIMEOUT",
-        "error": f"Task polling timeout after {max_attempts} seconds"
-    }
+def asset_url(asset_type: str, filename: str) -> str:
+    return f"{ASSET_BASE_URL}/api/assets/{asset_type}/{filename}"
 
 def download_and_store_asset(output_url: str, task_id: str, asset_type: str, campaign_id: str):
-    """Download generated asset and store it"""
+    """Stream a generated asset to disk (hashing it on the way) and return a reference to it"""
     try:
         logger.info(f"Downloading asset from: {output_url[:50]}...")
         
-        # Download the asset
-        response = requests.get(output_url, timeout=60)  # Longer timeout for videos
-        response.raise_for_status()
-        
-        # Convert to base64
-        asset_data = base64.b64encode(response.content).decode('utf-8')
-        mime_type = 'video/mp4' if asset_type == 'video' else 'image/png'
-        data_uri = f"data:{mime_type};base64,{asset_data}"
-        
         # Generate filename
         timestamp = int(time.time())
-        asset_filename = f"{campaign_id}_{task_id}_{timestamp}_{asset_type}.{'mp4' if asset_type == 'video' else 'png'}"
+        asset_filename = f"{campaign_id}_{task_id}_{timestamp}_{asset_type}.{ASSET_EXTENSIONS[asset_type]}"
         
-        # Save locally
-        output_dir = "generated_videos" if asset_type == 'video' else "generated_images"
+        # Save locally, chunk by chunk; never hold the whole video in memory
+        output_dir = ASSET_DIRS[asset_type]
         os.makedirs(output_dir, exist_ok=True)
         filepath = os.path.join(output_dir, asset_filename)
+        tmp_path = f"{filepath}.part"
         
-        with open(filepath, "wb") as f:
-            f.write(response.content)
-        
-        logger.info(f"Asset saved to: {filepath} (size: {len(response.content)} bytes)")
+        sha = hashlib.sha256()
+        file_size = 0
+        try:
+            with get_runway().download(output_url, timeout=60, chunk_size=DOWNLOAD_CHUNK_SIZE) as chunks, \
+                    open(tmp_path, "wb") as f:  # Longer timeout for videos
+                for chunk in chunks:
+                    sha.update(chunk)
+                    f.write(chunk)
+                    file_size += len(chunk)
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        logger.info(f"Asset saved to: {filepath} (size: {file_size} bytes)")
         
         return {
-            "data_uri": data_uri,
+            "url": asset_url(asset_type, asset_filename),
             "local_path": filepath,
             "filename": asset_filename,
             "output_url": output_url,
-            "file_size": len(response.content)
+            "file_size": file_size,
+            "content_hash": sha.hexdigest()
         }
         
     except Exception as e:
         logger.error(f"Error downloading/storing asset: {e}")
         raise
 
+def complete_generation_task(task_info: dict, output_url: str):
+    """Download a finished task's output and attach it to its campaign (runs on a poller worker)"""
+    task_id = task_info['task_id']
+    campaign_id = task_info['campaign_id']
+    asset_type = task_info.get('asset_type', 'image')
+    
+    # Download and store the asset
+    asset_data = download_and_store_asset(
+        output_url,
+        task_id,
+        asset_type,
+        campaign_id
+    )
+    
+    # Create asset info
+    asset_info = {
+        "id": str(uuid.uuid4()),
+        "task_id": task_id,
+        "campaign_id": campaign_id,
+        "type": asset_type,
+        "url": asset_data['url'],
+        "content_hash": asset_data['content_hash'],
+        "filename": asset_data['filename'],
+        "local_path": asset_data['local_path'],
+        "output_url": asset_data['output_url'],
+        "file_size": asset_data.get('file_size'),
+        "title": f"AI Generated {asset_type.capitalize()} {task_info.get('variation', 1)}",
+        "prompt": task_info.get('prompt', ''),
+        "score": 80 + (task_info.get('variation', 1) * 5),  # Score based on variation
+        "created_at": time.time(),
+        "status": "completed"
+    }
+    if task_info.get('sequence_id'):
+        # Segment of a video sequence: kept when the campaign's videos are regenerated
+        asset_info['sequence_id'] = task_info['sequence_id']
+    
+    # Store in campaign's generated assets
+    creative_store.set_asset(task_id, asset_info)
+    
+    # Update task info last, so anyone who sees "completed" also finds the asset
+    creative_store.update_task(task_id, status='completed', completed_at=time.time(), asset_info=asset_info)
+    
+    logger.info(f"Task {task_id} completed and stored successfully")
+
+def fetch_task_status(task_id: str):
+    return get_runway().get_task(task_id)
+
+# All in-flight tasks are polled from one background loop; check-status only reads
+def _create_runway_poller() -> RunwayPoller:
+    poller = RunwayPoller(creative_store, fetch_task_status, complete_generation_task)
+    poller.start()  # also adopts tasks another worker (or a previous run) left unfinished
+    return poller
+
+registry.register("runway_poller", _create_runway_poller)
+
+def get_runway_poller() -> RunwayPoller:
+    return registry.get("runway_poller")
+
+def submit_sequence_segment(sequence: dict, segment: int, image_uri: str) -> str:
+    """Create and track the Runway task for one segment of a video sequence"""
+    prompt_text = generate_video_prompt(sequence['ad_type'], sequence['campaign_goal'], segment)
+    
+    submit_limiter.wait()
+    task_id = create_video_generation_task(image_uri, prompt_text, segment, sequence['aspect_ratio'])
+    
+    creative_store.add_task({
+        "task_id": task_id,
+        "campaign_id": sequence['campaign_id'],
+        "user_id": sequence['user_id'],
+        "asset_type": "video",
+        "ad_type": sequence['ad_type'],
+        "campaign_goal": sequence['campaign_goal'],
+        "status": "processing",
+        "variation": segment,
+        "sequence_id": sequence['task_id'],
+        "started_at": time.time(),
+        "prompt": prompt_text
+    })
+    get_runway_poller().track(task_id)
+    return task_id
+
+def frame_reference(frame_path: str) -> str:
+    """Store a segment's last frame like an upload and return the URI for the next segment"""
+    with open(frame_path, "rb") as f:
+        upload = store_upload(f.read())
+    return get_reference_uploader().reference_uri(upload['filepath'], upload['content_hash'])
+
+def complete_video_sequence(sequence: dict, output_path: str):
+    """Move a stitched sequence into the video assets and attach it to its campaign"""
+    sequence_id = sequence['task_id']
+    campaign_id = sequence['campaign_id']
+    
+    asset_filename = f"{campaign_id}_{sequence_id}_{int(time.time())}_video.mp4"
+    os.makedirs(ASSET_DIRS['video'], exist_ok=True)
+    filepath = os.path.join(ASSET_DIRS['video'], asset_filename)
+    shutil.move(output_path, filepath)
+    
+    sha = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    
+    asset_info = {
+        "id": str(uuid.uuid4()),
+        "task_id": sequence_id,
+        "campaign_id": campaign_id,
+        "type": "video",
+        "url": asset_url("video", asset_filename),
+        "content_hash": sha.hexdigest(),
+        "filename": asset_filename,
+        "local_path": filepath,
+        "file_size": os.path.getsize(filepath),
+        "title": f"AI Generated Video Sequence ({len(sequence.get('segment_task_ids') or [])} segments)",
+        "prompt": f"Continuous {sequence['ad_type']} advertisement",
+        "score": 95,
+        "sequence": True,
+        "created_at": time.time(),
+        "status": "completed"
+    }
+    
+    creative_store.set_asset(sequence_id, asset_info)
+    creative_store.update_task(sequence_id, status='completed', completed_at=time.time(), progress=1.0,
+                               asset_info=asset_info)
+    
+    logger.info(f"Video sequence {sequence_id} stitched and stored: {filepath}")
+
+# Segments render through the same submit/poll/download path as single videos
+registry.register("video_sequences",
+                  lambda: VideoSequencePipeline(creative_store, submit_sequence_segment, frame_reference,
+                                                complete_video_sequence))
+
+def get_video_sequences() -> VideoSequencePipeline:
+    return registry.get("video_sequences")
+
 def generate_trend_aware_prompt(base_prompt: str, ad_type: str, campaign_goal: str) -> str:
     """
     Generate trend-aware prompts incorporating current trends
@@ -372,9 +464,9 @@ def generate_trend_aware_prompt(base_prompt: str, ad_type: str, campaign_goal: s
     
     return prompt
 
-def generate_video_prompt(ad_type: str, campaign_goal: str, variation_number: int) -> str:
+def sequence_video_prompts(ad_type: str, campaign_goal: str) -> list:
     """
-    Generate specific video prompts based on variation number for continuous sequence
+    The prompts of a continuous sequence, one per segment in order
     Each video is designed to flow seamlessly into the next
     """
     # Base continuity instruction for all videos
@@ -437,6 +529,12 @@ End with memorable product positioning and brand emphasis.
 Modern, trendy style perfect for social media - strong finish."""
     ]
     
+    return video_prompts
+
+def generate_video_prompt(ad_type: str, campaign_goal: str, variation_number: int) -> str:
+    """Generate specific video prompts based on variation number for continuous sequence"""
+    video_prompts = sequence_video_prompts(ad_type, campaign_goal)
+    
     # Return the appropriate prompt based on variation number
     index = (variation_number - 1) % len(video_prompts)
     return video_prompts[index]
@@ -469,32 +567,28 @@ def upload_image():
         ad_type = data['ad_type']
         campaign_id = data.get('campaign_id', f"campaign_{str(uuid.uuid4())[:8]}")
         
-        # Convert to proper data URI format
-        image_data_uri = get_image_as_data_uri(image_data, filename)
-        
         logger.info(f"Uploading image for campaign: {campaign_id}, user: {user_id}")
-        logger.info(f"Data URI format: {image_data_uri[:100]}...")
-        
-        # Save image locally
-        filepath = save_image_locally(image_data, filename)
         
-        if not filepath:
+        # Save image locally, normalized and deduplicated by content hash
+        try:
+            upload = store_upload(decode_upload(image_data))
+        except Exception as e:
+            logger.error(f"Error saving image: {e}")
             return jsonify({"success": False, "error": "Failed to save image"}), 500
         
-        # Store in tasks store
-        tasks_store[campaign_id] = {
+        # Store in campaign store (the image itself stays on disk)
+        creative_store.save_campaign(campaign_id, {
             "user_id": user_id,
             "filename": filename,
-            "filepath": filepath,
-            "image_data": image_data_uri,  # Store as data URI
+            "filepath": upload['filepath'],
+            "content_hash": upload['content_hash'],
             "ad_type": ad_type,
             "created_at": time.time(),
-            "status": "uploaded",
-            "generated_assets": []  # Store all generated assets here
-        }
+            "status": "uploaded"
+        })
         
         # Initialize generation tasks for this campaign
-        generation_tasks[campaign_id] = []
+        creative_store.reset_campaign(campaign_id)
         
         logger.info(f"Image uploaded successfully for campaign: {campaign_id}")
         
@@ -504,7 +598,9 @@ def upload_image():
             "campaign_id": campaign_id,
             "user_id": user_id,
             "ad_type": ad_type,
-            "image_format": "data_uri"
+            "content_hash": upload['content_hash'],
+            "file_size": upload['file_size'],
+            "deduplicated": upload['deduplicated']
         }), 200
         
     except Exception as e:
@@ -534,14 +630,13 @@ def generate_assets():
         user_id = data.get('user_id', 'demo_user')
         campaign_goal = data.get('campaign_goal', 'awareness')
         ad_type = data.get('ad_type', 'General Ads')
+        aspect_ratio = data.get('aspect_ratio')  # optional, snapped to the model's valid ratios
         
         # Check if campaign exists
-        if campaign_id not in tasks_store:
+        campaign = creative_store.get_campaign(campaign_id)
+        if campaign is None:
             return jsonify({"success": False, "error": "Campaign not found. Please upload image first."}), 404
         
-        campaign = tasks_store[campaign_id]
-        image_data_uri = campaign['image_data']
-        
         # Validate asset type
         if asset_type not in ['image', 'video']:
             return jsonify({"success": False, "error": "Invalid asset type. Must be 'image' or 'video'"}), 400
@@ -556,86 +651,88 @@ def generate_assets():
                 "error": "Runway API key not configured. Please set RUNWAY_API_KEY environment variable."
             }), 500
         
-        # Generate 5 variations to provide more options
-        num_variations = 5
+        # Generate several variations to provide more options
+        try:
+            num_variations = int(data.get('variations', DEFAULT_VARIATIONS))
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "error": "variations must be a number"}), 400
+        num_variations = max(1, min(num_variations, MAX_VARIATIONS))
         logger.info(f"🎯 Target: {num_variations} {asset_type} variations")
         
-        # Clear any existing assets of this type to start fresh
-        if 'generated_assets' in campaign:
-            existing_assets = [a for a in campaign['generated_assets'] if a.get('type') == asset_type]
-            existing_count = len(existing_assets)
-            if existing_count > 0:
-                logger.info(f"🔄 Clearing {existing_count} existing {asset_type} assets to generate fresh set")
-                campaign['generated_assets'] = [a for a in campaign['generated_assets'] if a.get('type') != asset_type]
-        
-        task_ids = []
+        # Resolved once and shared by every variation (uploaded to Runway at most once)
+        image_uri = get_reference_uploader().reference_uri(campaign['filepath'], campaign.get('content_hash'))
         
-        logger.info(f"📝 Starting loop to create {num_variations} tasks...")
-        for i in range(num_variations):
-            try:
-                logger.info(f"🔄 Creating task {i+1}/{num_variations}...")
-                if asset_type == 'image':
-                    # Generate trend-aware prompt for images
-                    base_prompt = f"Create a professional advertisement background for {ad_type}. Campaign goal: {campaign_goal}. Use modern, clean design with the product placed naturally."
-                    prompt_text = generate_trend_aware_prompt(
-                        base_prompt,
-                        ad_type,
-                        campaign_goal
-                    )
-                    
-                    task_id = create_image_generation_task(
-                        image_data_uri,
-                        prompt_text,
-                        i + 1
-                    )
-                else:  # video
-                    # Generate specific video prompt
-                    prompt_text = generate_video_prompt(
-                        ad_type,
-                        campaign_goal,
-                        i + 1
-                    )
-                    
-                    task_id = create_video_generation_task(
-                        image_data_uri,
-                        prompt_text,
-                        i + 1
-                    )
-                
-                # Store task info
-                task_info = {
-                    "task_id": task_id,
-                    "campaign_id": campaign_id,
-                    "user_id": user_id,
-                    "asset_type": asset_type,
-                    "ad_type": ad_type,
-                    "campaign_goal": campaign_goal,
-                    "status": "processing",
-                    "variation": i + 1,
-                    "started_at": time.time(),
-                    "prompt": prompt_text
-                }
-                
-                # Store in generation tasks
-                if campaign_id not in generation_tasks:
-                    generation_tasks[campaign_id] = []
-                generation_tasks[campaign_id].append(task_info)
-                
-                task_ids.append(task_id)
-                logger.info(f"✅ Created {asset_type} generation task {i+1}/{num_variations}: {task_id}")
-                logger.info(f"📊 Total tasks created so far: {len(task_ids)}")
-                
-                # Add small delay between task creation
-                if i < num_variations - 1:
-                    time.sleep(1)
-                    
-            except Exception as e:
-                logger.error(f"❌ Failed to create variation {i+1}/{num_variations}: {str(e)}")
-                logger.error(f"❌ Error type: {type(e).__name__}")
-                import traceback
-                logger.error(f"❌ Traceback: {traceback.format_exc()}")
-                logger.error(f"📊 Continuing with remaining tasks. Current task count: {len(task_ids)}")
-                # Continue with other variations even if one fails
+        # Clear any existing assets of this type to start fresh
+        existing_count = len(creative_store.campaign_assets(campaign_id, asset_type))
+        if existing_count > 0:
+            logger.info(f"🔄 Clearing {existing_count} existing {asset_type} assets to generate fresh set")
+            creative_store.remove_assets(campaign_id, asset_type)
+        
+        def create_variation(variation: int):
+            """Create and register one variation's task; returns its task_info"""
+            if asset_type == 'image':
+                # Generate trend-aware prompt for images
+                base_prompt = f"Create a professional advertisement background for {ad_type}. Campaign goal: {campaign_goal}. Use modern, clean design with the product placed naturally."
+                prompt_text = generate_trend_aware_prompt(
+                    base_prompt,
+                    ad_type,
+                    campaign_goal
+                )
+                create_task = create_image_generation_task
+            else:  # video
+                # Generate specific video prompt
+                prompt_text = generate_video_prompt(
+                    ad_type,
+                    campaign_goal,
+                    variation
+                )
+                create_task = create_video_generation_task
+            
+            submit_limiter.wait()
+            task_id = create_task(
+                image_uri,
+                prompt_text,
+                variation,
+                aspect_ratio
+            )
+            
+            # Store task info
+            task_info = {
+                "task_id": task_id,
+                "campaign_id": campaign_id,
+                "user_id": user_id,
+                "asset_type": asset_type,
+                "ad_type": ad_type,
+                "campaign_goal": campaign_goal,
+                "status": "processing",
+                "variation": variation,
+                "started_at": time.time(),
+                "prompt": prompt_text
+            }
+            
+            # Store in generation tasks and start polling it in the background
+            creative_store.add_task(task_info)
+            get_runway_poller().track(task_id)
+            return task_info
+        
+        created = []
+        
+        logger.info(f"📝 Creating {num_variations} tasks ({SUBMIT_CONCURRENCY} at a time)...")
+        with ThreadPoolExecutor(max_workers=min(SUBMIT_CONCURRENCY, num_variations)) as pool:
+            futures = {pool.submit(create_variation, i + 1): i + 1 for i in range(num_variations)}
+            for future in as_completed(futures):
+                variation = futures[future]
+                try:
+                    task_info = future.result()
+                    created.append(task_info)
+                    logger.info(f"✅ Created {asset_type} generation task {variation}/{num_variations}: {task_info['task_id']}")
+                except Exception as e:
+                    # Continue with other variations even if one fails
+                    logger.error(f"❌ Failed to create variation {variation}/{num_variations}: {str(e)}")
+                    logger.error(f"❌ Error type: {type(e).__name__}")
+                    logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        
+        task_ids = [t["task_id"] for t in sorted(created, key=lambda t: t["variation"])]
         
         logger.info(f"🎬 Finished task creation loop. Total tasks created: {len(task_ids)}/{num_variations}")
         
@@ -646,8 +743,7 @@ def generate_assets():
         logger.info(f"✅ Successfully created {len(task_ids)} tasks")
         
         # Update campaign status
-        campaign['status'] = f'generating_{asset_type}'
-        tasks_store[campaign_id] = campaign
+        creative_store.update_campaign(campaign_id, status=f'generating_{asset_type}')
         
         logger.info(f"Started {len(task_ids)} {asset_type} generation tasks for campaign: {campaign_id}")
         logger.info(f"🚀 Returning response with {len(task_ids)} task_ids: {task_ids}")
@@ -666,7 +762,6 @@ def generate_assets():
     except Exception as e:
         logger.error(f"❌ Error generating assets: {str(e)}")
         logger.error(f"❌ Error type: {type(e).__name__}")
-        import traceback
         logger.error(f"❌ Full traceback: {traceback.format_exc()}")
         return jsonify({
             "success": False, 
@@ -674,6 +769,86 @@ def generate_assets():
             "error_type": type(e).__name__
         }), 500
 
+@creative_assets_bp.route('/api/generate-video-sequence', methods=['POST', 'OPTIONS'])
+def generate_video_sequence():
+    """Generate one continuous ad video from chained segments, stitched without re-encoding"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        data = request.get_json()
+        
+        if not data or 'campaign_id' not in data:
+            return jsonify({"success": False, "error": "Missing required field: campaign_id"}), 400
+        
+        campaign_id = data['campaign_id']
+        campaign = creative_store.get_campaign(campaign_id)
+        if campaign is None:
+            return jsonify({"success": False, "error": "Campaign not found. Please upload image first."}), 404
+        
+        if not RUNWAY_API_KEY or RUNWAY_API_KEY == 'your_runway_api_key_here':
+            logger.error("❌ Runway API key not configured!")
+            return jsonify({
+                "success": False, 
+                "error": "Runway API key not configured. Please set RUNWAY_API_KEY environment variable."
+            }), 500
+        
+        try:
+            num_segments = int(data.get('segments', DEFAULT_SEQUENCE_SEGMENTS))
+            fresh_starts = data.get('fresh_starts')  # segments that restart from the product image
+            if fresh_starts is not None:
+                fresh_starts = [int(n) for n in fresh_starts]
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "error": "segments and fresh_starts must be numbers"}), 400
+        ad_type = data.get('ad_type', campaign.get('ad_type', 'General Ads'))
+        campaign_goal = data.get('campaign_goal', 'awareness')
+        # One distinct prompt per segment: more segments would repeat the opening shots
+        max_segments = len(sequence_video_prompts(ad_type, campaign_goal))
+        if not 1 <= num_segments <= max_segments:
+            return jsonify({"success": False, "error": f"segments must be between 1 and {max_segments}"}), 400
+        
+        chains = plan_chains(num_segments, fresh_starts)
+        sequence_id = f"sequence_{uuid.uuid4().hex[:12]}"
+        sequence = {
+            "task_id": sequence_id,
+            "campaign_id": campaign_id,
+            "user_id": data.get('user_id', 'demo_user'),
+            "asset_type": "video",
+            "kind": "sequence",
+            "ad_type": ad_type,
+            "campaign_goal": campaign_goal,
+            # Resolved once: stream-copy stitching needs every segment at the same size
+            "aspect_ratio": resolve_ratio(VIDEO_MODEL, data.get('aspect_ratio') or DEFAULT_VIDEO_RATIO),
+            "chains": chains,
+            "segment_task_ids": [None] * num_segments,
+            "status": "processing",
+            "progress": 0.0,
+            "started_at": time.time()
+        }
+        creative_store.add_task(sequence)
+        
+        image_uri = get_reference_uploader().reference_uri(campaign['filepath'], campaign.get('content_hash'))
+        get_video_sequences().start(sequence, image_uri)
+        creative_store.update_campaign(campaign_id, status='generating_video')
+        
+        logger.info(f"🎬 Started video sequence {sequence_id} for campaign {campaign_id}: chains {chains}")
+        
+        return jsonify({
+            "success": True,
+            "message": f"Started a {num_segments}-segment video sequence",
+            "task_id": sequence_id,
+            "campaign_id": campaign_id,
+            "segments": num_segments,
+            "chains": chains,
+            "status_endpoint": f"/api/check-status/{sequence_id}",
+            "estimated_time": f"{2 * len(max(chains, key=len))}-{5 * len(max(chains, key=len))} minutes"
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"❌ Error starting video sequence: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @creative_assets_bp.route('/api/check-status/<task_id>', methods=['GET', 'OPTIONS'])
 def check_status(task_id: str):
     """Check status of a generation task and return asset if completed"""
@@ -683,137 +858,57 @@ def check_status(task_id: str):
     try:
         logger.info(f"Checking status for task: {task_id}")
         
-        # Find the task in generation_tasks
-        task_info = None
-        campaign_id = None
+        # Find the task in the store
+        task_info = creative_store.get_task(task_id)
         
-        for cid, tasks in generation_tasks.items():
-            for task in tasks:
-                if task.get("task_id") == task_id:
-                    task_info = task
-                    campaign_id = cid
-                    break
-            if task_info:
-                break
-        
-        if not task_info or not campaign_id:
+        if not task_info:
             logger.error(f"Task {task_id} not found in generation tasks")
             return jsonify({"success": False, "error": f"Task {task_id} not found"}), 404
         
         # Check if task is already completed in campaign
-        campaign = tasks_store.get(campaign_id, {})
-        generated_assets = campaign.get('generated_assets', [])
-        
-        for asset in generated_assets:
-            if asset.get('task_id') == task_id:
-                # Task already completed and stored
-                logger.info(f"Task {task_id} already completed, returning stored asset")
-                return jsonify({
-                    "success": True,
-                    "status": "completed",
-                    "asset_type": task_info.get('asset_type'),
-                    "task_id": task_id,
-                    "asset": {
-                        "id": asset.get('id'),
-                        "data_uri": asset.get('data_uri'),
-                        "filename": asset.get('filename'),
-                        "type": asset.get('type'),
-                        "file_size": asset.get('file_size')
-                    },
-                    "variation": task_info.get('variation'),
-                    "message": f"{task_info.get('asset_type').capitalize()} generation completed"
-                }), 200
-        
-        # Poll Runway for status
-        logger.info(f"Polling Runway for task status: {task_id}")
-        result = poll_task_status(task_id)
-        
-        if result['success']:
-            # Task completed successfully
-            asset_type = task_info.get('asset_type', 'image')
-            
-            try:
-                # Download and store the asset
-                asset_data = download_and_store_asset(
-                    result['output_url'],
-                    task_id,
-                    asset_type,
-                    campaign_id
-                )
-                
-                # Create asset info
-                asset_id = str(uuid.uuid4())
-                asset_info = {
-                    "id": asset_id,
-                    "task_id": task_id,
-                    "campaign_id": campaign_id,
-                    "type": asset_type,
-                    "data_uri": asset_data['data_uri'],
-                    "filename": asset_data['filename'],
-                    "local_path": asset_data['local_path'],
-                    "output_url": asset_data['output_url'],
-                    "file_size": asset_data.get('file_size'),
-                    "title": f"AI Generated {asset_type.capitalize()} {task_info.get('variation', 1)}",
-                    "prompt": task_info.get('prompt', ''),
-                    "score": 80 + (task_info.get('variation', 1) * 5),  # Score based on variation
-                    "created_at": time.time(),
-                    "status": "completed"
-                }
-                
-                # Update task info
-                task_info['status'] = 'completed'
-                task_info['completed_at'] = time.time()
-                task_info['asset_info'] = asset_info
-                
-                # Store in campaign's generated assets
-                if 'generated_assets' not in campaign:
-                    campaign['generated_assets'] = []
-                campaign['generated_assets'].append(asset_info)
-                tasks_store[campaign_id] = campaign
-                
-                logger.info(f"Task {task_id} completed and stored successfully")
-                
-                return jsonify({
-                    "success": True,
-                    "status": "completed",
-                    "asset_type": asset_type,
-                    "task_id": task_id,
-                    "asset": {
-                        "id": asset_id,
-                        "data_uri": asset_data['data_uri'],
-                        "filename": asset_data['filename'],
-                        "type": asset_type,
-                        "file_size": asset_data.get('file_size')
-                    },
-                    "variation": task_info.get('variation'),
-                    "message": f"{asset_type.capitalize()} generation completed successfully"
-                }), 200
-                
-            except Exception as e:
-                logger.error(f"Error processing completed task {task_id}: {e}")
-                task_info['status'] = 'failed'
-                task_info['error'] = str(e)
-                
-                return jsonify({
-                    "success": False,
-                    "status": "error",
-                    "error": f"Failed to process generated asset: {str(e)}",
-                    "task_id": task_id
-                }), 500
+        asset = creative_store.get_asset(task_id)
+        if asset:
+            # Task already completed and stored
+            logger.info(f"Task {task_id} completed, returning stored asset")
+            return jsonify({
+                "success": True,
+                "status": "completed",
+                "asset_type": task_info.get('asset_type'),
+                "task_id": task_id,
+                "asset": {
+                    "id": asset.get('id'),
+                    "url": asset.get('url'),
+                    "filename": asset.get('filename'),
+                    "type": asset.get('type'),
+                    "file_size": asset.get('file_size')
+                },
+                "variation": task_info.get('variation'),
+                "message": f"{task_info.get('asset_type').capitalize()} generation completed"
+            }), 200
         
-        else:
-            # Task failed or timed out
-            task_info['status'] = 'failed'
-            task_info['error'] = result.get('error', 'Unknown error')
-            
-            logger.error(f"Task {task_id} failed: {result.get('error')}")
+        if task_info.get('status') == 'failed':
+            logger.error(f"Task {task_id} failed: {task_info.get('error')}")
             
             return jsonify({
                 "success": False,
                 "status": "failed",
-                "error": result.get('error', 'Task failed'),
+                "error": task_info.get('error', 'Task failed'),
                 "task_id": task_id
             }), 200
+        
+        # Still running: the background poller keeps the record current (started
+        # here if this worker has none yet, e.g. right after a restart)
+        get_runway_poller()
+        return jsonify({
+            "success": True,
+            "status": task_info.get('status', 'processing'),
+            "runway_status": task_info.get('runway_status', 'PENDING'),
+            "progress": task_info.get('progress', 0.0),
+            "asset_type": task_info.get('asset_type'),
+            "task_id": task_id,
+            "variation": task_info.get('variation'),
+            "message": f"{task_info.get('asset_type').capitalize()} generation in progress"
+        }), 200
             
     except Exception as e:
         logger.error(f"Error checking status: {e}")
@@ -826,11 +921,10 @@ def get_generated_assets(campaign_id: str):
         return '', 200
     
     try:
-        if campaign_id not in tasks_store:
+        if creative_store.get_campaign(campaign_id) is None:
             return jsonify({"success": False, "error": "Campaign not found"}), 404
         
-        campaign = tasks_store[campaign_id]
-        generated_assets = campaign.get('generated_assets', [])
+        generated_assets = creative_store.campaign_assets(campaign_id)
         
         # Format assets for frontend
         formatted_assets = []
@@ -838,9 +932,9 @@ def get_generated_assets(campaign_id: str):
             formatted_assets.append({
                 "id": i + 1,  # Simple sequential ID for frontend
                 "title": asset.get('title', f"AI Generated {asset.get('type', 'image').capitalize()}"),
-                "image_url": asset.get('data_uri') if asset.get('type') == 'image' else None,
-                "video_url": asset.get('data_uri') if asset.get('type') == 'video' else None,
-                "data_uri": asset.get('data_uri'),
+                "image_url": asset.get('url') if asset.get('type') == 'image' else None,
+                "video_url": asset.get('url') if asset.get('type') == 'video' else None,
+                "url": asset.get('url'),
                 "prompt": asset.get('prompt', ''),
                 "score": asset.get('score', 85),
                 "type": "ai_generated_image" if asset.get('type') == 'image' else "ai_generated_video",
@@ -858,13 +952,25 @@ def get_generated_assets(campaign_id: str):
             "campaign_id": campaign_id,
             "assets": formatted_assets,
             "count": len(formatted_assets),
-            "total_generating": len(generation_tasks.get(campaign_id, []))
+            "total_generating": len(creative_store.campaign_task_ids(campaign_id))
         }), 200
         
     except Exception as e:
         logger.error(f"Error getting generated assets: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@creative_assets_bp.route('/api/assets/<asset_type>/<filename>', methods=['GET', 'OPTIONS'])
+def serve_asset(asset_type: str, filename: str):
+    """Serve a generated asset from disk (supports Range requests, so videos can seek)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    if asset_type not in ASSET_DIRS:
+        return jsonify({"success": False, "error": "Unknown asset type"}), 404
+    
+    # Filenames include the task ID and a timestamp, so they never change content
+    return send_from_directory(ASSET_DIRS[asset_type], filename, conditional=True, max_age=31536000)
+
 # Test endpoint to check video generation directly
 @creative_assets_bp.route('/api/test-video-generation', methods=['POST', 'OPTIONS'])
 def test_video_generation():
@@ -915,6 +1021,7 @@ def get_valid_ratios():
     return jsonify({
         "success": True,
         "valid_ratios": VALID_RATIOS,
+        "valid_video_ratios": VALID_VIDEO_RATIOS,
         "recommended_for_images": "1024:1024 (square), 1920:1080 (widescreen), 1080:1920 (portrait)",
         "recommended_for_videos": "1280:720 (HD), 1920:1080 (Full HD)"
     }), 200
@@ -927,7 +1034,9 @@ def health():
         "status": "healthy",
         "service": "creative-assets",
         "runway_configured": RUNWAY_API_KEY and RUNWAY_API_KEY != 'your_runway_api_key_here',
-        "campaigns_count": len(tasks_store),
-        "generation_tasks_count": sum(len(tasks) for tasks in generation_tasks.values()),
+        "campaigns_count": creative_store.campaign_count,
+        "generation_tasks_count": creative_store.task_count,
+        # Reported without starting the poller
+        "tasks_in_flight": get_runway_poller().in_flight_count() if "runway_poller" in registry.initialized() else 0,
         "valid_ratios_count": len(VALID_RATIOS)
     })
\ No newline at end of file
@@ -0,0 +1,436 @@
+# creative_store.py - Campaign, task and asset storage for creative generation
+#
+# Two interchangeable backends behind the same methods:
+#   MemoryCreativeStore - single process, bounded by LRU + TTL (default)
+#   SQLCreativeStore    - SQLite file or Postgres, shared by every worker and
+#                         surviving restarts
+#
+# Records are small JSON-able dicts. Large blobs (uploaded images, generated
+# assets) live on disk and are stored by path/URL only.
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# "memory" (default), "sqlite:///path/to/file.db" or "postgresql://..."
+CREATIVE_STORE_URL = os.environ.get('CREATIVE_STORE_URL', 'memory')
+
+# Campaigns untouched for this long are dropped together with their tasks/assets
+CAMPAIGN_TTL_SECONDS = int(os.environ.get('CAMPAIGN_TTL_SECONDS', 24 * 3600))
+
+# In-memory backend only: most campaigns kept before least recently used are evicted
+MAX_CAMPAIGNS = int(os.environ.get('MAX_CAMPAIGNS', 500))
+
+# SQL backend: how often expired rows are purged
+PURGE_INTERVAL_SECONDS = 300
+
+
+def _last_polled(task: dict) -> float:
+    return task.get("polled_at") or task.get("started_at") or 0.0
+
+
+class MemoryCreativeStore:
+    """
+    Per-process store with O(1) indexes:
+
+      campaign_id -> campaign record (LRU ordered, TTL from last use)
+      task_id     -> task record
+      campaign_id -> task IDs in creation order
+      task_id     -> completed asset record
+    """
+
+    def __init__(self, max_campaigns=MAX_CAMPAIGNS, ttl=CAMPAIGN_TTL_SECONDS):
+        self.max_campaigns = max_campaigns
+        self.ttl = ttl
+
+        self._campaigns = OrderedDict()  # campaign_id -> (record, expires_at)
+        self._tasks = {}
+        self._by_campaign = {}
+        self._assets = {}
+        self._lock = threading.RLock()
+
+    # ---------- campaigns ----------
+
+    def get_campaign(self, campaign_id: str):
+        with self._lock:
+            entry = self._campaigns.get(campaign_id)
+            if entry is None:
+                return None
+            record, expires_at = entry
+            if expires_at < time.time():
+                self._drop_campaign(campaign_id)
+                return None
+            self._campaigns[campaign_id] = (record, time.time() + self.ttl)
+            self._campaigns.move_to_end(campaign_id)
+            return dict(record)
+
+    def save_campaign(self, campaign_id: str, record: dict):
+        with self._lock:
+            self._campaigns[campaign_id] = (dict(record), time.time() + self.ttl)
+            self._campaigns.move_to_end(campaign_id)
+            self._evict()
+
+    def update_campaign(self, campaign_id: str, **changes):
+        with self._lock:
+            record = self.get_campaign(campaign_id)
+            if record is not None:
+                record.update(changes)
+                self.save_campaign(campaign_id, record)
+            return record
+
+    @property
+    def campaign_count(self) -> int:
+        return len(self._campaigns)
+
+    def _evict(self):
+        now = time.time()
+        expired = [cid for cid, (_, expires_at) in self._campaigns.items() if expires_at < now]
+        for campaign_id in expired:
+            self._drop_campaign(campaign_id)
+        while len(self._campaigns) > self.max_campaigns:
+            campaign_id = next(iter(self._campaigns))
+            logger.info(f"Evicting least recently used campaign {campaign_id}")
+            self._drop_campaign(campaign_id)
+
+    def _drop_campaign(self, campaign_id: str):
+        self._campaigns.pop(campaign_id, None)
+        for task_id in self._by_campaign.pop(campaign_id, []):
+            self._tasks.pop(task_id, None)
+            self._assets.pop(task_id, None)
+
+    # ---------- tasks ----------
+
+    def add_task(self, task_info: dict):
+        task_id = task_info["task_id"]
+        with self._lock:
+            if task_id not in self._tasks:
+                self._by_campaign.setdefault(task_info["campaign_id"], []).append(task_id)
+            self._tasks[task_id] = dict(task_info)
+        return task_info
+
+    def get_task(self, task_id: str):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return dict(task) if task else None
+
+    def update_task(self, task_id: str, **changes):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            task.update(changes)
+            return dict(task)
+
+    def claim_task(self, task_id: str, expected_status: str, **changes) -> bool:
+        """Apply `changes` only if the task is still in `expected_status`; True if it was"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.get("status") != expected_status:
+                return False
+            task.update(changes)
+            return True
+
+    def pending_task_ids(self, stale_before: float):
+        """Runway tasks still processing that nobody has polled since `stale_before`"""
+        with self._lock:
+            return [
+                task_id for task_id, task in self._tasks.items()
+                if task.get("status") == "processing" and not task.get("kind") and _last_polled(task) < stale_before
+            ]
+
+    def campaign_task_ids(self, campaign_id: str):
+        with self._lock:
+            return list(self._by_campaign.get(campaign_id, []))
+
+    def reset_campaign(self, campaign_id: str):
+        """Forget every task (and asset) of a campaign"""
+        with self._lock:
+            for task_id in self._by_campaign.pop(campaign_id, []):
+                self._tasks.pop(task_id, None)
+                self._assets.pop(task_id, None)
+
+    @property
+    def task_count(self) -> int:
+        return len(self._tasks)
+
+    # ---------- assets ----------
+
+    def set_asset(self, task_id: str, asset_info: dict):
+        with self._lock:
+            self._assets[task_id] = dict(asset_info)
+
+    def get_asset(self, task_id: str):
+        with self._lock:
+            asset = self._assets.get(task_id)
+            return dict(asset) if asset else None
+
+    def campaign_assets(self, campaign_id: str, asset_type: str = None):
+        """Completed assets of a campaign, oldest first"""
+        with self._lock:
+            assets = [
+                dict(self._assets[t]) for t in self._by_campaign.get(campaign_id, [])
+                if t in self._assets and (asset_type is None or self._assets[t].get("type") == asset_type)
+            ]
+        return sorted(assets, key=lambda a: a.get("created_at", 0))
+
+    def remove_assets(self, campaign_id: str, asset_type: str = None):
+        """
+        Drop a campaign's completed assets (optionally only one type). Segments
+        of a video sequence (tagged with sequence_id) are kept: the sequence
+        still needs them until it is stitched.
+        """
+        with self._lock:
+            for task_id in self._by_campaign.get(campaign_id, []):
+                asset = self._assets.get(task_id)
+                if asset and not asset.get("sequence_id") and (asset_type is None or asset.get("type") == asset_type):
+                    del self._assets[task_id]
+
+
+class SQLCreativeStore:
+    """
+    Same interface backed by SQLite or Postgres, so several gunicorn workers
+    see the same campaigns and a restart loses nothing. Records are JSON text;
+    task updates are merged in SQL so concurrent writers don't clobber each other.
+    """
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS creative_campaigns (
+            campaign_id TEXT PRIMARY KEY,
+            record TEXT NOT NULL,
+            updated_at DOUBLE PRECISION NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS creative_tasks (
+            task_id TEXT PRIMARY KEY,
+            campaign_id TEXT NOT NULL,
+            record TEXT NOT NULL,
+            created_at DOUBLE PRECISION NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_creative_tasks_campaign ON creative_tasks (campaign_id, created_at)",
+        """CREATE TABLE IF NOT EXISTS creative_assets (
+            task_id TEXT PRIMARY KEY,
+            campaign_id TEXT NOT NULL,
+            asset_type TEXT,
+            record TEXT NOT NULL,
+            created_at DOUBLE PRECISION NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_creative_assets_campaign ON creative_assets (campaign_id, created_at)",
+    ]
+
+    def __init__(self, url: str, ttl=CAMPAIGN_TTL_SECONDS):
+        self.url = url
+        self.ttl = ttl
+        self.postgres = url.startswith(("postgres://", "postgresql://"))
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+        if self.postgres:
+            import psycopg2
+            self._connect = lambda: psycopg2.connect(url)
+            self._param = "%s"
+        else:
+            path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else url
+            self._connect = lambda: sqlite3.connect(path, timeout=10)
+            self._param = "?"
+
+        with self._conn() as conn:
+            cur = conn.cursor()
+            for statement in self.SCHEMA:
+                cur.execute(statement)
+
+    def _conn(self):
+        """One connection per thread, reused across calls"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _merge(self, changes: dict):
+        """
+        SQL expression merging `changes` into the stored record, and its params.
+        Keys set to None are kept as JSON null on both backends (SQLite's
+        json_patch would delete them), matching the in-memory store.
+        """
+        if self.postgres:
+            return "(record::jsonb || ?::jsonb)::text", [json.dumps(changes)]
+        if not changes:
+            return "record", []
+        params = []
+        for key, value in changes.items():
+            params += [f'$."{key}"', json.dumps(value)]
+        return f"json_set(record, {', '.join(['?, json(?)'] * len(changes))})", params
+
+    def _field(self, name: str) -> str:
+        """SQL expression for a top-level field of the stored record, as text"""
+        if self.postgres:
+            return f"(record::jsonb ->> '{name}')"
+        return f"json_extract(record, '$.{name}')"
+
+    def _execute(self, sql: str, params=(), fetch=None):
+        conn = self._conn()
+        with conn:
+            cur = conn.cursor()
+            cur.execute(sql.replace("?", self._param), params)
+            if fetch == "one":
+                return cur.fetchone()
+            if fetch == "all":
+                return cur.fetchall()
+            return cur.rowcount
+
+    # ---------- campaigns ----------
+
+    def get_campaign(self, campaign_id: str):
+        row = self._execute(
+            "SELECT record, updated_at FROM creative_campaigns WHERE campaign_id = ?",
+            (campaign_id,), fetch="one"
+        )
+        if row is None or row[1] < time.time() - self.ttl:
+            return None
+        self._execute("UPDATE creative_campaigns SET updated_at = ? WHERE campaign_id = ?", (time.time(), campaign_id))
+        return json.loads(row[0])
+
+    def save_campaign(self, campaign_id: str, record: dict):
+        self._execute(
+            """
+            INSERT INTO creative_campaigns (campaign_id, record, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (campaign_id) DO UPDATE SET record = excluded.record, updated_at = excluded.updated_at
+            """,
+            (campaign_id, json.dumps(record), time.time())
+        )
+        self._maybe_purge()
+
+    def update_campaign(self, campaign_id: str, **changes):
+        merge, params = self._merge(changes)
+        self._execute(
+            f"UPDATE creative_campaigns SET record = {merge}, updated_at = ? WHERE campaign_id = ?",
+            (*params, time.time(), campaign_id)
+        )
+        return self.get_campaign(campaign_id)
+
+    @property
+    def campaign_count(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM creative_campaigns", fetch="one")[0]
+
+    def _maybe_purge(self):
+        if time.time() - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.time()
+        cutoff = time.time() - self.ttl
+        expired = "SELECT campaign_id FROM creative_campaigns WHERE updated_at < ?"
+        self._execute(f"DELETE FROM creative_assets WHERE campaign_id IN ({expired})", (cutoff,))
+        self._execute(f"DELETE FROM creative_tasks WHERE campaign_id IN ({expired})", (cutoff,))
+        removed = self._execute("DELETE FROM creative_campaigns WHERE updated_at < ?", (cutoff,))
+        if removed:
+            logger.info(f"Purged {removed} expired campaigns")
+
+    # ---------- tasks ----------
+
+    def add_task(self, task_info: dict):
+        self._execute(
+            """
+            INSERT INTO creative_tasks (task_id, campaign_id, record, created_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (task_id) DO UPDATE SET record = excluded.record
+            """,
+            (task_info["task_id"], task_info["campaign_id"], json.dumps(task_info),
+             task_info.get("started_at", time.time()))
+        )
+        return task_info
+
+    def get_task(self, task_id: str):
+        row = self._execute("SELECT record FROM creative_tasks WHERE task_id = ?", (task_id,), fetch="one")
+        return json.loads(row[0]) if row else None
+
+    def update_task(self, task_id: str, **changes):
+        merge, params = self._merge(changes)
+        self._execute(
+            f"UPDATE creative_tasks SET record = {merge} WHERE task_id = ?",
+            (*params, task_id)
+        )
+        return self.get_task(task_id)
+
+    def claim_task(self, task_id: str, expected_status: str, **changes) -> bool:
+        merge, params = self._merge(changes)
+        claimed = self._execute(
+            f"UPDATE creative_tasks SET record = {merge} WHERE task_id = ? AND {self._field('status')} = ?",
+            (*params, task_id, expected_status)
+        )
+        return claimed > 0
+
+    def pending_task_ids(self, stale_before: float):
+        rows = self._execute(
+            f"SELECT record FROM creative_tasks WHERE {self._field('status')} = 'processing' "
+            f"AND {self._field('kind')} IS NULL",
+            fetch="all"
+        )
+        records = [json.loads(row[0]) for row in rows]
+        return [r["task_id"] for r in records if _last_polled(r) < stale_before]
+
+    def campaign_task_ids(self, campaign_id: str):
+        rows = self._execute(
+            "SELECT task_id FROM creative_tasks WHERE campaign_id = ? ORDER BY created_at",
+            (campaign_id,), fetch="all"
+        )
+        return [row[0] for row in rows]
+
+    def reset_campaign(self, campaign_id: str):
+        self._execute("DELETE FROM creative_assets WHERE campaign_id = ?", (campaign_id,))
+        self._execute("DELETE FROM creative_tasks WHERE campaign_id = ?", (campaign_id,))
+
+    @property
+    def task_count(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM creative_tasks", fetch="one")[0]
+
+    # ---------- assets ----------
+
+    def set_asset(self, task_id: str, asset_info: dict):
+        self._execute(
+            """
+            INSERT INTO creative_assets (task_id, campaign_id, asset_type, record, created_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (task_id) DO UPDATE SET record = excluded.record
+            """,
+            (task_id, asset_info["campaign_id"], asset_info.get("type"), json.dumps(asset_info),
+             asset_info.get("created_at", time.time()))
+        )
+
+    def get_asset(self, task_id: str):
+        row = self._execute("SELECT record FROM creative_assets WHERE task_id = ?", (task_id,), fetch="one")
+        return json.loads(row[0]) if row else None
+
+    def campaign_assets(self, campaign_id: str, asset_type: str = None):
+        if asset_type is None:
+            rows = self._execute(
+                "SELECT record FROM creative_assets WHERE campaign_id = ? ORDER BY created_at",
+                (campaign_id,), fetch="all"
+            )
+        else:
+            rows = self._execute(
+                "SELECT record FROM creative_assets WHERE campaign_id = ? AND asset_type = ? ORDER BY created_at",
+                (campaign_id, asset_type), fetch="all"
+            )
+        return [json.loads(row[0]) for row in rows]
+
+    def remove_assets(self, campaign_id: str, asset_type: str = None):
+        keep_segments = f"{self._field('sequence_id')} IS NULL"
+        if asset_type is None:
+            self._execute(
+                f"DELETE FROM creative_assets WHERE campaign_id = ? AND {keep_segments}",
+                (campaign_id,)
+            )
+        else:
+            self._execute(
+                f"DELETE FROM creative_assets WHERE campaign_id = ? AND asset_type = ? AND {keep_segments}",
+                (campaign_id, asset_type)
+            )
+
+
+def create_store(url: str = CREATIVE_STORE_URL):
+    """Store selected by CREATIVE_STORE_URL"""
+    if not url or url == "memory":
+        logger.info("Creative store: in-memory (LRU + TTL)")
+        return MemoryCreativeStore()
+    logger.info(f"Creative store: {url.split('://')[0]}")
+    return SQLCreativeStore(url)
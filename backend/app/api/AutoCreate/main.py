@@ -3,30 +3,43 @@ import os
 from flask import Flask
 from flask_cors import CORS
 
-app = Flask(__name__)
-CORS(app, origins=["*"])
-
-# Import blueprints
-from audience_step import audience_bp
-from budget_testing import budget_testing_bp
-from campaign_goal import campaign_goal_bp
-from copy_messaging import copy_messaging_bp
-from creative_assets import creative_assets_bp
-
-# Register blueprints
-app.register_blueprint(audience_bp)
-app.register_blueprint(budget_testing_bp)
-app.register_blueprint(campaign_goal_bp)
-app.register_blueprint(copy_messaging_bp)
-app.register_blueprint(creative_assets_bp)
-
-@app.route("/")
-def root():
-    return {"service": "AutoCreate", "status": "running"}
-
-@app.route("/health")
-def health():
-    return {"status": "healthy"}, 200
+from clients import registry
+
+
+def create_app():
+    """
+    Build the AutoCreate app. Blueprints share one client registry, so Groq,
+    Supabase and Runway are each created once per process, on the first request needing them.
+    """
+    app = Flask(__name__)
+    CORS(app, origins=["*"])
+
+    # Import blueprints
+    from audience_step import audience_bp
+    from budget_testing import budget_testing_bp
+    from campaign_goal import campaign_goal_bp
+    from copy_messaging import copy_messaging_bp
+    from creative_assets import creative_assets_bp
+
+    # Register blueprints
+    app.register_blueprint(audience_bp)
+    app.register_blueprint(budget_testing_bp)
+    app.register_blueprint(campaign_goal_bp)
+    app.register_blueprint(copy_messaging_bp)
+    app.register_blueprint(creative_assets_bp)
+
+    @app.route("/")
+    def root():
+        return {"service": "AutoCreate", "status": "running"}
+
+    @app.route("/health")
+    def health():
+        return {"status": "healthy", "clients": sorted(registry.initialized())}, 200
+
+    return app
+
+
+app = create_app()
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5050))
@@ -40,7 +53,9 @@ if __name__ == "__main__":
     print(f"📁 Available Endpoints:")
     print(f"  • /api/upload-image        - Upload product images")
     print(f"  • /api/generate-assets     - Generate ad variations")
+    print(f"  • /api/generate-video-sequence - Generate one stitched, continuous ad video")
     print(f"  • /api/save-selected-assets - Save selected assets")
+    print(f"  • /api/assets/<type>/<file> - Download generated assets")
     print(f"  • /api/create-campaign     - Create new campaign")
     print(f"  • /api/get-campaign/<id>   - Get campaign details")
     print("=" * 60)
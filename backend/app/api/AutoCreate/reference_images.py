@@ -0,0 +1,168 @@
+# reference_images.py - Deduplicated, normalized product uploads and their Runway references
+import os
+import io
+import glob
+import base64
+import hashlib
+import threading
+import time
+import logging
+from concurrent.futures import Future
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploaded_images")
+
+# Longest side sent to Runway; larger uploads are downscaled before storing
+REFERENCE_MAX_SIDE = int(os.environ.get('REFERENCE_MAX_SIDE', 2048))
+REFERENCE_QUALITY = int(os.environ.get('REFERENCE_QUALITY', 88))
+
+# Upload references to Runway once and send them by runway:// URI instead of inline base64
+RUNWAY_REFERENCE_UPLOADS = os.environ.get('RUNWAY_REFERENCE_UPLOADS', 'true').lower() == 'true'
+# Ephemeral uploads expire after 24h upstream; re-upload a little before that
+REFERENCE_URI_TTL = int(os.environ.get('REFERENCE_URI_TTL', 23 * 3600))
+# After a failed upload, send data URIs for this long instead of waiting on the endpoint again
+REFERENCE_UPLOAD_RETRY_AFTER = int(os.environ.get('REFERENCE_UPLOAD_RETRY_AFTER', 60))
+
+FORMAT_MIMETYPES = {"jpg": "image/jpeg", "webp": "image/webp"}
+
+
+def normalize_image(image_bytes: bytes):
+    """
+    Downscale to REFERENCE_MAX_SIDE and re-encode: JPEG, or WebP when the
+    image has transparency. Returns (bytes, extension, width, height).
+    """
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((REFERENCE_MAX_SIDE, REFERENCE_MAX_SIDE), Image.LANCZOS)
+
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        buffer = io.BytesIO()
+        if has_alpha:
+            img.convert("RGBA").save(buffer, "WEBP", quality=REFERENCE_QUALITY, method=4)
+            ext = "webp"
+        else:
+            img.convert("RGB").save(buffer, "JPEG", quality=REFERENCE_QUALITY, optimize=True, progressive=True)
+            ext = "jpg"
+        return buffer.getvalue(), ext, img.width, img.height
+
+
+def decode_upload(image_data: str) -> bytes:
+    """Base64 upload (optionally a data URI) -> raw bytes"""
+    if ',' in image_data:
+        image_data = image_data.split(',', 1)[1]
+    return base64.b64decode(image_data)
+
+
+def find_upload(content_hash: str):
+    """Stored file for an already-seen upload, or None"""
+    matches = glob.glob(os.path.join(UPLOAD_DIR, f"{content_hash}.*"))
+    return next((path for path in matches if not path.endswith(".part")), None)
+
+
+def store_upload(image_bytes: bytes) -> dict:
+    """
+    Store an upload under its content hash. Re-uploads of the same bytes
+    reuse the stored file instead of decoding and writing it again.
+    """
+    content_hash = hashlib.sha256(image_bytes).hexdigest()
+    filepath = find_upload(content_hash)
+    deduplicated = filepath is not None
+
+    if not deduplicated:
+        normalized, ext, width, height = normalize_image(image_bytes)
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        filepath = os.path.join(UPLOAD_DIR, f"{content_hash}.{ext}")
+        tmp_path = f"{filepath}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(normalized)
+        os.replace(tmp_path, filepath)
+        logger.info(f"Image saved to: {filepath} ({len(image_bytes)} -> {len(normalized)} bytes, {width}x{height})")
+    else:
+        logger.info(f"♻️ Reusing stored upload: {filepath}")
+
+    return {
+        "content_hash": content_hash,
+        "filepath": filepath,
+        "file_size": os.path.getsize(filepath),
+        "deduplicated": deduplicated,
+    }
+
+
+def load_data_uri(filepath: str) -> str:
+    """Inline data URI for a stored upload"""
+    mime_type = FORMAT_MIMETYPES.get(filepath.rsplit('.', 1)[-1].lower(), "image/jpeg")
+    with open(filepath, "rb") as f:
+        return f"data:{mime_type};base64,{base64.b64encode(f.read()).decode('utf-8')}"
+
+
+class ReferenceUploader:
+    """
+    Resolves a stored upload to the URI sent in Runway task requests: a
+    runway:// URI uploaded once per content hash, or an inline data URI when
+    uploads are disabled or fail.
+
+    Uploads run outside the shared lock: concurrent requests for the same hash
+    wait on the one upload in flight, other hashes are not held up. After a
+    failure, uploads are skipped for `retry_after` seconds so an outage costs
+    one timeout, not one per request.
+    """
+
+    def __init__(self, client, enabled: bool = RUNWAY_REFERENCE_UPLOADS, ttl: int = REFERENCE_URI_TTL,
+                 retry_after: int = REFERENCE_UPLOAD_RETRY_AFTER):
+        self.client = client
+        self.enabled = enabled
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._uris = {}  # content_hash -> (runway_uri, expires_at)
+        self._in_flight = {}  # content_hash -> Future of the runway_uri (None on failure)
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def reference_uri(self, filepath: str, content_hash: str = None) -> str:
+        if not self.enabled or not content_hash:
+            return load_data_uri(filepath)
+
+        with self._lock:
+            now = time.time()
+            cached = self._uris.get(content_hash)
+            if cached and cached[1] > now:
+                return cached[0]
+
+            future = self._in_flight.get(content_hash)
+            uploading = future is None and now >= self._retry_at
+            if uploading:
+                future = self._in_flight[content_hash] = Future()
+
+        if future is None:
+            # Uploads failed recently
+            return load_data_uri(filepath)
+        if not uploading:
+            return future.result() or load_data_uri(filepath)
+
+        runway_uri = None
+        try:
+            runway_uri = self._upload(filepath)
+        except Exception as e:
+            logger.warning(f"Reference upload failed, sending inline data URIs for {self.retry_after}s: {e}")
+            with self._lock:
+                self._retry_at = time.time() + self.retry_after
+        else:
+            with self._lock:
+                self._uris[content_hash] = (runway_uri, time.time() + self.ttl)
+            logger.info(f"Uploaded reference image {content_hash[:12]} as {runway_uri}")
+        finally:
+            with self._lock:
+                self._in_flight.pop(content_hash, None)
+            future.set_result(runway_uri)
+
+        return runway_uri or load_data_uri(filepath)
+
+    def _upload(self, filepath: str) -> str:
+        filename = os.path.basename(filepath)
+        with open(filepath, "rb") as f:
+            content = f.read()
+        return self.client.upload(filename, content, FORMAT_MIMETYPES.get(
+            filename.rsplit('.', 1)[-1].lower(), "image/jpeg"))
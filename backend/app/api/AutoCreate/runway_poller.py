@@ -0,0 +1,194 @@
+# runway_poller.py - One background loop polling every in-flight Runway task
+import os
+import heapq
+import threading
+import time
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Adaptive schedule: (age in seconds up to which this interval applies, interval)
+# Images usually finish in well under a minute; videos take minutes, so they
+# start slower and back off further.
+POLL_SCHEDULES = {
+    "image": [(15, 1.0), (60, 2.0), (float("inf"), 5.0)],
+    "video": [(30, 3.0), (120, 5.0), (float("inf"), 10.0)],
+}
+
+# Give up on a task after this long (the old per-request loop allowed 300 x 2s)
+TASK_TIMEOUTS = {
+    "image": int(os.environ.get("RUNWAY_IMAGE_TIMEOUT", 300)),
+    "video": int(os.environ.get("RUNWAY_VIDEO_TIMEOUT", 600)),
+}
+
+FAILED_STATUSES = {"FAILED", "CANCELED", "CANCELLED"}
+
+# Tasks in a shared store that nobody has polled for ORPHAN_AFTER seconds (their
+# worker restarted or died) are picked up by whichever poller scans next.
+# ORPHAN_AFTER must stay above the longest poll interval.
+ORPHAN_SCAN_INTERVAL = int(os.environ.get("RUNWAY_ORPHAN_SCAN_INTERVAL", 30))
+ORPHAN_AFTER = int(os.environ.get("RUNWAY_ORPHAN_AFTER", 60))
+
+
+def poll_interval(asset_type: str, age: float) -> float:
+    for max_age, interval in POLL_SCHEDULES.get(asset_type, POLL_SCHEDULES["image"]):
+        if age <= max_age:
+            return interval
+    return POLL_SCHEDULES["image"][-1][1]
+
+
+class RunwayPoller:
+    """
+    Tracks in-flight generation tasks and polls Runway for all of them from
+    one daemon thread, updating the records in the creative store:
+
+      processing -> downloading -> completed | failed
+
+    Every poll stamps the task's polled_at. The loop also adopts tasks left
+    "processing" by another process (see ORPHAN_AFTER), so with a shared
+    store a restart or a dead worker does not strand them. Status changes
+    are claimed in the store (processing -> ...), so a task adopted by two
+    pollers is still finalized once.
+
+    fetch_status(task_id) -> Runway task JSON
+    on_success(task_info, output_url) -> runs on a worker thread and stores the asset
+    """
+
+    def __init__(self, store, fetch_status, on_success, workers=4,
+                 orphan_scan_interval=ORPHAN_SCAN_INTERVAL, orphan_after=ORPHAN_AFTER):
+        self.store = store
+        self.fetch_status = fetch_status
+        self.on_success = on_success
+        self.orphan_scan_interval = orphan_scan_interval
+        self.orphan_after = orphan_after
+
+        self._queue = []  # heap of (next_poll_at, task_id)
+        self._tracked = set()  # queued or being checked
+        self._next_scan_at = 0.0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="runway-download")
+
+    def start(self):
+        """Run the polling loop (its first pass adopts orphaned tasks)"""
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="runway-poller", daemon=True)
+                self._thread.start()
+
+    def track(self, task_id: str):
+        """Start polling a task that is already in the store"""
+        with self._cond:
+            if task_id in self._tracked:
+                return
+            self._tracked.add(task_id)
+            heapq.heappush(self._queue, (time.time(), task_id))
+            self._cond.notify()
+        self.start()
+
+    def in_flight_count(self) -> int:
+        with self._cond:
+            return len(self._tracked)
+
+    # ---------- internals ----------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while (not self._queue or self._queue[0][0] > time.time()) and time.time() < self._next_scan_at:
+                    wake_at = min(self._queue[0][0], self._next_scan_at) if self._queue else self._next_scan_at
+                    self._cond.wait(timeout=wake_at - time.time())
+                due = []
+                now = time.time()
+                while self._queue and self._queue[0][0] <= now:
+                    due.append(heapq.heappop(self._queue)[1])
+
+            if now >= self._next_scan_at:
+                self._next_scan_at = now + self.orphan_scan_interval
+                self._adopt_orphans()
+
+            for task_id in due:
+                try:
+                    next_poll = self._check(task_id)
+                except Exception as e:
+                    # e.g. the store is briefly unreachable; keep the loop alive
+                    logger.error(f"Error checking task {task_id}: {e}")
+                    next_poll = time.time() + POLL_SCHEDULES["image"][-1][1]
+                with self._cond:
+                    if next_poll is None:
+                        self._tracked.discard(task_id)
+                    else:
+                        heapq.heappush(self._queue, (next_poll, task_id))
+
+    def _adopt_orphans(self):
+        try:
+            orphans = self.store.pending_task_ids(time.time() - self.orphan_after)
+        except Exception as e:
+            logger.error(f"Error scanning for orphaned tasks: {e}")
+            return
+        with self._cond:
+            orphans = [task_id for task_id in orphans if task_id not in self._tracked]
+        if orphans:
+            logger.info(f"♻️ Adopting {len(orphans)} orphaned task(s): {orphans}")
+        for task_id in orphans:
+            self.track(task_id)
+
+    def _check(self, task_id: str):
+        """Poll one task; returns when to poll it next, or None when it is done"""
+        task_info = self.store.get_task(task_id)
+        if task_info is None or task_info.get("status") != "processing":
+            return None
+
+        asset_type = task_info.get("asset_type", "image")
+        age = time.time() - task_info.get("started_at", time.time())
+
+        if age > TASK_TIMEOUTS.get(asset_type, TASK_TIMEOUTS["image"]):
+            logger.error(f"Task {task_id} polling timeout after {int(age)} seconds")
+            self.store.claim_task(task_id, "processing", status="failed",
+                                  error=f"Task polling timeout after {int(age)} seconds")
+            return None
+
+        try:
+            task = self.fetch_status(task_id)
+        except Exception as e:
+            # Transient: try again on the next pass
+            logger.error(f"Error polling task {task_id}: {e}")
+            self.store.update_task(task_id, polled_at=time.time())
+            return time.time() + poll_interval(asset_type, age)
+
+        status = task.get("status")
+        if status == "SUCCEEDED":
+            output_url = task.get("output", [])[0] if task.get("output") else None
+            if not output_url:
+                logger.error(f"Task succeeded but no output URL: {task}")
+                self.store.claim_task(task_id, "processing", status="failed", error="Task succeeded without output")
+                return None
+
+            # Only the poller that moves the task to downloading stores the asset
+            if self.store.claim_task(task_id, "processing", status="downloading", runway_status=status,
+                                     progress=1.0, polled_at=time.time()):
+                logger.info(f"Task {task_id} succeeded! Output URL: {output_url[:50]}...")
+                self._executor.submit(self._finalize, task_info, output_url)
+            return None
+
+        if status in FAILED_STATUSES:
+            error_message = (task.get("error") or {}).get("message") or task.get("failure") or "Unknown error"
+            logger.error(f"Task {task_id} failed: {error_message}")
+            self.store.claim_task(task_id, "processing", status="failed", runway_status=status, error=error_message)
+            return None
+
+        self.store.update_task(task_id, runway_status=status, progress=task.get("progress") or 0.0,
+                               polled_at=time.time())
+        return time.time() + poll_interval(asset_type, age)
+
+    def _finalize(self, task_info: dict, output_url: str):
+        task_id = task_info["task_id"]
+        try:
+            self.on_success(task_info, output_url)
+        except Exception as e:
+            logger.error(f"Error processing completed task {task_id}: {e}")
+            logger.error(traceback.format_exc())
+            self.store.claim_task(task_id, "downloading", status="failed",
+                                  error=f"Failed to process generated asset: {str(e)}")
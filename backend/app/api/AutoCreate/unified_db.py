@@ -1,40 +1,25 @@
 # unified_db.py
-import jwt
+import json
 from datetime import datetime
 import os
+import sys
 from dotenv import load_dotenv
-import uuid
+
+# Token verification is shared with the Authentication service (backend/app/utils);
+# the blueprints import require_user from here
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from app.utils.jwt_auth import decode_user_id, require_user  # noqa: F401
 
 load_dotenv()
 
-SECRET_KEY = os.getenv('SECRET_KEY')
+# Postgres function doing the whole save in one statement (backend/app/models/auto_create.sql)
+CAMPAIGN_UPSERT_RPC = os.getenv('CAMPAIGN_UPSERT_RPC', 'upsert_auto_create_campaign')
+_upsert_rpc_available = True
 
 def decode_jwt_token(token):
-    """Decode JWT token to get user_id"""
-    try:
-        if not isinstance(token, str):
-            token = str(token) if token else ''
-        
-        token = token.strip()
-        
-        if not token:
-            raise ValueError("Empty token")
-        
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        user_id = payload.get('user_id')
-        
-        if not user_id:
-            raise ValueError("No user_id in token payload")
-        
-        return str(user_id)
-        
-    except jwt.ExpiredSignatureError:
-        raise ValueError("Token has expired. Please login again.")
-    except jwt.InvalidTokenError as e:
-        raise ValueError(f"Invalid token: {str(e)}")
-    except Exception as e:
-        raise ValueError(f"Failed to decode token: {str(e)}")
-    
+    """Decode JWT token to get user_id (verified once, then served from the shared cache)"""
+    return decode_user_id(token)
+
 def save_assets_to_campaign(supabase, user_id, assets_data, campaign_id):
     """Save assets to a specific campaign"""
     try:
@@ -65,12 +50,87 @@ def save_assets_to_campaign(supabase, user_id, assets_data, campaign_id):
         }
 
 
-def handle_campaign_save(supabase, current_user, data, campaign_id=None):
+def _rpc_missing(error):
+    """True only when PostgREST reports the upsert function isn't deployed (PGRST202)"""
+    return getattr(error, 'code', None) == 'PGRST202' or 'PGRST202' in str(error)
+
+def handle_campaign_save(supabase, current_user, data, campaign_id=None, defaults=None):
     """
     Unified function to handle campaign saves
     - If campaign_id provided: update that specific campaign
-    - If no campaign_id: check for active campaign, if exists update it, else create new
+    - If no campaign_id: update the active campaign if one exists, else create it
+    - defaults: columns set only when the campaign is created (overridden by data)
+    
+    One round trip through the upsert RPC, which also returns the saved row
+    ('campaign'). Falls back to the request-per-step path until the function
+    is deployed.
     """
+    global _upsert_rpc_available
+    
+    # The dev mock clients have no rpc(); that says nothing about the database
+    if not _upsert_rpc_available or not hasattr(supabase, 'rpc'):
+        return _handle_campaign_save_legacy(supabase, current_user, data, campaign_id, defaults)
+    
+    try:
+        # Convert campaign_id to integer if it's a string and not empty
+        if campaign_id and isinstance(campaign_id, str):
+            try:
+                campaign_id = int(campaign_id)
+            except ValueError:
+                print(f"Warning: campaign_id is not an integer: {campaign_id}")
+                campaign_id = None
+        if not isinstance(campaign_id, int):
+            campaign_id = None
+        
+        # Assets are stored in the same row, in the same statement
+        step_data = dict(data)
+        assets_data = step_data.pop('assets', None) or step_data.pop('selected_asset_ids', None)
+        if assets_data:
+            step_data['assets'] = json.dumps(assets_data) if not isinstance(assets_data, str) else assets_data
+        
+        params = {
+            'p_user_id': str(current_user),
+            'p_data': step_data,
+            'p_campaign_id': campaign_id
+        }
+        if defaults:
+            params['p_defaults'] = defaults
+        
+        try:
+            response = supabase.rpc(CAMPAIGN_UPSERT_RPC, params).execute()
+        except Exception as e:
+            if not _rpc_missing(e):
+                raise
+            print(f"⚠️ {CAMPAIGN_UPSERT_RPC} RPC unavailable, using per-step queries: {e}")
+            _upsert_rpc_available = False
+            return _handle_campaign_save_legacy(supabase, current_user, data, campaign_id, defaults)
+        
+        if not response.data:
+            return {
+                'success': False,
+                'error': 'Campaign not found or access denied' if campaign_id else 'Failed to save campaign'
+            }
+        
+        campaign = response.data[0]
+        # The function stamps both on insert, only updated_at on update
+        is_update = campaign.get('created_at') != campaign.get('updated_at')
+        return {
+            'success': True,
+            'campaign_id': campaign['id'],
+            'is_update': is_update,
+            'is_new_version': False,
+            'version': campaign.get('version', 1),
+            'campaign': campaign
+        }
+    
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+def _handle_campaign_save_legacy(supabase, current_user, data, campaign_id=None, defaults=None):
+    """Request-per-step save, used while the upsert RPC is not deployed"""
     try:
         # Convert campaign_id to integer if it's a string and not empty
         if campaign_id and isinstance(campaign_id, str):
@@ -149,6 +209,7 @@ def handle_campaign_save(supabase, current_user, data, campaign_id=None):
                 'version': 1,
                 'created_at': datetime.now().isoformat(),
                 'updated_at': datetime.now().isoformat(),
+                **(defaults or {}),
                 **data
             }
             
@@ -0,0 +1,216 @@
+# video_sequence.py - Render a continuous ad from chained video segments and stitch it with ffmpeg
+import os
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import traceback
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+logger = logging.getLogger(__name__)
+
+# Segments that start again from the product image instead of the previous
+# segment's last frame (1-based). Every other segment continues the one before
+# it, so each run of chained segments renders in order while separate runs
+# render in parallel. The default follows CONTINUOUS_VIDEO_SEQUENCE.md: zoom ->
+# rotation -> close-up are one continuous shot, the lifestyle scene cuts away.
+SEQUENCE_FRESH_STARTS = [
+    int(n) for n in os.environ.get('VIDEO_SEQUENCE_FRESH_STARTS', '4').split(',') if n.strip()
+]
+SEQUENCE_CHAIN_WORKERS = int(os.environ.get('VIDEO_SEQUENCE_CHAIN_WORKERS', 3))
+SEGMENT_WAIT_INTERVAL = 1.0
+# A whole sequence fails once it has run this long, whatever its segments are doing
+SEQUENCE_TIMEOUT = int(os.environ.get('VIDEO_SEQUENCE_TIMEOUT', 3600))
+FFMPEG_TIMEOUT = 120
+
+_ffmpeg_exe = None
+
+
+def ffmpeg_exe() -> str:
+    """The ffmpeg binary bundled with imageio-ffmpeg (FFMPEG_BINARY overrides it)"""
+    global _ffmpeg_exe
+    if _ffmpeg_exe is None:
+        _ffmpeg_exe = os.environ.get("FFMPEG_BINARY")
+        if not _ffmpeg_exe:
+            import imageio_ffmpeg
+            _ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+    return _ffmpeg_exe
+
+
+def run_ffmpeg(args: list):
+    try:
+        subprocess.run([ffmpeg_exe(), "-y", "-loglevel", "error", *args],
+                       check=True, capture_output=True, timeout=FFMPEG_TIMEOUT)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg failed: {e.stderr.decode('utf-8', 'replace').strip()}") from e
+
+
+def extract_last_frame(video_path: str, frame_path: str) -> str:
+    """Write the final frame of a clip as a JPEG"""
+    # Seek to just before the end and keep overwriting the image: the last decoded frame wins
+    run_ffmpeg(["-sseof", "-0.5", "-i", video_path, "-update", "1", "-q:v", "2", frame_path])
+    return frame_path
+
+
+def concat_videos(video_paths: list, output_path: str) -> str:
+    """
+    Join clips end to end with the concat demuxer and stream copy (no re-encode).
+    The clips must share codec, resolution and frame rate, which segments of
+    one sequence do since they come from the same model and ratio.
+    """
+    with tempfile.TemporaryDirectory(prefix="sequence-") as tmp_dir:
+        list_path = os.path.join(tmp_dir, "segments.txt")
+        with open(list_path, "w") as f:
+            for path in video_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        tmp_output = os.path.join(tmp_dir, "sequence.mp4")
+        run_ffmpeg(["-f", "concat", "-safe", "0", "-i", list_path,
+                    "-c", "copy", "-movflags", "+faststart", tmp_output])
+        shutil.move(tmp_output, output_path)
+    return output_path
+
+
+def plan_chains(num_segments: int, fresh_starts=None) -> list:
+    """
+    Group segment numbers into chains that must render in order:
+    plan_chains(5, [4]) -> [[1, 2, 3], [4, 5]]
+    """
+    starts = {1} | set(SEQUENCE_FRESH_STARTS if fresh_starts is None else fresh_starts)
+    chains = []
+    for segment in range(1, num_segments + 1):
+        if segment in starts or not chains:
+            chains.append([])
+        chains[-1].append(segment)
+    return chains
+
+
+class SegmentFailed(Exception):
+    pass
+
+
+class VideoSequencePipeline:
+    """
+    Renders a sequence's segments through the normal generation path and
+    stitches the results. The sequence itself is a task record in the creative
+    store (kind "sequence"), so check-status works for it like any other task.
+
+    submit_segment(sequence, segment, image_uri) -> task_id of a tracked Runway task
+    frame_reference(frame_path) -> URI to send as the next segment's prompt image
+    on_complete(sequence, output_path) -> stores the stitched video as an asset
+    """
+
+    def __init__(self, store, submit_segment, frame_reference, on_complete,
+                 chain_workers=SEQUENCE_CHAIN_WORKERS, timeout=SEQUENCE_TIMEOUT):
+        self.store = store
+        self.submit_segment = submit_segment
+        self.frame_reference = frame_reference
+        self.on_complete = on_complete
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=chain_workers, thread_name_prefix="video-sequence")
+
+    def start(self, sequence: dict, image_uri: str):
+        """Render in the background from the product image; `sequence` must already be in the store"""
+        threading.Thread(target=self._run, args=(sequence, image_uri), name="video-sequence", daemon=True).start()
+
+    # ---------- internals ----------
+
+    def _run(self, sequence: dict, image_uri: str):
+        sequence_id = sequence["task_id"]
+        chains = sequence["chains"]
+        total = sum(len(chain) for chain in chains)
+        deadline = sequence.get("started_at", time.time()) + self.timeout
+        stop = threading.Event()  # set when a chain fails, so the others stop submitting
+        segments = {}  # segment number -> task_id
+        finished = []
+        lock = threading.Lock()
+
+        def record_segment(segment, task_id=None, done=False):
+            with lock:
+                if task_id:
+                    segments[segment] = task_id
+                if done:
+                    finished.append(segment)
+                self.store.update_task(
+                    sequence_id,
+                    segment_task_ids=[segments.get(n) for n in range(1, total + 1)],
+                    progress=round(len(finished) / (total + 1), 3),  # +1: stitching
+                )
+
+        try:
+            with tempfile.TemporaryDirectory(prefix="sequence-frames-") as frame_dir:
+                futures = [
+                    self._executor.submit(self._render_chain, sequence, chain, image_uri, frame_dir, record_segment,
+                                          deadline, stop)
+                    for chain in chains
+                ]
+                clips = {}
+                try:
+                    for future in as_completed(futures):
+                        clips.update(future.result())
+                except Exception:
+                    # Stop the other chains and let them exit before frame_dir is removed
+                    stop.set()
+                    for future in futures:
+                        future.cancel()
+                    wait(futures)
+                    raise
+
+            logger.info(f"🎞️ Stitching {total} segments for sequence {sequence_id}")
+            self.store.update_task(sequence_id, status="downloading", progress=round(total / (total + 1), 3))
+            fd, output_path = tempfile.mkstemp(suffix=".mp4", prefix="sequence-")
+            os.close(fd)
+            try:
+                concat_videos([clips[n] for n in range(1, total + 1)], output_path)
+                self.on_complete(sequence, output_path)
+            finally:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+        except Exception as e:
+            logger.error(f"Video sequence {sequence_id} failed: {e}")
+            if not isinstance(e, SegmentFailed):
+                logger.error(traceback.format_exc())
+            self.store.update_task(sequence_id, status="failed", error=str(e))
+
+    def _render_chain(self, sequence: dict, chain: list, image_uri: str, frame_dir: str, record_segment,
+                      deadline: float, stop: threading.Event) -> dict:
+        """Render one chain in order, each segment starting from the previous one's last frame"""
+        clips = {}
+        for segment in chain:
+            if stop.is_set():
+                raise SegmentFailed(f"Segment {segment} not started: another segment failed")
+            if clips:
+                previous = clips[segment - 1]
+                frame_path = extract_last_frame(previous, os.path.join(frame_dir, f"segment_{segment - 1}.jpg"))
+                image_uri = self.frame_reference(frame_path)
+
+            task_id = self.submit_segment(sequence, segment, image_uri)
+            record_segment(segment, task_id=task_id)
+            logger.info(f"🎬 Sequence {sequence['task_id']}: segment {segment} submitted as {task_id}")
+
+            clips[segment] = self._wait_for_segment(task_id, segment, deadline, stop)
+            record_segment(segment, done=True)
+        return clips
+
+    def _wait_for_segment(self, task_id: str, segment: int, deadline: float, stop: threading.Event) -> str:
+        """Block until the poller has finished the segment (or `deadline` passes); returns its local file"""
+        while True:
+            if stop.is_set():
+                raise SegmentFailed(f"Segment {segment} ({task_id}) abandoned: another segment failed")
+            task_info = self.store.get_task(task_id)
+            if task_info is None:
+                raise SegmentFailed(f"Segment {segment} ({task_id}) is no longer tracked")
+            if task_info.get("status") == "failed":
+                raise SegmentFailed(f"Segment {segment} failed: {task_info.get('error', 'unknown error')}")
+            if task_info.get("status") == "completed":
+                asset = self.store.get_asset(task_id)
+                if asset and asset.get("local_path"):
+                    return asset["local_path"]
+                raise SegmentFailed(f"Segment {segment} completed without a stored file")
+            if time.time() >= deadline:
+                raise SegmentFailed(f"Segment {segment} ({task_id}) timed out: "
+                                    f"sequence still unfinished after {self.timeout}s")
+            stop.wait(SEGMENT_WAIT_INTERVAL)
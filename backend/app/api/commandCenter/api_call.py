@@ -1,9 +1,17 @@
 import os
-from flask import Flask, request, jsonify, Blueprint
+import sys
+import json
+from flask import Flask, request, jsonify, Blueprint, Response, stream_with_context
 from groq import Groq
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from response_cache import response_cache, CACHE_ENABLED
+
+# Shared keyword gate lives in backend/app/utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from app.utils.keyword_matcher import KeywordMatcher
+
 load_dotenv()
 
 # Create blueprint instead of Flask app
@@ -44,9 +52,18 @@ REFUSAL_TEXT = (
     "I can help with advertising strategy, brand campaigns, audiences, creatives, channels, and measurement."
 )
 
+# Phrase the model uses when it refuses; the safety net swaps in REFUSAL_TEXT
+REFUSAL_MARKER = "I'm a marketing-only assistant"
+
+# While streaming, this many trailing characters are held back so a refusal
+# is caught before any part of the marker reaches the browser
+STREAM_HOLDBACK = len(REFUSAL_MARKER) + 16
+
+# Built once at import; one regex pass per message
+marketing_matcher = KeywordMatcher(ALLOWED_KEYWORDS, name="marketing_scope")
+
 def is_marketing_query(text: str) -> bool:
-    t = (text or "").lower()
-    return any(k in t for k in ALLOWED_KEYWORDS)
+    return marketing_matcher.matches(text)
 
 # -----------------------------
 # Hardened System Prompt
@@ -99,26 +116,7 @@ Do not deviate from the refusal line for disallowed topics.
 """
 
 
-@image_gen_bp.route('/genai_call', methods=['POST', 'OPTIONS'])
-def chat():
-    if request.method == 'OPTIONS':
-        return '', 200
-    data = request.get_json(silent=True) or {}
-    user_msg = (data.get("message") or "").strip()
-    action = (data.get("action") or "chat").strip()
-    locale = (data.get("locale") or "").strip()  
-    context = data.get("context") or {}  
-
-    if not user_msg:
-        return jsonify({'success': False, 'error': 'no user message found'}), 400
-
-    if not is_marketing_query(user_msg) and action not in ALLOWED_ACTIONS:
-        return jsonify({"reply": REFUSAL_TEXT}), 200
-
-    # Normalize action
-    if action not in ALLOWED_ACTIONS:
-        action = "chat"
-
+def build_messages(user_msg: str, action: str, locale: str, context: dict) -> list:
     brand = context.get("brand", "unknown")
     product = context.get("product", "unknown")
     category = context.get("category", "unknown")
@@ -156,22 +154,165 @@ def chat():
     locale: {locale or "unknown"}
     """
 
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_payload}
+    ]
+
+
+# -----------------------------
+# Streaming (server-sent events)
+# -----------------------------
+def sse_event(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def stream_reply(messages: list, on_complete=None):
+    """
+    Forward Groq tokens as they arrive:
+      event: token    data: {"delta": "..."}
+      event: refusal  data: {"reply": REFUSAL_TEXT}   (client replaces what it has shown)
+      event: done     data: {"reply": "<full text>"}
+      event: error    data: {"error": "..."}
+    The refusal safety net runs on the growing buffer, so an off-scope answer
+    is cut off as soon as the marker appears. on_complete(reply) is called
+    once a full, non-refused reply has been sent.
+    """
+    def generate():
+        buffer = ""
+        sent = 0
+        try:
+            stream = client.chat.completions.create(
+                model=groq_model,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=3000,
+                stream=True,
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if not delta:
+                    continue
+                buffer += delta
+
+                if REFUSAL_MARKER in buffer:
+                    stream.close()
+                    yield sse_event("refusal", {"reply": REFUSAL_TEXT})
+                    return
+
+                safe = len(buffer) - STREAM_HOLDBACK
+                if safe > sent:
+                    yield sse_event("token", {"delta": buffer[sent:safe]})
+                    sent = safe
+
+            if buffer[sent:]:
+                yield sse_event("token", {"delta": buffer[sent:]})
+            yield sse_event("done", {"reply": buffer})
+            if on_complete and buffer:
+                on_complete(buffer)
+
+        except Exception as e:
+            # Return a generic error; avoid leaking internal details
+            yield sse_event("error", {"error": f"generation_failed: {str(e)}"})
+
+    return sse_response(generate())
+
+
+@image_gen_bp.route('/genai_call', methods=['POST', 'OPTIONS'])
+def chat():
+    if request.method == 'OPTIONS':
+        return '', 200
+    data = request.get_json(silent=True) or {}
+    user_msg = (data.get("message") or "").strip()
+    action = (data.get("action") or "chat").strip()
+    locale = (data.get("locale") or "").strip()  
+    context = data.get("context") or {}  
+
+    if not user_msg:
+        return jsonify({'success': False, 'error': 'no user message found'}), 400
+
+    # Streaming mode: opt in with {"stream": true} or Accept: text/event-stream
+    streaming = bool(data.get("stream")) or "text/event-stream" in request.headers.get("Accept", "")
+
+    if not is_marketing_query(user_msg) and action not in ALLOWED_ACTIONS:
+        if streaming:
+            return sse_response([sse_event("refusal", {"reply": REFUSAL_TEXT})])
+        return jsonify({"reply": REFUSAL_TEXT}), 200
+
+    # Normalize action
+    if action not in ALLOWED_ACTIONS:
+        action = "chat"
+
+    # Response cache: opt out per request with {"cache": false} or Cache-Control: no-cache
+    use_cache = (
+        CACHE_ENABLED
+        and data.get("cache", True) is not False
+        and "no-cache" not in request.headers.get("Cache-Control", "")
+    )
+    cache_context = {**context, "locale": locale}
+
+    if use_cache:
+        cached, tier = response_cache.get(action, cache_context, user_msg)
+        if cached:
+            if streaming:
+                return sse_response([
+                    sse_event("token", {"delta": cached}),
+                    sse_event("done", {"reply": cached, "cached": tier}),
+                ])
+            return jsonify({"reply": cached, "cached": tier}), 200
+
+    def remember(reply):
+        if use_cache:
+            response_cache.put(action, cache_context, user_msg, reply)
+
+    messages = build_messages(user_msg, action, locale, context)
+
+    if streaming:
+        return stream_reply(messages, on_complete=remember)
+
     try:
         chat_completion = client.chat.completions.create(
             model=groq_model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_payload}
-            ],
+            messages=messages,
             temperature=0.7,        # tighter for consistent strategy; bump to 0.7 for ideation if you want
             max_tokens=3000,        # good for full strategies
         )
         content = chat_completion.choices[0].message.content
         # Safety net: if the model still goes off-scope, replace with fixed refusal
-        if content and "I'm a marketing-only assistant" in content:
+        if content and REFUSAL_MARKER in content:
             return jsonify({"reply": REFUSAL_TEXT}), 200
+        if content:
+            remember(content)
         return jsonify({"reply": content}), 200
 
     except Exception as e:
         # Return a generic error; avoid leaking internal details
-        return jsonify({"error": f"generation_failed: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"generation_failed: {str(e)}"}), 500
+
+
+@image_gen_bp.route('/genai_call/cache', methods=['GET', 'DELETE', 'OPTIONS'])
+def genai_cache():
+    """Response cache statistics (GET) or flush (DELETE)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    if request.method == 'DELETE':
+        response_cache.clear()
+    return jsonify(response_cache.stats()), 200
+
+
+@image_gen_bp.route('/genai_call/scope_stats', methods=['GET', 'OPTIONS'])
+def genai_scope_stats():
+    """Which scope keywords are actually matching (for tuning ALLOWED_KEYWORDS)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    return jsonify(marketing_matcher.stats()), 200
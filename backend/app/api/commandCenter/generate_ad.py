@@ -1,12 +1,30 @@
 from flask import Blueprint, request, jsonify, send_file
 from flask_cors import CORS
-import requests
 import os
+import sys
 import time
 import uuid
 from dotenv import load_dotenv
 import base64
+import mimetypes
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Shared pooled Runway client lives in backend/app/integrations
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from app.integrations.http_client import get_runway_client, RequestTimeout, RequestError
+from app.utils.ratios import RATIO_ALIASES, resolve_ratio, valid_ratios
+
+from task_poller import TaskPoller, TERMINAL_STATUSES, DOWNLOADING
+from image_store import (
+    OUTPUT_DIR, HASH_DIR, IMMUTABLE_CACHE_CONTROL,
+    InvalidCursor, file_digest, stored_digest, store_stream, link_content_addressed, resolve_content_addressed,
+    index_image, list_images_page, count_images, find_by_prefix, remove_from_index, sync_index
+)
+from api_call import sse_event, sse_response
+from image_variants import (
+    FORMAT_MIMETYPES, negotiate_format, get_variant, precompute_hot_variants, clear_variants
+)
 
 load_dotenv()
 
@@ -26,83 +44,116 @@ CORS(generate_ad_bp,
      supports_credentials=True)
 
 API_KEY = os.getenv("RUNWAY_API_KEY")
-BASE_URL = "https://api.dev.runwayml.com"
-VERSION = "2024-11-06"
 
-# Get absolute path for OUTPUT_DIR
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-OUTPUT_DIR = os.path.join(BASE_DIR, "generated_images")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# How long a single image generation may take before it is reported as timed out
+GENERATION_TIMEOUT = 60
+# ...and how long downloading the finished image may take on top of that
+DOWNLOAD_TIMEOUT = 60
+POLL_INTERVAL = 2
+
+# /image_gen/batch limits
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "8"))
+BATCH_SUBMIT_CONCURRENCY = int(os.getenv("BATCH_SUBMIT_CONCURRENCY", "4"))
+
+# /image_gen response body:
+#   "inline" - legacy: local URL plus the whole image as a base64 data_uri
+#   "url"    - only a content-addressed URL (cacheable forever, a few hundred bytes)
+IMAGE_RESPONSE_MODE = os.getenv("IMAGE_RESPONSE_MODE", "inline")
+
+# /debug lists this many indexed images per page
+DEBUG_FILES_PAGE_SIZE = 100
 
 print(f"✅ Output directory: {OUTPUT_DIR}")
 print(f"✅ Directory exists: {os.path.exists(OUTPUT_DIR)}")
 print(f"✅ Directory writable: {os.access(OUTPUT_DIR, os.W_OK)}")
 
-HEADERS = {
-    "Authorization": f"Bearer {API_KEY}",
-    "X-Runway-Version": VERSION,
-    "Content-Type": "application/json"
-}
-
-# Valid ratios for Runway ML API
-VALID_RATIOS = [
-    "1344:768",    # Landscape
-    "768:1344",    # Portrait
-    "1024:1024",   # Square
-    "1184:864",    # Desktop
-    "864:1184",    # Portrait Desktop
-    "1536:672",    # Ultra Wide
-    "832:1248",    # Portrait Mobile
-    "1248:832",    # Landscape Mobile
-    "896:1152",    # Portrait Tall
-    "1152:896"     # Landscape Wide
-]
-
-# Mapping from frontend aspect ratios to valid Runway ratios
-ASPECT_RATIO_MAPPING = {
-    "1:1": "1024:1024",        # Square
-    "16:9": "1344:768",        # Landscape (closest to 16:9)
-    "9:16": "768:1344",        # Portrait (closest to 9:16)
-    "4:5": "832:1248",         # Portrait (closest to 4:5)
-    "1344:768": "1344:768",    # Direct match
-}
-
-def map_to_valid_ratio(frontend_ratio):
-    """Map frontend aspect ratio to valid Runway ratio"""
-    # If already a valid ratio, use it directly
-    if frontend_ratio in VALID_RATIOS:
-        return frontend_ratio
+# Pick up images saved before the index existed
+sync_index()
+
+# Keep-alive connections shared by task creation, status polls and downloads
+# (the process-wide pool; reads RUNWAY_API_KEY itself)
+runway = get_runway_client()
+
+IMAGE_MODEL = "gemini_2.5_flash"
+
+# Valid ratios for Runway ML API, and frontend presets mapped onto them
+VALID_RATIOS = valid_ratios(IMAGE_MODEL)
+ASPECT_RATIO_MAPPING = RATIO_ALIASES[IMAGE_MODEL]
+
+class RunwayAPIError(Exception):
+    """Runway rejected a task creation request"""
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+def submit_image_task(data: dict):
+    """
+    Create a Runway text_to_image task from an /image_gen style request body
+    and hand it to the shared poller. Returns the task_id.
+    """
+    prompt = (data.get('message') or '').strip()
+    
+    print(f"🎨 Generating image for prompt: {prompt}")
+    
+    # Get aspect ratio from frontend and map to valid Runway ratio
+    frontend_ratio = data.get('aspect_ratio', '1344:768')
+    valid_ratio = resolve_ratio(IMAGE_MODEL, frontend_ratio)
+    print(f"📐 Frontend ratio: {frontend_ratio} -> Valid Runway ratio: {valid_ratio}")
+    
+    # Get style if provided
+    style = data.get('style', 'photorealistic')
+    
+    # Get negative prompt if provided
+    negative_prompt = data.get('negative_prompt', '')
+    
+    # Create enhanced prompt (removed the extra ", style" suffix since frontend already adds it)
+    enhanced_prompt = f"{prompt}"
     
-    # Check if we have a mapping
-    if frontend_ratio in ASPECT_RATIO_MAPPING:
-        return ASPECT_RATIO_MAPPING[frontend_ratio]
+    # Add negative prompt if provided
+    payload = {
+        "model": IMAGE_MODEL,
+        "promptText": enhanced_prompt,
+        "ratio": valid_ratio,
+    }
     
-    # Try to parse and find closest match
-    if ":" in frontend_ratio:
+    if negative_prompt:
+        payload["negativePromptText"] = negative_prompt
+    
+    print(f"✨ Enhanced prompt: {enhanced_prompt}")
+    print(f"📦 Payload: {payload}")
+    
+    # Create task
+    create_resp = runway.post(
+        "/v1/text_to_image",
+        json=payload,
+        timeout=30
+    )
+    
+    # Check for errors
+    if create_resp.status_code != 200:
+        print(f"❌ Runway API Error: Status {create_resp.status_code}")
+        print(f"❌ Response: {create_resp.text}")
+        
         try:
-            width, height = map(int, frontend_ratio.split(":"))
-            target_ratio = width / height
-            
-            # Find closest valid ratio
-            closest_ratio = None
-            min_diff = float('inf')
-            
-            for valid_ratio in VALID_RATIOS:
-                v_width, v_height = map(int, valid_ratio.split(":"))
-                v_ratio = v_width / v_height
-                diff = abs(target_ratio - v_ratio)
-                
-                if diff < min_diff:
-                    min_diff = diff
-                    closest_ratio = valid_ratio
-            
-            print(f"🔀 Mapped {frontend_ratio} to {closest_ratio} (diff: {min_diff:.3f})")
-            return closest_ratio
+            error_detail = create_resp.json()
+            error_msg = error_detail.get("error", {}).get("message", create_resp.text)
         except:
-            pass
+            error_msg = create_resp.text
+        
+        raise RunwayAPIError(f"Runway API Error: {error_msg}", create_resp.status_code)
     
-    # Default to square ratio
-    return "1024:1024"
+    task_data = create_resp.json()
+    task_id = task_data["id"]
+    print(f"✅ Task created: {task_id}")
+
+    # The shared background poller tracks the task from here on
+    image_tasks.submit(task_id, {
+        "prompt": prompt,
+        "aspect_ratio_used": valid_ratio,
+        "style_used": style,
+        "response_mode": data.get('response_mode', IMAGE_RESPONSE_MODE)
+    })
+    return task_id
 
 @generate_ad_bp.route('/image_gen', methods=['POST', 'OPTIONS'])
 def generate_image():
@@ -120,140 +171,43 @@ def generate_image():
         if not prompt:
             return jsonify({"error": "Prompt is required", "success": False}), 400
         
-        print(f"🎨 Generating image for prompt: {prompt}")
-        
-        # Get aspect ratio from frontend and map to valid Runway ratio
-        frontend_ratio = data.get('aspect_ratio', '1344:768')
-        valid_ratio = map_to_valid_ratio(frontend_ratio)
-        print(f"📐 Frontend ratio: {frontend_ratio} -> Valid Runway ratio: {valid_ratio}")
-        
-        # Get style if provided
-        style = data.get('style', 'photorealistic')
-        
-        # Get negative prompt if provided
-        negative_prompt = data.get('negative_prompt', '')
-        
-        # Create enhanced prompt (removed the extra ", style" suffix since frontend already adds it)
-        enhanced_prompt = f"{prompt}"
-        
-        # Add negative prompt if provided
-        payload = {
-            "model": "gemini_2.5_flash",
-            "promptText": enhanced_prompt,
-            "ratio": valid_ratio,
-        }
-        
-        if negative_prompt:
-            payload["negativePromptText"] = negative_prompt
-        
-        print(f"✨ Enhanced prompt: {enhanced_prompt}")
-        print(f"📦 Payload: {payload}")
-        
-        # Create task
-        create_resp = requests.post(
-            f"{BASE_URL}/v1/text_to_image",
-            headers=HEADERS,
-            json=payload,
-            timeout=30
-        )
-        
-        # Check for errors
-        if create_resp.status_code != 200:
-            print(f"❌ Runway API Error: Status {create_resp.status_code}")
-            print(f"❌ Response: {create_resp.text}")
-            
-            try:
-                error_detail = create_resp.json()
-                error_msg = error_detail.get("error", {}).get("message", create_resp.text)
-            except:
-                error_msg = create_resp.text
-            
-            return jsonify({
-                "error": f"Runway API Error: {error_msg}",
-                "success": False,
-                "status_code": create_resp.status_code
-            }), 500
-        
-        create_resp.raise_for_status()
-        task_data = create_resp.json()
-        task_id = task_data["id"]
-        print(f"✅ Task created: {task_id}")
-
-        # Poll task with timeout
-        max_attempts = 30  # 60 seconds max
-        for attempt in range(max_attempts):
-            print(f"⏳ Polling task status (attempt {attempt + 1}/{max_attempts})")
-            
-            task_resp = requests.get(
-                f"{BASE_URL}/v1/tasks/{task_id}",
-                headers=HEADERS,
-                timeout=10
-            )
-            
-            if task_resp.status_code != 200:
-                print(f"❌ Task status check failed: {task_resp.status_code}")
-                time.sleep(2)
-                continue
-                
-            task_resp.raise_for_status()
-            task_data = task_resp.json()
-
-            status = task_data.get("status")
-            print(f"📊 Task status: {status}")
+        task_id = submit_image_task(data)
 
-            if status == "SUCCEEDED":
-                if task_data.get("output") and len(task_data["output"]) > 0:
-                    image_url = task_data["output"][0]
-                    print(f"✅ Image generated: {image_url[:50]}...")
+        if data.get('async'):
+            return jsonify({
+                "success": True,
+                "task_id": task_id,
+                "status": "PENDING",
+                "status_url": f"http://localhost:5002/image_gen/status/{task_id}",
+                "events_url": f"http://localhost:5002/image_gen/events/{task_id}"
+            }), 202
 
-                    # Generate filename with task_id for easy lookup
-                    task_id = task_data["id"]  # Use the actual task ID
-                    filename = f"{task_id}.png"
-        
-                    # Save image immediately (synchronous)
-                    print(f"📥 Downloading image to: {filename}")
-                    filepath = download_and_store_asset(image_url, filename)
+        # Blocking mode for existing clients: wait on the poller instead of polling here
+        task = image_tasks.wait(task_id, timeout=GENERATION_TIMEOUT + POLL_INTERVAL * 2)
+        if task and task["status"] == DOWNLOADING:
+            # Generated but still downloading: the poller bounds this with DOWNLOAD_TIMEOUT
+            task = image_tasks.wait(task_id, timeout=DOWNLOAD_TIMEOUT + POLL_INTERVAL * 2)
 
+        if task and task["status"] == "SUCCEEDED":
+            print(f"✅ Image saved and ready! Size: {task['result']['file_size']} bytes")
+            return jsonify(task["result"]), 200
 
-                    if filepath:
-                        file_size = os.path.getsize(filepath)
-            
-                        # Convert to base64 for immediate display
-                        with open(filepath, "rb") as f:
-                            image_data = base64.b64encode(f.read()).decode('utf-8')
-            
-                        response_data = {
-                        "success": True,
-                        "image_url": f"http://localhost:5002/get_image/{filename}",
-                        "cloudfront_url": image_url,
-                        "data_uri": f"data:image/png;base64,{image_data}",
-                        "filename": filename,
-                        "prompt": prompt,
-                        "task_id": task_id,
-                        "local_path": filepath,
-                        "aspect_ratio_used": valid_ratio,
-                        "style_used": style,
-                        "file_size": file_size
-                        }
-            
-                        print(f"✅ Image saved and ready! Size: {file_size} bytes")
-                        return jsonify(response_data), 200
-            
-            elif status == "FAILED":
-                error_msg = task_data.get("error", {}).get("message", "Generation failed")
-                print(f"❌ Task failed: {error_msg}")
-                return jsonify({"error": f"Generation failed: {error_msg}", "success": False}), 500
-            
-            # Wait before next poll
-            time.sleep(2)
+        if task and task["status"] in ("FAILED", "CANCELLED"):
+            return jsonify({"error": f"Generation failed: {task['error']}", "success": False}), 500
         
         print(f"⏰ Task polling timeout")
-        return jsonify({"error": "Generation timeout", "success": False}), 504
+        return jsonify({"error": "Generation timeout", "success": False, "task_id": task_id}), 504
         
-    except requests.exceptions.Timeout:
+    except RunwayAPIError as e:
+        return jsonify({
+            "error": str(e),
+            "success": False,
+            "status_code": e.status_code
+        }), 500
+    except RequestTimeout:
         print(f"⏰ Request timeout")
         return jsonify({"error": "Request timeout. Please try again.", "success": False}), 504
-    except requests.exceptions.RequestException as e:
+    except RequestError as e:
         print(f"❌ Request error: {str(e)}")
         traceback.print_exc()
         return jsonify({"error": f"API request failed: {str(e)}", "success": False}), 500
@@ -267,26 +221,14 @@ def download_and_store_asset(output_url: str, filename: str):
     try:
         print(f"📥 Downloading asset to: {filename}")
         
-        # Download with timeout
-        response = requests.get(output_url, timeout=60, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        # Download with timeout, streamed straight to disk
+        with runway.download(output_url, timeout=60) as chunks:
+            # Save to file using provided filename (hashed while writing)
+            path, digest = store_stream(chunks, filename)
+            print(f"💾 Saved image to: {path} (sha256 {digest[:12]}…)")
         
-        if response.status_code != 200:
-            print(f"❌ Download failed with status: {response.status_code}")
-            return None
-            
-        response.raise_for_status()
-        
-        image_bytes = response.content
-        print(f"✅ Downloaded {len(image_bytes)} bytes")
-        
-        # Save to file using provided filename
-        path = os.path.join(OUTPUT_DIR, filename)
-        print(f"💾 Saving image to: {path}")
-        
-        with open(path, "wb") as f:
-            f.write(image_bytes)
+        # Gallery thumbnails are ready before anyone asks for them
+        precompute_hot_variants(path, digest)
         
         # Verify file was saved
         if os.path.exists(path):
@@ -302,6 +244,234 @@ def download_and_store_asset(output_url: str, filename: str):
         traceback.print_exc()
         return None
 
+def fetch_task_status(task_id: str):
+    """Fetch a Runway task's current state"""
+    return runway.get_task(task_id)
+
+def finalize_image_task(task_id: str, task_data: dict, meta: dict):
+    """Download a finished task's image and build the /image_gen response body"""
+    if not task_data.get("output"):
+        raise RuntimeError("Task succeeded without output")
+
+    image_url = task_data["output"][0]
+    print(f"✅ Image generated: {image_url[:50]}...")
+
+    # Generate filename with task_id for easy lookup
+    filename = f"{task_id}.png"
+    filepath = download_and_store_asset(image_url, filename)
+    if not filepath:
+        raise RuntimeError("Failed to download generated image")
+
+    file_size = os.path.getsize(filepath)
+    digest = file_digest(filepath)
+    content_url = f"http://localhost:5002/image/{link_content_addressed(filepath, digest)}"
+
+    if meta.get("response_mode") == "url":
+        return {
+            "success": True,
+            "image_url": content_url,
+            "content_hash": digest,
+            "filename": filename,
+            "prompt": meta.get("prompt"),
+            "task_id": task_id,
+            "aspect_ratio_used": meta.get("aspect_ratio_used"),
+            "style_used": meta.get("style_used"),
+            "file_size": file_size
+        }
+
+    # Convert to base64 for immediate display
+    with open(filepath, "rb") as f:
+        image_data = base64.b64encode(f.read()).decode('utf-8')
+
+    return {
+        "success": True,
+        "image_url": f"http://localhost:5002/get_image/{filename}",
+        "content_url": content_url,
+        "content_hash": digest,
+        "cloudfront_url": image_url,
+        "data_uri": f"data:image/png;base64,{image_data}",
+        "filename": filename,
+        "prompt": meta.get("prompt"),
+        "task_id": task_id,
+        "local_path": filepath,
+        "aspect_ratio_used": meta.get("aspect_ratio_used"),
+        "style_used": meta.get("style_used"),
+        "file_size": file_size
+    }
+
+# One poller multiplexes status checks for every in-flight image task
+image_tasks = TaskPoller(
+    fetch_task_status,
+    finalize_image_task,
+    interval=POLL_INTERVAL,
+    timeout=GENERATION_TIMEOUT,
+    download_timeout=DOWNLOAD_TIMEOUT
+)
+
+def public_task_state(task: dict):
+    """Task snapshot as sent to clients"""
+    return {
+        "success": task["status"] not in ("FAILED", "CANCELLED", "TIMEOUT"),
+        "task_id": task["task_id"],
+        "status": task["status"],
+        "progress": task["progress"],
+        "result": task["result"],
+        "error": task["error"]
+    }
+
+@generate_ad_bp.route('/image_gen/status/<task_id>', methods=['GET', 'OPTIONS'])
+def image_gen_status(task_id: str):
+    """Current state of an image generation task"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    task = image_tasks.get(task_id)
+    if task is None:
+        return jsonify({"success": False, "error": "Unknown task"}), 404
+    return jsonify(public_task_state(task)), 200
+
+@generate_ad_bp.route('/image_gen/events/<task_id>', methods=['GET'])
+def image_gen_events(task_id: str):
+    """Server-sent events: one event per state change until the task finishes"""
+    if image_tasks.get(task_id) is None:
+        return jsonify({"success": False, "error": "Unknown task"}), 404
+
+    def stream():
+        version = -1
+        while True:
+            task = image_tasks.wait_for_change(task_id, version, timeout=15)
+            if task is None:
+                break
+            if task["version"] == version:
+                yield ": keep-alive\n\n"
+                continue
+
+            version = task["version"]
+            yield sse_event(task['status'].lower(), public_task_state(task))
+            if task["status"] in TERMINAL_STATUSES:
+                break
+
+    return sse_response(stream())
+
+def batch_items(data: dict):
+    """
+    /image_gen/batch accepts either
+      {"items": [{"message", "aspect_ratio", "style", "negative_prompt"}, ...]}
+    or {"prompts": [...]} with shared aspect_ratio/style/negative_prompt.
+    Raises ValueError when the body does not have that shape.
+    """
+    shared = {k: data[k] for k in ("aspect_ratio", "style", "negative_prompt", "response_mode") if k in data}
+    if data.get("items"):
+        if not isinstance(data["items"], list) or not all(isinstance(item, dict) for item in data["items"]):
+            raise ValueError("items must be a list of objects")
+        items = [{**shared, **item} for item in data["items"]]
+    else:
+        prompts = data.get("prompts") or []
+        if not isinstance(prompts, list):
+            raise ValueError("prompts must be a list")
+        items = [{**shared, "message": prompt} for prompt in prompts]
+
+    for i, item in enumerate(items):
+        if not isinstance(item.get("message"), str) or not item["message"].strip():
+            raise ValueError(f"Item {i} needs a text prompt")
+    return items
+
+@generate_ad_bp.route('/image_gen/batch', methods=['POST', 'OPTIONS'])
+def generate_image_batch():
+    """
+    Generate several images at once. Tasks are created concurrently (at most
+    BATCH_SUBMIT_CONCURRENCY at a time) and all of them are polled by the
+    shared poller, so N images take about as long as the slowest one.
+
+    Default response is server-sent events, in completion order:
+      submitted  {"index", "task_id"} | {"index", "error"}
+      result     {"index", ...public task state}
+      done       {"succeeded", "failed", "results": [...in request order]}
+    With "async": true it returns 202 with the task IDs instead.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object", "success": False}), 400
+    try:
+        items = batch_items(data)
+    except ValueError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+
+    if not items:
+        return jsonify({"error": "items or prompts is required", "success": False}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} images per batch", "success": False}), 400
+
+    def submit_all():
+        """Yield (index, task_id, error) as each submission finishes"""
+        with ThreadPoolExecutor(max_workers=min(BATCH_SUBMIT_CONCURRENCY, len(items))) as pool:
+            futures = {pool.submit(submit_image_task, item): i for i, item in enumerate(items)}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    print(f"❌ Batch item {futures[future]} failed to submit: {e}")
+                    yield futures[future], None, str(e)
+
+    if data.get('async'):
+        tasks = sorted(submit_all())
+        return jsonify({
+            "success": any(task_id for _, task_id, _ in tasks),
+            "tasks": [
+                {"index": i, "task_id": task_id, "error": error,
+                 "status_url": f"http://localhost:5002/image_gen/status/{task_id}" if task_id else None,
+                 "events_url": f"http://localhost:5002/image_gen/events/{task_id}" if task_id else None}
+                for i, task_id, error in tasks
+            ]
+        }), 202
+
+    def stream():
+        results = [None] * len(items)
+        versions = {}  # task_id -> last version seen
+        index_of = {}
+
+        for i, task_id, error in submit_all():
+            if error:
+                results[i] = {"success": False, "error": error}
+                yield sse_event("submitted", {"index": i, "error": error})
+            else:
+                versions[task_id] = -1
+                index_of[task_id] = i
+                yield sse_event("submitted", {"index": i, "task_id": task_id})
+
+        deadline = time.time() + GENERATION_TIMEOUT + POLL_INTERVAL * 2
+        while versions and time.time() < deadline:
+            changed = image_tasks.wait_for_any_change(versions, timeout=15)
+            if not changed:
+                yield ": keep-alive\n\n"
+                continue
+
+            for task_id, task in changed.items():
+                if task is None or task["status"] in TERMINAL_STATUSES:
+                    del versions[task_id]
+                    state = public_task_state(task) if task else {"success": False, "task_id": task_id, "error": "Task expired"}
+                    results[index_of[task_id]] = state
+                    yield sse_event("result", {"index": index_of[task_id], **state})
+                else:
+                    versions[task_id] = task["version"]
+                    yield sse_event("progress", {"index": index_of[task_id], "task_id": task_id,
+                                                 "status": task["status"], "progress": task["progress"]})
+
+        for task_id in versions:
+            results[index_of[task_id]] = {"success": False, "task_id": task_id, "error": "Generation timeout"}
+
+        succeeded = sum(1 for r in results if r and r.get("success"))
+        yield sse_event("done", {
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results
+        })
+
+    return sse_response(stream())
+
 @generate_ad_bp.route('/check_local_image/<task_id>', methods=['GET', 'OPTIONS'])
 def check_local_image(task_id: str):
     """Check if image has been downloaded locally and return local URL"""
@@ -334,6 +504,34 @@ def check_local_image(task_id: str):
         print(f"❌ Error checking local image: {str(e)}")
         return jsonify({"success": False, "error": str(e)}), 500
     
+def send_image(path, digest, cache_control):
+    """
+    Send a stored image, or with ?w=<width> a resized variant in the best
+    format the client's Accept header allows (AVIF/WebP/PNG).
+    Strong ETag; conditional=True handles If-None-Match and Range.
+    """
+    width = request.args.get('w', type=int)
+    if width:
+        fmt = negotiate_format(request.headers.get('Accept'))
+        variant = get_variant(path, width, fmt, digest)
+        response = send_file(
+            variant,
+            mimetype=FORMAT_MIMETYPES[fmt],
+            conditional=True,
+            etag=os.path.basename(variant)
+        )
+        response.vary.add('Accept')
+    else:
+        response = send_file(
+            path,
+            mimetype=mimetypes.guess_type(path)[0] or 'image/png',
+            conditional=True,
+            etag=digest
+        )
+    
+    response.headers['Cache-Control'] = cache_control
+    return response
+
 @generate_ad_bp.route('/get_image/<filename>', methods=['GET', 'OPTIONS'])
 def get_image(filename):
     """Serve generated images"""
@@ -350,63 +548,68 @@ def get_image(filename):
         
         if not os.path.exists(path):
             print(f"❌ Image not found: {path}")
-            # List available files for debugging
-            if os.path.exists(OUTPUT_DIR):
-                files = os.listdir(OUTPUT_DIR)
-                print(f"📂 Available files in {OUTPUT_DIR}: {files}")
-                
-                # Try to find file with different extension
-                filename_no_ext = os.path.splitext(filename)[0]
-                matching_files = [f for f in files if f.startswith(filename_no_ext)]
-                if matching_files:
-                    print(f"🔍 Found matching files: {matching_files}")
-                    # Use the first matching file
-                    path = os.path.join(OUTPUT_DIR, matching_files[0])
-                    print(f"🔍 Using alternative file: {path}")
+            
+            # Try to find file with different extension (prefix lookup by task ID)
+            filename_no_ext = os.path.splitext(filename)[0]
+            match = find_by_prefix(filename_no_ext)
+            if match:
+                path = os.path.join(OUTPUT_DIR, match)
+                print(f"🔍 Using alternative file: {path}")
             
             if not os.path.exists(path):
-                return jsonify({"error": f"Image '{filename}' not found", "available_files": os.listdir(OUTPUT_DIR) if os.path.exists(OUTPUT_DIR) else []}), 404
+                return jsonify({"error": f"Image '{filename}' not found"}), 404
         
         file_size = os.path.getsize(path)
         print(f"✅ Serving image: {filename}, Size: {file_size} bytes")
         
-        return send_file(path, mimetype='image/png')
+        return send_image(path, stored_digest(path), 'no-cache')
         
     except Exception as e:
         print(f"❌ Error serving image: {str(e)}")
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+@generate_ad_bp.route('/image/<name>', methods=['GET', 'OPTIONS'])
+def get_image_by_hash(name):
+    """Serve an image by content hash - immutable, cacheable forever"""
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+    
+    path = resolve_content_addressed(name)
+    if not path:
+        return jsonify({"error": f"Image '{name}' not found"}), 404
+    
+    return send_image(path, os.path.splitext(os.path.basename(path))[0], IMMUTABLE_CACHE_CONTROL)
+
 @generate_ad_bp.route('/list_images', methods=['GET', 'OPTIONS'])
 def list_images():
-    """List all generated images"""
+    """List generated images, newest first (?limit=, ?cursor= for the next page)"""
     if request.method == 'OPTIONS':
         return jsonify({'status': 'ok'}), 200
         
     try:
-        if not os.path.exists(OUTPUT_DIR):
-            return jsonify({"images": [], "count": 0, "directory": OUTPUT_DIR, "exists": False}), 200
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        rows, next_cursor = list_images_page(limit, request.args.get('cursor'))
         
-        files = []
-        for filename in os.listdir(OUTPUT_DIR):
-            path = os.path.join(OUTPUT_DIR, filename)
-            if os.path.isfile(path) and filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
-                size = os.path.getsize(path)
-                files.append({
-                    "filename": filename,
-                    "size": size,
-                    "url": f"http://localhost:5002/get_image/{filename}",
-                    "created": time.ctime(os.path.getctime(path))
-                })
+        files = [{
+            "filename": row["filename"],
+            "size": row["size"],
+            "url": f"http://localhost:5002/get_image/{row['filename']}",
+            "thumbnail_url": f"http://localhost:5002/get_image/{row['filename']}?w=256",
+            "created": time.ctime(row["created_at"])
+        } for row in rows]
         
         print(f"📋 Listing {len(files)} images")
         return jsonify({
             "images": files,
-            "count": len(files),
+            "count": count_images(),
+            "next_cursor": next_cursor,
             "directory": OUTPUT_DIR,
             "exists": True
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"❌ Error listing images: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -430,6 +633,12 @@ def debug():
     if request.method == 'OPTIONS':
         return jsonify({'status': 'ok'}), 200
     
+    # A page of the index rather than a directory scan; ?cursor= continues it
+    try:
+        files, files_next_cursor = list_images_page(DEBUG_FILES_PAGE_SIZE, request.args.get('cursor'))
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    
     return jsonify({
         "status": "running",
         "port": 5002,
@@ -439,7 +648,10 @@ def debug():
         "runway_api_key_set": bool(API_KEY and API_KEY != "your_runway_api_key_here"),
         "valid_ratios": VALID_RATIOS,
         "current_time": time.ctime(),
-        "files_in_output_dir": os.listdir(OUTPUT_DIR) if os.path.exists(OUTPUT_DIR) else []
+        "image_count": count_images(),
+        "recent_files": [row["filename"] for row in list_images_page(20)[0]],
+        "files_in_output_dir": [row["filename"] for row in files],
+        "files_next_cursor": files_next_cursor
     }), 200
 
 @generate_ad_bp.route('/test_save', methods=['GET', 'OPTIONS'])
@@ -457,6 +669,7 @@ def test_save():
         
         with open(test_path, "wb") as f:
             f.write(test_image)
+        index_image(test_path)
         
         exists = os.path.exists(test_path)
         if exists:
@@ -493,6 +706,12 @@ def clear_images():
                 os.remove(path)
                 count += 1
         
+        # Content-addressed links point at the files just removed
+        for filename in os.listdir(HASH_DIR):
+            os.remove(os.path.join(HASH_DIR, filename))
+        clear_variants()
+        remove_from_index()
+        
         print(f"🧹 Cleared {count} images")
         return jsonify({"message": f"Cleared {count} images", "cleared": count}), 200
     except Exception as e:
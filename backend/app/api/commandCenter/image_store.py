@@ -0,0 +1,292 @@
+import os
+import time
+import base64
+import shutil
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import closing
+
+# Get absolute path for OUTPUT_DIR
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(BASE_DIR, "generated_images")
+
+# Content-addressed copies (hard links) of every stored image: <sha256><ext>
+HASH_DIR = os.path.join(OUTPUT_DIR, "by_hash")
+
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+os.makedirs(HASH_DIR, exist_ok=True)
+
+# Metadata index of stored images, so listings never scan the directory
+IMAGE_INDEX_PATH = os.getenv("IMAGE_INDEX_PATH", os.path.join(BASE_DIR, "image_index.db"))
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+# Content-addressed URLs never change meaning, so browsers may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+CHUNK_SIZE = 64 * 1024
+
+# Bounded LRU of computed digests
+DIGEST_CACHE_SIZE = int(os.getenv("DIGEST_CACHE_SIZE", "4096"))
+
+_digest_lock = threading.Lock()
+_digests = OrderedDict()  # (path, mtime, size) -> sha256 hex
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (path, st.st_mtime, st.st_size)
+
+
+def _remember_digest(key, digest):
+    with _digest_lock:
+        _digests[key] = digest
+        _digests.move_to_end(key)
+        while len(_digests) > DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+
+
+def file_digest(path):
+    """sha256 of a file, computed once per (path, mtime, size)"""
+    key = _stat_key(path)
+    with _digest_lock:
+        if key in _digests:
+            _digests.move_to_end(key)
+            return _digests[key]
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+
+    digest = sha.hexdigest()
+    _remember_digest(key, digest)
+    return digest
+
+
+def store_stream(chunks, filename):
+    """
+    Write an iterable of byte chunks to OUTPUT_DIR/filename, hashing on the fly.
+    The bytes go to a .part file that is renamed into place once complete, so
+    an interrupted download never leaves a truncated image under the real name.
+    Returns (path, sha256 hex).
+    """
+    path = os.path.join(OUTPUT_DIR, filename)
+    tmp_path = f"{path}.part"
+    sha = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                if chunk:
+                    sha.update(chunk)
+                    f.write(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    digest = sha.hexdigest()
+    _remember_digest(_stat_key(path), digest)
+    link_content_addressed(path, digest)
+    index_image(path, digest)
+    return path, digest
+
+
+def content_addressed_name(path, digest):
+    return f"{digest}{os.path.splitext(path)[1] or '.png'}"
+
+
+def link_content_addressed(path, digest):
+    """Expose a stored image under HASH_DIR/<digest><ext>; returns that name"""
+    name = content_addressed_name(path, digest)
+    target = os.path.join(HASH_DIR, name)
+    if not os.path.exists(target):
+        try:
+            os.link(path, target)
+        except OSError:
+            # Filesystems without hard links
+            shutil.copyfile(path, target)
+    return name
+
+
+def resolve_content_addressed(name):
+    """Path of a content-addressed image, or None"""
+    path = os.path.join(HASH_DIR, os.path.basename(name))
+    return path if os.path.isfile(path) else None
+
+
+# ---------- metadata index ----------
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    filename TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    digest TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_images_created ON images (created_at DESC, filename DESC);
+"""
+
+_index_lock = threading.Lock()
+_index_ready = False
+
+
+def _index_conn():
+    global _index_ready
+    conn = sqlite3.connect(IMAGE_INDEX_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    if not _index_ready:
+        with _index_lock:
+            if not _index_ready:
+                conn.executescript(_INDEX_SCHEMA)
+                conn.commit()
+                _index_ready = True
+    return conn
+
+
+def index_image(path, digest=None):
+    """Record a stored image (called whenever one is written)"""
+    st = os.stat(path)
+    try:
+        with closing(_index_conn()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO images (filename, size, digest, created_at) VALUES (?, ?, ?, ?)",
+                (os.path.basename(path), st.st_size, digest, st.st_ctime)
+            )
+    except sqlite3.Error as e:
+        # The index is an optimisation; never fail a save over it
+        print(f"⚠️ Could not index {path}: {e}")
+
+
+def stored_digest(path):
+    """
+    Digest of an image in OUTPUT_DIR. Looked up in memory, then in the index;
+    computed only for images indexed without one (e.g. by sync_index) and
+    then written back, so each file is hashed at most once.
+    """
+    key = _stat_key(path)
+    with _digest_lock:
+        if key in _digests:
+            _digests.move_to_end(key)
+            return _digests[key]
+
+    filename, size = os.path.basename(path), key[2]
+    try:
+        with closing(_index_conn()) as conn:
+            row = conn.execute(
+                "SELECT digest FROM images WHERE filename = ? AND size = ?", (filename, size)
+            ).fetchone()
+    except sqlite3.Error:
+        row = None
+    if row and row["digest"]:
+        _remember_digest(key, row["digest"])
+        return row["digest"]
+
+    digest = file_digest(path)
+    try:
+        with closing(_index_conn()) as conn, conn:
+            conn.execute(
+                "UPDATE images SET digest = ? WHERE filename = ? AND size = ?", (digest, filename, size)
+            )
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not store digest for {filename}: {e}")
+    return digest
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_cursor(row):
+    return base64.urlsafe_b64encode(f"{row['created_at']!r}|{row['filename']}".encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        created_at, filename = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return float(created_at), filename
+    except ValueError:  # bad base64 (binascii.Error), bad UTF-8, missing "|", bad float
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+
+
+def list_images_page(limit=50, cursor=None):
+    """
+    Newest-first page of indexed images using keyset pagination.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Raises InvalidCursor for a cursor this function did not produce.
+    """
+    with closing(_index_conn()) as conn:
+        if cursor:
+            created_at, filename = _decode_cursor(cursor)
+            rows = conn.execute(
+                """
+                SELECT * FROM images
+                WHERE (created_at, filename) < (?, ?)
+                ORDER BY created_at DESC, filename DESC LIMIT ?
+                """,
+                (created_at, filename, limit + 1)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT * FROM images ORDER BY created_at DESC, filename DESC LIMIT ?",
+                (limit + 1,)
+            ).fetchall()
+
+    rows = [dict(r) for r in rows]
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def count_images():
+    with closing(_index_conn()) as conn:
+        return conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+
+def find_by_prefix(prefix):
+    """First indexed filename starting with `prefix` (e.g. a task ID), via the primary-key range"""
+    with closing(_index_conn()) as conn:
+        row = conn.execute(
+            "SELECT filename FROM images WHERE filename >= ? AND filename < ? ORDER BY filename LIMIT 1",
+            (prefix, prefix + "\uffff")
+        ).fetchone()
+    return row["filename"] if row else None
+
+
+def remove_from_index(filename=None):
+    """Drop one image from the index, or all of them"""
+    with closing(_index_conn()) as conn, conn:
+        if filename is None:
+            conn.execute("DELETE FROM images")
+        else:
+            conn.execute("DELETE FROM images WHERE filename = ?", (filename,))
+
+
+def sync_index():
+    """
+    One-off reconciliation with OUTPUT_DIR at startup: index files saved
+    before the index existed and drop rows whose file is gone.
+    Digests are filled in lazily by stored_digest when an image is first served.
+    """
+    started = time.time()
+    on_disk = {
+        entry.name: entry.stat()
+        for entry in os.scandir(OUTPUT_DIR)
+        if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+    }
+    with closing(_index_conn()) as conn, conn:
+        indexed = {row["filename"] for row in conn.execute("SELECT filename FROM images")}
+        conn.executemany(
+            "DELETE FROM images WHERE filename = ?",
+            [(name,) for name in indexed - on_disk.keys()]
+        )
+        conn.executemany(
+            "INSERT INTO images (filename, size, digest, created_at) VALUES (?, ?, NULL, ?)",
+            [(name, st.st_size, st.st_ctime) for name, st in on_disk.items() if name not in indexed]
+        )
+
+    added = len(on_disk.keys() - indexed)
+    removed = len(indexed - on_disk.keys())
+    if added or removed:
+        print(f"🗂️ Image index synced: +{added} / -{removed} in {time.time() - started:.2f}s")
@@ -0,0 +1,171 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+try:
+    import pillow_avif  # noqa: F401  (registers AVIF on Pillow < 11.2)
+except ImportError:
+    pass
+
+from image_store import OUTPUT_DIR, file_digest
+
+# Resized/re-encoded copies of generated images: <sha256>_w<width>.<format>
+VARIANT_DIR = os.path.join(OUTPUT_DIR, "variants")
+os.makedirs(VARIANT_DIR, exist_ok=True)
+
+# Requested widths are snapped up to one of these so the cache stays bounded
+VARIANT_WIDTHS = (128, 256, 512, 1024)
+
+# Variants built as soon as an image is stored (gallery thumbnails)
+HOT_VARIANTS = ((256, "webp"),)
+
+VARIANT_CACHE_MAX_BYTES = int(os.getenv("VARIANT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+FORMAT_MIMETYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "png": "image/png",
+}
+SAVE_OPTIONS = {
+    "avif": {"quality": 60},
+    "webp": {"quality": 80, "method": 4},
+    "png": {"optimize": True},
+}
+
+AVIF_SUPPORTED = "AVIF" in Image.SAVE
+
+_locks_guard = threading.Lock()
+_locks = {}
+_cache_lock = threading.Lock()
+_cache_bytes = None  # lazily initialised from disk
+
+_precompute_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-variants")
+
+
+def snap_width(width):
+    for allowed in VARIANT_WIDTHS:
+        if width <= allowed:
+            return allowed
+    return VARIANT_WIDTHS[-1]
+
+
+def negotiate_format(accept_header):
+    """Best format the client accepts: AVIF, then WebP, else PNG"""
+    accept = (accept_header or "").lower()
+    if AVIF_SUPPORTED and "image/avif" in accept:
+        return "avif"
+    if "image/webp" in accept:
+        return "webp"
+    return "png"
+
+
+def variant_name(digest, width, fmt):
+    return f"{digest}_w{width}.{fmt}"
+
+
+def _lock_for(name):
+    with _locks_guard:
+        return _locks.setdefault(name, threading.Lock())
+
+
+def _render(source_path, target_path, width, fmt):
+    with Image.open(source_path) as img:
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        if fmt != "png" and img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+        tmp_path = f"{target_path}.tmp"
+        img.save(tmp_path, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+    os.replace(tmp_path, target_path)
+
+
+def get_variant(source_path, width, fmt, digest=None):
+    """
+    Path of `source_path` resized to `width` (snapped) and encoded as `fmt`.
+    Built on first request; later requests refresh its mtime for LRU eviction.
+    """
+    digest = digest or file_digest(source_path)
+    width = snap_width(width)
+    name = variant_name(digest, width, fmt)
+    path = os.path.join(VARIANT_DIR, name)
+
+    with _lock_for(name):
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+
+        _render(source_path, path, width, fmt)
+
+    _account(os.path.getsize(path))
+    return path
+
+
+def precompute_hot_variants(source_path, digest=None):
+    """Build HOT_VARIANTS in the background right after an image is stored"""
+    def run():
+        for width, fmt in HOT_VARIANTS:
+            try:
+                get_variant(source_path, width, fmt, digest)
+            except Exception as e:
+                print(f"⚠️ Could not precompute {fmt} w{width} for {source_path}: {e}")
+
+    _precompute_executor.submit(run)
+
+
+# ---------- LRU size eviction ----------
+
+def _scan_cache_bytes():
+    total = 0
+    for entry in os.scandir(VARIANT_DIR):
+        if entry.is_file() and not entry.name.endswith(".tmp"):
+            total += entry.stat().st_size
+    return total
+
+
+def _account(added_bytes):
+    global _cache_bytes
+    with _cache_lock:
+        if _cache_bytes is None:
+            _cache_bytes = _scan_cache_bytes()
+        else:
+            _cache_bytes += added_bytes
+
+        if _cache_bytes > VARIANT_CACHE_MAX_BYTES:
+            _evict()
+
+
+def _evict():
+    """Delete least recently used variants until the cache is ~90% of its limit"""
+    global _cache_bytes
+    entries = sorted(
+        (e for e in os.scandir(VARIANT_DIR) if e.is_file() and not e.name.endswith(".tmp")),
+        key=lambda e: e.stat().st_mtime
+    )
+    target = VARIANT_CACHE_MAX_BYTES * 0.9
+    removed = 0
+    for entry in entries:
+        if _cache_bytes <= target:
+            break
+        size = entry.stat().st_size
+        try:
+            os.remove(entry.path)
+        except OSError:
+            continue
+        _cache_bytes -= size
+        removed += 1
+
+    if removed:
+        print(f"🧹 Evicted {removed} image variants (cache now {_cache_bytes} bytes)")
+
+
+def clear_variants():
+    global _cache_bytes
+    with _cache_lock:
+        for entry in os.scandir(VARIANT_DIR):
+            if entry.is_file():
+                os.remove(entry.path)
+        _cache_bytes = 0
@@ -36,17 +36,47 @@ def index():
             "chat": {
                 "path": "/genai_call",
                 "method": "POST",
-                "description": "Generate marketing/advertising content"
+                "description": "Generate marketing/advertising content (stream=true for SSE, cache=false to skip the response cache)"
+            },
+            "chat_cache": {
+                "path": "/genai_call/cache",
+                "method": "GET, DELETE",
+                "description": "Response cache statistics / flush"
+            },
+            "chat_scope_stats": {
+                "path": "/genai_call/scope_stats",
+                "method": "GET",
+                "description": "Marketing-scope keyword hit statistics"
             },
             "image_gen": {
                 "path": "/image_gen",
                 "method": "POST",
-                "description": "Generate images from text prompts"
+                "description": "Generate images from text prompts (pass async=true to get a task ID)"
+            },
+            "image_gen_batch": {
+                "path": "/image_gen/batch",
+                "method": "POST",
+                "description": "Generate several images concurrently; results stream back as SSE"
+            },
+            "image_gen_status": {
+                "path": "/image_gen/status/<task_id>",
+                "method": "GET",
+                "description": "Current state of an image generation task"
+            },
+            "image_gen_events": {
+                "path": "/image_gen/events/<task_id>",
+                "method": "GET",
+                "description": "Server-sent events for an image generation task"
             },
             "get_image": {
                 "path": "/get_image/<filename>",
                 "method": "GET",
-                "description": "Retrieve generated images"
+                "description": "Retrieve generated images (?w=<width> for a WebP/AVIF thumbnail)"
+            },
+            "image_by_hash": {
+                "path": "/image/<sha256>.<ext>",
+                "method": "GET",
+                "description": "Retrieve a generated image by content hash (immutable)"
             },
             "list_images": {
                 "path": "/list_images",
@@ -78,8 +108,14 @@ if __name__ == '__main__':
     print("=" * 60)
     print("📋 Available Endpoints:")
     print("   POST   /genai_call              - Generate marketing content")
+    print("   GET    /genai_call/cache        - Response cache stats")
+    print("   GET    /genai_call/scope_stats  - Scope keyword hit stats")
     print("   POST   /image_gen               - Generate images")
+    print("   POST   /image_gen/batch         - Generate several images (SSE)")
+    print("   GET    /image_gen/status/<id>   - Image task status")
+    print("   GET    /image_gen/events/<id>   - Image task events (SSE)")
     print("   GET    /get_image/<filename>    - Get generated image")
+    print("   GET    /image/<sha256>.<ext>    - Get image by content hash")
     print("   GET    /list_images             - List all images")
     print("   GET    /debug                   - Debug info")
     print("   GET    /                        - Server info")
@@ -0,0 +1,160 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Tunables (env so they can be changed per deployment)
+CACHE_ENABLED = os.getenv("GENAI_CACHE_ENABLED", "1") == "1"
+CACHE_TTL_SECONDS = int(os.getenv("GENAI_CACHE_TTL", "3600"))
+CACHE_MAX_ENTRIES = int(os.getenv("GENAI_CACHE_MAX_ENTRIES", "500"))
+
+# Optional second tier: reuse a reply when the message is a close paraphrase
+# of a cached one with the same action and context
+SEMANTIC_ENABLED = os.getenv("GENAI_CACHE_SEMANTIC", "0") == "1"
+SEMANTIC_THRESHOLD = float(os.getenv("GENAI_CACHE_SIMILARITY", "0.92"))
+EMBEDDING_MODEL = os.getenv("GENAI_CACHE_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text) -> str:
+    return _WHITESPACE.sub(" ", str(text or "")).strip().lower()
+
+
+def partition_key(action: str, context: dict) -> str:
+    """Hash of the normalized action + context; only entries in the same partition can match"""
+    fields = {k: normalize(v) for k, v in sorted((context or {}).items()) if normalize(v)}
+    raw = json.dumps({"action": normalize(action), "context": fields}, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def exact_key(partition: str, message: str) -> str:
+    return hashlib.sha256(f"{partition}|{normalize(message)}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of /genai_call replies.
+
+    Tier 1: exact match on normalized (action, context, message).
+    Tier 2 (optional): cosine similarity of message embeddings within the same
+    (action, context) partition, backed by an in-process vector index.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS,
+                 semantic=SEMANTIC_ENABLED, threshold=SEMANTIC_THRESHOLD):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+
+        self._entries = OrderedDict()  # key -> {"reply", "partition", "vector", "expires_at"}
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+
+        self._embedder = None
+        self._np = None
+        self.semantic = semantic and self._load_embedder()
+
+    # ---------- public API ----------
+
+    def get(self, action, context, message):
+        """Cached reply or None; returns (reply, tier)"""
+        partition = partition_key(action, context)
+        key = exact_key(partition, message)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires_at"] > now:
+                self._entries.move_to_end(key)
+                self._stats["exact_hits"] += 1
+                return entry["reply"], "exact"
+            if entry:
+                del self._entries[key]
+
+        if self.semantic:
+            match = self._nearest(partition, message, now)
+            if match:
+                with self._lock:
+                    self._stats["semantic_hits"] += 1
+                return match, "semantic"
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None, None
+
+    def put(self, action, context, message, reply):
+        partition = partition_key(action, context)
+        key = exact_key(partition, message)
+        vector = self._embed(message) if self.semantic else None
+
+        with self._lock:
+            self._entries[key] = {
+                "reply": reply,
+                "partition": partition,
+                "vector": vector,
+                "expires_at": time.time() + self.ttl,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "semantic": self.semantic,
+            }
+
+    # ---------- semantic tier ----------
+
+    def _load_embedder(self):
+        try:
+            import numpy as np
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            print("⚠️ GENAI_CACHE_SEMANTIC=1 but sentence-transformers is not installed; using exact matches only")
+            return False
+        self._np = np
+        self._embedder = SentenceTransformer(EMBEDDING_MODEL)
+        print(f"✅ Response cache semantic tier ready ({EMBEDDING_MODEL})")
+        return True
+
+    def _embed(self, message):
+        # Unit-length vectors, so a dot product is the cosine similarity
+        return self._embedder.encode(normalize(message), normalize_embeddings=True)
+
+    def _nearest(self, partition, message, now):
+        with self._lock:
+            candidates = [
+                (key, e) for key, e in self._entries.items()
+                if e["partition"] == partition and e["vector"] is not None and e["expires_at"] > now
+            ]
+        if not candidates:
+            return None
+
+        matrix = self._np.stack([e["vector"] for _, e in candidates])
+        scores = matrix @ self._embed(message)
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+
+        key, entry = candidates[best]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry["reply"]
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,204 @@
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# Runway task states, plus the ones added locally
+TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "CANCELLED", "TIMEOUT"}
+DOWNLOADING = "DOWNLOADING"
+
+# Finished tasks are kept this long so late status/SSE requests still see the result
+RETENTION_SECONDS = 3600
+
+
+class TaskPoller:
+    """
+    Tracks in-flight Runway tasks and polls all of them from one background loop.
+
+    fetch_status(task_id) -> Runway task JSON
+    finalize(task_id, task_json, meta) -> result dict (e.g. download the output)
+
+    Request handlers submit a task and return immediately; clients read the
+    state with get(), or block on wait()/wait_for_change() (used by SSE).
+
+    `timeout` bounds generation (from submit), `download_timeout` bounds
+    finalize (from the moment Runway reports success). Runway has no batch
+    status endpoint, so each pass checks the in-flight tasks concurrently on
+    up to `check_workers` threads over the shared connection pool.
+    """
+
+    def __init__(self, fetch_status, finalize, interval=2.0, timeout=120, download_timeout=120,
+                 finalize_workers=4, check_workers=8):
+        self.fetch_status = fetch_status
+        self.finalize = finalize
+        self.interval = interval
+        self.timeout = timeout
+        self.download_timeout = download_timeout
+
+        self._tasks = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=finalize_workers, thread_name_prefix="task-finalize")
+        self._check_executor = ThreadPoolExecutor(max_workers=check_workers, thread_name_prefix="task-check")
+
+    # ---------- public API ----------
+
+    def submit(self, task_id, meta=None):
+        now = time.time()
+        with self._cond:
+            self._tasks[task_id] = {
+                "task_id": task_id,
+                "status": "PENDING",
+                "progress": 0.0,
+                "result": None,
+                "error": None,
+                "meta": meta or {},
+                "created_at": now,
+                "updated_at": now,
+                "version": 0,
+            }
+            self._cond.notify_all()
+        self._ensure_thread()
+        return self.get(task_id)
+
+    def get(self, task_id):
+        with self._cond:
+            record = self._tasks.get(task_id)
+            return dict(record) if record else None
+
+    def wait(self, task_id, timeout=None):
+        """Block until the task reaches a terminal state (or timeout); returns its snapshot"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._is_terminal(task_id), timeout=timeout)
+            record = self._tasks.get(task_id)
+            return dict(record) if record else None
+
+    def wait_for_change(self, task_id, version, timeout=None):
+        """Block until the task's version differs from `version`; returns its snapshot"""
+        def changed():
+            record = self._tasks.get(task_id)
+            return record is None or record["version"] != version
+
+        with self._cond:
+            self._cond.wait_for(changed, timeout=timeout)
+            record = self._tasks.get(task_id)
+            return dict(record) if record else None
+
+    def wait_for_any_change(self, versions, timeout=None):
+        """
+        Block until any task in `versions` ({task_id: version}) has moved on.
+        Returns snapshots of the changed tasks ({} on timeout).
+        """
+        def changed():
+            return {
+                task_id: (dict(record) if record else None)
+                for task_id, version in versions.items()
+                for record in [self._tasks.get(task_id)]
+                if record is None or record["version"] != version
+            }
+
+        with self._cond:
+            self._cond.wait_for(changed, timeout=timeout)
+            return changed()
+
+    def in_flight_count(self):
+        with self._cond:
+            return sum(1 for r in self._tasks.values() if r["status"] not in TERMINAL_STATUSES)
+
+    # ---------- internals ----------
+
+    def _is_terminal(self, task_id):
+        record = self._tasks.get(task_id)
+        return record is None or record["status"] in TERMINAL_STATUSES
+
+    def _update(self, task_id, expected_status=None, **changes):
+        with self._cond:
+            record = self._tasks.get(task_id)
+            if record is None:
+                return
+            if expected_status is not None and record["status"] != expected_status:
+                return
+            record.update(changes)
+            record["updated_at"] = time.time()
+            record["version"] += 1
+            self._cond.notify_all()
+
+    def _ensure_thread(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="runway-task-poller", daemon=True)
+                self._thread.start()
+
+    def _active_ids(self):
+        with self._cond:
+            self._prune()
+            return [task_id for task_id, r in self._tasks.items() if r["status"] not in TERMINAL_STATUSES]
+
+    def _prune(self):
+        cutoff = time.time() - RETENTION_SECONDS
+        expired = [
+            task_id for task_id, r in self._tasks.items()
+            if r["status"] in TERMINAL_STATUSES and r["updated_at"] < cutoff
+        ]
+        for task_id in expired:
+            del self._tasks[task_id]
+
+    def _run(self):
+        while True:
+            active = self._active_ids()
+            if not active:
+                # Sleep until something is submitted
+                with self._cond:
+                    self._cond.wait(timeout=self.interval * 5)
+                continue
+
+            # Consume the iterator so every check has finished before the next pass
+            for _ in self._check_executor.map(self._check, active):
+                pass
+            time.sleep(self.interval)
+
+    def _check(self, task_id):
+        record = self.get(task_id)
+        if record is None:
+            return
+
+        if record["status"] == DOWNLOADING:
+            # Runway is done; only the finalize step is left to time out
+            if time.time() - record["downloading_since"] > self.download_timeout:
+                print(f"⏰ Task {task_id} download timed out")
+                self._update(task_id, expected_status=DOWNLOADING, status="TIMEOUT", error="Download timeout")
+            return
+
+        if time.time() - record["created_at"] > self.timeout:
+            print(f"⏰ Task {task_id} timed out")
+            self._update(task_id, status="TIMEOUT", error="Generation timeout")
+            return
+
+        try:
+            task_data = self.fetch_status(task_id)
+        except Exception as e:
+            # Transient: try again on the next pass
+            print(f"❌ Task status check failed for {task_id}: {e}")
+            return
+
+        status = task_data.get("status")
+        if status == "SUCCEEDED":
+            self._update(task_id, status=DOWNLOADING, progress=1.0, downloading_since=time.time())
+            self._executor.submit(self._finalize, task_id, task_data, record["meta"])
+        elif status in ("FAILED", "CANCELLED"):
+            error = task_data.get("failure") or (task_data.get("error") or {}).get("message") or "Generation failed"
+            print(f"❌ Task {task_id} failed: {error}")
+            self._update(task_id, status=status, error=error)
+        else:
+            progress = task_data.get("progress") or record["progress"]
+            if status != record["status"] or progress != record["progress"]:
+                self._update(task_id, status=status or record["status"], progress=progress)
+
+    def _finalize(self, task_id, task_data, meta):
+        try:
+            result = self.finalize(task_id, task_data, meta)
+            # A download that outlived download_timeout stays TIMEOUT
+            self._update(task_id, expected_status=DOWNLOADING, status="SUCCEEDED", result=result)
+        except Exception as e:
+            traceback.print_exc()
+            self._update(task_id, expected_status=DOWNLOADING, status="FAILED", error=str(e))
@@ -0,0 +1,212 @@
+"""
+http_client.py
+
+Shared, pooled HTTP client for Runway and its asset CDN.
+
+- One process-wide httpx.Client: keep-alive connections are reused across
+  task creation, status polls and downloads instead of a new TCP/TLS
+  handshake per call
+- HTTP/2 when the `h2` package is installed (multiplexes concurrent polls
+  over a single connection), HTTP/1.1 keep-alive otherwise
+- Connection failures are retried by the transport; 429 and 5xx responses
+  are retried with exponential backoff (honouring Retry-After). POSTs are
+  only retried on 429 so a task is never created twice
+- Downloads are streamed in chunks and never carry the Runway API key
+- Reference media can be uploaded once and sent by runway:// URI
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Configuration
+# -----------------------------
+
+RUNWAY_BASE_URL = "https://api.dev.runwayml.com"
+RUNWAY_VERSION = "2024-11-06"
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_RETRIES = int(os.getenv("HTTP_CONNECT_RETRIES", "2"))
+
+# Status retries: attempts after the first, and the backoff curve between them
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "10"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+# Re-exported so callers don't need to import httpx for error handling
+RequestTimeout = httpx.TimeoutException
+RequestError = httpx.HTTPError
+
+# -----------------------------
+# Client
+# -----------------------------
+
+
+def _backoff_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), HTTP_BACKOFF_MAX)
+            except ValueError:
+                pass
+    delay = HTTP_BACKOFF_BASE * (2 ** attempt)
+    return min(delay + random.uniform(0, delay / 2), HTTP_BACKOFF_MAX)
+
+
+class RunwayClient:
+    """Runway API calls and CDN downloads over one pooled connection set"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = RUNWAY_BASE_URL,
+                 version: str = RUNWAY_VERSION):
+        self.api_key = api_key if api_key is not None else os.environ.get("RUNWAY_API_KEY")
+        self.base_url = base_url.rstrip("/")
+        self.version = version
+
+        # With an explicit transport httpx ignores the client's limits/http2,
+        # so the pool is configured on the transport itself
+        self._client = httpx.Client(
+            transport=httpx.HTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                retries=HTTP_CONNECT_RETRIES,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+            ),
+            timeout=httpx.Timeout(30.0),
+            follow_redirects=True,
+        )
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # Sent per request (not on the client) so CDN downloads never see the key
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "X-Runway-Version": self.version,
+            "Content-Type": "application/json",
+        }
+
+    def request(self, method: str, path: str, retry_unsafe: bool = False, **kwargs) -> httpx.Response:
+        """
+        Call the Runway API, retrying 429/5xx with backoff.
+        Non-idempotent methods retry only on 429 unless `retry_unsafe` is set.
+        The final response is returned as-is; callers decide how to treat errors.
+        """
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        idempotent = retry_unsafe or method.upper() in ("GET", "HEAD", "OPTIONS", "DELETE")
+
+        attempt = 0
+        while True:
+            response = self._client.request(method, url, headers=headers, **kwargs)
+            retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+            if not retryable or attempt >= HTTP_MAX_RETRIES:
+                return response
+
+            delay = _backoff_delay(attempt, response)
+            logger.warning(f"{method} {path} returned {response.status_code}; retrying in {delay:.1f}s")
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, path: str, **kwargs) -> httpx.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> httpx.Response:
+        return self.request("POST", path, **kwargs)
+
+    def get_task(self, task_id: str, timeout: float = 10) -> Dict[str, Any]:
+        """Current state of a Runway task"""
+        response = self.get(f"/v1/tasks/{task_id}", timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def upload(self, filename: str, content: bytes, content_type: str, timeout: float = 60) -> str:
+        """
+        Upload media once as an ephemeral Runway asset; returns its runway:// URI,
+        which task requests can reference instead of an inline data URI.
+        """
+        response = self.post("/v1/uploads", json={"filename": filename, "type": "ephemeral"}, timeout=timeout)
+        response.raise_for_status()
+        upload = response.json()
+
+        # Presigned form upload straight to storage: no Runway API key
+        stored = self._client.post(
+            upload["uploadUrl"],
+            data=upload.get("fields", {}),
+            files={"file": (filename, content, content_type)},
+            timeout=timeout,
+        )
+        stored.raise_for_status()
+        return upload["runwayUri"]
+
+    @contextmanager
+    def download(self, url: str, timeout: float = 60,
+                 chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[Iterator[bytes]]:
+        """
+        Stream a generated asset; yields an iterator of byte chunks.
+        Raises httpx.HTTPStatusError on a non-2xx response.
+
+            with client.download(url) as chunks:
+                for chunk in chunks: ...
+        """
+        attempt = 0
+        while True:
+            with self._client.stream("GET", url, headers=DOWNLOAD_HEADERS, timeout=timeout) as response:
+                if response.status_code in RETRY_STATUSES and attempt < HTTP_MAX_RETRIES:
+                    delay = _backoff_delay(attempt, response)
+                    logger.warning(f"Download returned {response.status_code}; retrying in {delay:.1f}s")
+                else:
+                    response.raise_for_status()
+                    yield response.iter_bytes(chunk_size)
+                    return
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self._client.close()
+
+
+# -----------------------------
+# Shared instance
+# -----------------------------
+
+_runway_client: Optional[RunwayClient] = None
+_runway_lock = threading.Lock()
+
+
+def get_runway_client() -> RunwayClient:
+    """Process-wide RunwayClient, created on first use"""
+    global _runway_client
+    if _runway_client is None:
+        with _runway_lock:
+            if _runway_client is None:
+                _runway_client = RunwayClient()
+                logger.info(f"Runway HTTP client ready (HTTP/2: {HTTP2_AVAILABLE})")
+    return _runway_client
@@ -0,0 +1,104 @@
+-- Single-round-trip save for the AutoCreate wizard (auto_create table)
+
+-- Every wizard step used to cost 2-4 requests: SELECT to check the campaign
+-- exists (or find the active one), UPDATE, a second UPDATE for assets, then a
+-- SELECT to read the row back. upsert_auto_create_campaign does all of it in one
+-- statement and returns the full row. It is called from
+-- backend/app/api/AutoCreate/unified_db.py via supabase.rpc().
+
+-- At most one active campaign per user; this is the ON CONFLICT target.
+-- The API never inserts into auto_create directly: every wizard step saves
+-- through this function (or its fallback, unified_db.handle_campaign_save),
+-- which updates the active campaign instead of adding a second one.
+-- If creating it fails, some user already has several active campaigns. Keep
+-- the newest one active first:
+--
+-- UPDATE auto_create SET is_active = FALSE
+-- WHERE is_active AND id NOT IN (
+--     SELECT DISTINCT ON (user_id) id FROM auto_create
+--     WHERE is_active ORDER BY user_id, updated_at DESC NULLS LAST, id DESC
+-- );
+CREATE UNIQUE INDEX IF NOT EXISTS idx_auto_create_one_active_per_user
+    ON auto_create (user_id)
+    WHERE is_active;
+
+-- p_data holds the columns to write (unknown keys are ignored).
+-- With p_campaign_id: update that campaign if it belongs to p_user_id
+-- (no row returned otherwise).
+-- Without: update the user's active campaign, or create it if there is none.
+-- p_defaults holds columns set only when the campaign is created.
+
+-- The earlier three-argument version would make PostgREST calls ambiguous
+DROP FUNCTION IF EXISTS upsert_auto_create_campaign(TEXT, JSONB, BIGINT);
+
+CREATE OR REPLACE FUNCTION upsert_auto_create_campaign(
+    p_user_id TEXT,
+    p_data JSONB,
+    p_campaign_id BIGINT DEFAULT NULL,
+    p_defaults JSONB DEFAULT '{}'
+)
+RETURNS SETOF auto_create AS $$
+DECLARE
+    -- Columns the caller may set; identity and bookkeeping columns are managed here
+    v_columns TEXT[];
+    v_set TEXT;
+    v_insert JSONB;
+    v_insert_columns TEXT;
+    v_select_columns TEXT;
+BEGIN
+    SELECT array_agg(key)
+    INTO v_columns
+    FROM jsonb_object_keys(p_data) AS key
+    WHERE key IN (
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = 'auto_create'::regclass AND attnum > 0 AND NOT attisdropped
+    )
+    AND key NOT IN ('id', 'user_id', 'is_active', 'version', 'created_at', 'updated_at');
+
+    IF p_campaign_id IS NOT NULL THEN
+        SELECT string_agg(format('%I = r.%I', col, col), ', ') || ', updated_at = now()'
+        INTO v_set
+        FROM unnest(COALESCE(v_columns, '{}')) AS col;
+
+        RETURN QUERY EXECUTE format(
+            'UPDATE auto_create AS t SET %s
+             FROM jsonb_populate_record(NULL::auto_create, $1) AS r
+             WHERE t.id = $2 AND t.user_id::text = $3
+             RETURNING t.*',
+            COALESCE(v_set, 'updated_at = now()')
+        ) USING p_data, p_campaign_id, p_user_id;
+        RETURN;
+    END IF;
+
+    -- Defaults for a first campaign, overridden by the step's data
+    v_insert := jsonb_build_object('budget_amount', 0, 'campaign_duration', 1)
+        || COALESCE(p_defaults, '{}')
+        || p_data
+        || jsonb_build_object('user_id', p_user_id, 'is_active', TRUE, 'version', 1,
+                              'created_at', now(), 'updated_at', now());
+
+    SELECT string_agg(format('%I', key), ', '), string_agg(format('r.%I', key), ', ')
+    INTO v_insert_columns, v_select_columns
+    FROM jsonb_object_keys(v_insert) AS key
+    WHERE key IN (
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = 'auto_create'::regclass AND attnum > 0 AND NOT attisdropped
+    );
+
+    SELECT string_agg(format('%I = EXCLUDED.%I', col, col), ', ') || ', updated_at = now()'
+    INTO v_set
+    FROM unnest(COALESCE(v_columns, '{}')) AS col;
+
+    RETURN QUERY EXECUTE format(
+        'INSERT INTO auto_create AS t (%s)
+         SELECT %s FROM jsonb_populate_record(NULL::auto_create, $1) AS r
+         ON CONFLICT (user_id) WHERE is_active
+         DO UPDATE SET %s
+         RETURNING t.*',
+        v_insert_columns, v_select_columns, COALESCE(v_set, 'updated_at = now()')
+    ) USING v_insert;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Callable by the service key through PostgREST (supabase.rpc)
+GRANT EXECUTE ON FUNCTION upsert_auto_create_campaign(TEXT, JSONB, BIGINT, JSONB) TO service_role;
@@ -0,0 +1,181 @@
+"""
+jwt_auth.py
+
+JWT verification shared by the Authentication and AutoCreate services.
+
+- Tokens are verified (HS256 signature, exp) once; the claims are kept in a
+  bounded LRU keyed by the token, so the wizard's repeated calls skip the
+  decode. Entries expire with the token's own `exp` (and after
+  JWT_CACHE_MAX_TTL at most), so an expired token is never served from cache
+- One set of error messages for every service (AuthError is a ValueError,
+  so existing `except ValueError` handlers keep working)
+- `require_user` reads the token from the Authorization header or the JSON
+  body and passes the verified `user_id` to the view
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Iterable, Optional
+
+import jwt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Configuration
+# -----------------------------
+
+JWT_ALGORITHMS = ("HS256",)
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "4096"))
+JWT_CACHE_MAX_TTL = float(os.getenv("JWT_CACHE_MAX_TTL", "900"))
+
+
+class AuthError(ValueError):
+    pass
+
+
+def strip_bearer(token: Any) -> str:
+    token = str(token).strip() if token else ""
+    if token.lower().startswith("bearer "):
+        token = token[7:].strip()
+    return token
+
+
+# -----------------------------
+# Verifier
+# -----------------------------
+
+
+class TokenVerifier:
+    """Verifies tokens signed with `secret` and caches their claims until they expire"""
+
+    def __init__(self, secret: Optional[str], algorithms: Iterable[str] = JWT_ALGORITHMS,
+                 maxsize: int = JWT_CACHE_SIZE, max_ttl: float = JWT_CACHE_MAX_TTL):
+        self.secret = secret
+        self.algorithms = list(algorithms)
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (claims, expires_at)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def claims(self, token: Any) -> Dict[str, Any]:
+        """Verified claims of `token` (with or without a "Bearer " prefix); raises AuthError"""
+        token = strip_bearer(token)
+        if not token:
+            raise AuthError("Empty token")
+
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(token)
+            if cached is not None:
+                claims, expires_at = cached
+                if now < expires_at:
+                    self._cache.move_to_end(token)
+                    self._hits += 1
+                    return dict(claims)
+                del self._cache[token]
+            self._misses += 1
+
+        claims = self._decode(token)
+
+        expires_at = now + self.max_ttl
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+        if expires_at > now and self.maxsize > 0:
+            with self._lock:
+                self._cache[token] = (claims, expires_at)
+                self._cache.move_to_end(token)
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        return dict(claims)
+
+    def user_id(self, token: Any) -> str:
+        """The `user_id` claim of a verified token"""
+        user_id = self.claims(token).get("user_id")
+        if not user_id:
+            raise AuthError("No user_id in token payload")
+        return str(user_id)
+
+    def _decode(self, token: str) -> Dict[str, Any]:
+        if not self.secret:
+            raise AuthError("SECRET_KEY not configured")
+        try:
+            return jwt.decode(token, self.secret, algorithms=self.algorithms)
+        except jwt.ExpiredSignatureError:
+            raise AuthError("Token has expired. Please login again.")
+        except jwt.InvalidTokenError as e:
+            raise AuthError(f"Invalid token: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# -----------------------------
+# Shared instance
+# -----------------------------
+
+verifier = TokenVerifier(os.getenv("SECRET_KEY"))
+
+
+def decode_user_id(token: Any) -> str:
+    return verifier.user_id(token)
+
+
+def token_from_request(body_field: Optional[str] = "user_id") -> str:
+    """Bearer token from the Authorization header, else from the JSON body"""
+    from flask import request
+
+    token = strip_bearer(request.headers.get("Authorization"))
+    if not token and body_field:
+        data = request.get_json(silent=True) or {}
+        token = strip_bearer(data.get(body_field))
+    return token
+
+
+def require_user(view=None, *, body_field: Optional[str] = "user_id", token_verifier: Optional[TokenVerifier] = None):
+    """
+    Flask view decorator: verifies the caller's token and calls the view with
+    `user_id=...`. Answers 401 when the token is missing or invalid.
+
+        @bp.route("/api/thing", methods=["POST"])
+        @require_user
+        def thing(user_id): ...
+
+    The AutoCreate wizard sends its token in the JSON body as "user_id";
+    pass body_field=None to accept the Authorization header only.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            from flask import jsonify
+
+            token = token_from_request(body_field)
+            if not token:
+                return jsonify({"error": "Missing auth token"}), 401
+            try:
+                kwargs["user_id"] = (token_verifier or verifier).user_id(token)
+            except AuthError as e:
+                return jsonify({"error": str(e)}), 401
+            return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator(view) if view is not None else decorator
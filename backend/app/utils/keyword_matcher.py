@@ -0,0 +1,85 @@
+"""
+keyword_matcher.py
+
+Precompiled keyword gate shared by the scope checks in the codebase.
+
+All keywords are compiled once into a single alternation regex, so a text is
+classified in one pass instead of one substring scan per keyword:
+
+- Whole-word matching: "ads" matches "Meta ads" but "meta" no longer
+  matches "metadata"; phrases ("google ads", "a/b test") work the same way
+- Optional plural suffix ("campaign" also matches "campaigns")
+- Per-keyword hit counters that can be exported for tuning the list
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str], name: str = "keywords", plurals: bool = True,
+                 whole_words: bool = True):
+        self.name = name
+        # Stray whitespace was used as a poor man's word boundary ("ad ")
+        self.keywords = sorted({k.strip().lower() for k in keywords if k and k.strip()},
+                               key=lambda k: (-len(k), k))
+
+        # Longest first so "ad policy" wins over "ad" at the same position
+        alternation = "|".join(re.escape(k) for k in self.keywords)
+        suffix = r"(?:s|es)?" if plurals else ""
+        if whole_words:
+            pattern = rf"(?<![a-z0-9])({alternation}){suffix}(?![a-z0-9])"
+        else:
+            pattern = rf"({alternation})"
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+
+        self._lock = threading.Lock()
+        self._hits: Counter = Counter()
+        self._checked = 0
+        self._matched = 0
+
+    def search(self, text: str) -> Optional[str]:
+        """First keyword found in `text`, or None"""
+        match = self.pattern.search(text or "")
+        keyword = match.group(1).lower() if match else None
+        self._record([keyword] if keyword else [])
+        return keyword
+
+    def matches(self, text: str) -> bool:
+        return self.search(text) is not None
+
+    def find_all(self, text: str) -> List[str]:
+        """Every keyword occurrence in `text`, in order (for scoring gates)"""
+        found = [m.group(1).lower() for m in self.pattern.finditer(text or "")]
+        self._record(found)
+        return found
+
+    def count(self, text: str) -> int:
+        return len(self.find_all(text))
+
+    def _record(self, found: List[str]):
+        with self._lock:
+            self._checked += 1
+            if found:
+                self._matched += 1
+                self._hits.update(found)
+
+    def stats(self, top: int = 20) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "keywords": len(self.keywords),
+                "checked": self._checked,
+                "matched": self._matched,
+                "match_rate": round(self._matched / self._checked, 4) if self._checked else 0.0,
+                "top_hits": dict(self._hits.most_common(top)),
+                "never_hit": [k for k in self.keywords if k not in self._hits],
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits.clear()
+            self._checked = 0
+            self._matched = 0
@@ -0,0 +1,141 @@
+"""
+ratios.py
+
+Aspect-ratio resolution for Runway models, shared by commandCenter and AutoCreate.
+
+Each model's valid "W:H" ratios are parsed once into a table sorted by
+W/H, so snapping an arbitrary request ("16:9", "1200:628") to the nearest
+supported ratio is a bisect instead of a re-parse and linear scan. Results
+are memoized per (model, requested ratio).
+"""
+
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# -----------------------------
+# Valid ratios per Runway model
+# -----------------------------
+
+MODEL_RATIOS: Dict[str, List[str]] = {
+    # commandCenter text_to_image
+    "gemini_2.5_flash": [
+        "1344:768",    # Landscape
+        "768:1344",    # Portrait
+        "1024:1024",   # Square
+        "1184:864",    # Desktop
+        "864:1184",    # Portrait Desktop
+        "1536:672",    # Ultra Wide
+        "832:1248",    # Portrait Mobile
+        "1248:832",    # Landscape Mobile
+        "896:1152",    # Portrait Tall
+        "1152:896",    # Landscape Wide
+    ],
+    # AutoCreate text_to_image with a reference image
+    "gen4_image": [
+        "1024:1024",  # Square
+        "1080:1080",  # Square HD
+        "1168:880",   # Desktop
+        "1360:768",   # Widescreen
+        "1440:1080",  # 4:3 HD
+        "1080:1440",  # Portrait HD
+        "1808:768",   # Ultra Wide
+        "1920:1080",  # Full HD
+        "1080:1920",  # Portrait Full HD
+        "2112:912",   # Super Wide
+        "1280:720",   # HD
+        "720:1280",   # Portrait HD
+        "720:720",    # Square Mobile
+        "960:720",    # 4:3 Mobile
+        "720:960",    # Portrait Mobile
+        "1680:720",   # Cinematic
+    ],
+    # AutoCreate image_to_video
+    "veo3.1": [
+        "1280:720",   # Landscape HD
+        "720:1280",   # Portrait HD
+        "1920:1080",  # Full HD
+        "1080:1920",  # Portrait Full HD
+    ],
+}
+
+# Returned when a request can't be parsed
+DEFAULT_RATIOS: Dict[str, str] = {
+    "gemini_2.5_flash": "1024:1024",
+    "gen4_image": "1024:1024",
+    "veo3.1": "1280:720",
+}
+
+# Frontend presets that deliberately differ from the nearest match
+RATIO_ALIASES: Dict[str, Dict[str, str]] = {
+    "gemini_2.5_flash": {
+        "1:1": "1024:1024",        # Square
+        "16:9": "1344:768",        # Landscape (closest to 16:9)
+        "9:16": "768:1344",        # Portrait (closest to 9:16)
+        "4:5": "832:1248",         # Portrait (closest to 4:5)
+    },
+}
+
+
+def parse_ratio(ratio: str) -> Optional[float]:
+    """"W:H" -> W/H, or None if it isn't a valid ratio"""
+    try:
+        width, height = (float(part) for part in str(ratio).strip().split(":"))
+    except ValueError:
+        return None
+    if width <= 0 or height <= 0:
+        return None
+    return width / height
+
+
+class RatioTable:
+    """One model's valid ratios, sorted by their float value for bisect lookups"""
+
+    def __init__(self, model: str, ratios: List[str], default: str, aliases: Optional[Dict[str, str]] = None):
+        self.model = model
+        self.ratios = list(ratios)
+        self.default = default
+        self.aliases = aliases or {}
+        self._valid = set(self.ratios)
+
+        # Stable sort: among equal values the first declared ratio wins
+        entries: List[Tuple[float, str]] = sorted(((parse_ratio(r), r) for r in self.ratios), key=lambda e: e[0])
+        self._values = [value for value, _ in entries]
+        self._names = [name for _, name in entries]
+
+    def nearest(self, target: float) -> Tuple[str, float]:
+        """Closest valid ratio to `target` and its distance"""
+        i = bisect_left(self._values, target)
+        candidates = [j for j in (i - 1, i) if 0 <= j < len(self._values)]
+        best = min(candidates, key=lambda j: (abs(self._values[j] - target), j))
+        return self._names[best], abs(self._values[best] - target)
+
+    def resolve(self, requested: str) -> str:
+        if requested in self._valid:
+            return requested
+        if requested in self.aliases:
+            return self.aliases[requested]
+
+        target = parse_ratio(requested) if requested else None
+        if target is None:
+            return self.default
+
+        ratio, diff = self.nearest(target)
+        print(f"🔀 Mapped {requested} to {ratio} for {self.model} (diff: {diff:.3f})")
+        return ratio
+
+
+RATIO_TABLES: Dict[str, RatioTable] = {
+    model: RatioTable(model, ratios, DEFAULT_RATIOS[model], RATIO_ALIASES.get(model))
+    for model, ratios in MODEL_RATIOS.items()
+}
+
+
+def valid_ratios(model: str) -> List[str]:
+    return list(RATIO_TABLES[model].ratios)
+
+
+@lru_cache(maxsize=512)
+def resolve_ratio(model: str, requested: Optional[str]) -> str:
+    """Snap a requested "W:H" to the nearest ratio `model` accepts"""
+    return RATIO_TABLES[model].resolve((requested or "").strip())
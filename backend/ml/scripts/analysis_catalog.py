@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+analysis_catalog.py
+
+SQLite-backed catalogue of stored ad analyses:
+- One row per analysis (id, file type, mtime, path, compact summary)
+- Rows are written whenever an analysis file is saved, so listing the most
+  recent analyses is an indexed ORDER BY ... LIMIT instead of a directory scan
+- Decoded analyses are kept in an in-memory LRU keyed by (path, mtime), so
+  repeated reads of the same analysis skip the TOON/JSON decode
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# ===========================
+# Paths & Config
+# ===========================
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ML_DIR = SCRIPT_DIR.parent
+DATA_DIR = ML_DIR / "data"
+ANALYSIS_DIR = DATA_DIR / "analysis"
+
+CATALOG_PATH = Path(os.environ.get("ANALYSIS_CATALOG_PATH", DATA_DIR / "analysis_catalog.db"))
+ANALYSIS_CACHE_SIZE = int(os.environ.get("ANALYSIS_CACHE_SIZE", "64"))
+
+TRANSCRIPT_PREVIEW_CHARS = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    file_type TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    path TEXT NOT NULL,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_mtime ON analyses (mtime DESC);
+"""
+
+_lock = threading.Lock()
+_initialized = False
+
+# ===========================
+# Utilities
+# ===========================
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    conn = sqlite3.connect(str(CATALOG_PATH), timeout=10)
+    conn.row_factory = sqlite3.Row
+    if not _initialized:
+        with _lock:
+            if not _initialized:
+                CATALOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+                conn.executescript(_SCHEMA)
+                conn.commit()
+                _initialized = True
+    return conn
+
+
+def analysis_id_from_path(path: Path) -> str:
+    """Strip the `_analysis` suffix from an analysis filename"""
+    return path.stem.replace("_analysis", "")
+
+
+def infer_file_type(analysis_id: str, path: Path) -> str:
+    """Same naming convention the API has always used for stored analyses"""
+    if path.suffix == ".toon":
+        return "video" if "video_" in analysis_id else "unknown"
+    return "image" if "image_" in analysis_id else "unknown"
+
+
+def build_summary(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Small, list-friendly digest of a full analysis"""
+    faces = analysis.get("face_detection") or {}
+    summary = {
+        "content_type": analysis.get("content_type"),
+        "filename": analysis.get("filename"),
+        "analysis_timestamp": analysis.get("analysis_timestamp"),
+    }
+
+    if analysis.get("content_type") == "video":
+        metadata = analysis.get("video_metadata") or {}
+        transcript = (analysis.get("transcript") or {}).get("text", "") or ""
+        summary.update({
+            "duration_seconds": metadata.get("duration_seconds"),
+            "scene_count": analysis.get("scene_count"),
+            "unique_people_count": faces.get("unique_people_count"),
+            "transcript_preview": transcript[:TRANSCRIPT_PREVIEW_CHARS],
+        })
+    else:
+        ocr = analysis.get("ocr_data") or {}
+        summary.update({
+            "face_count": faces.get("face_count"),
+            "word_count": ocr.get("word_count"),
+            "error": analysis.get("error"),
+        })
+
+    return {k: v for k, v in summary.items() if v is not None}
+
+
+def _row_to_entry(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "file_type": row["file_type"],
+        "created_at": row["mtime"],
+        "path": row["path"],
+        "summary": json.loads(row["summary"]) if row["summary"] else None,
+    }
+
+# ===========================
+# Catalogue
+# ===========================
+
+def record_analysis(path: Path, analysis: Optional[Dict[str, Any]] = None,
+                    file_type: Optional[str] = None) -> None:
+    """Insert or refresh the catalogue row for an analysis file that was just written"""
+    path = Path(path)
+    analysis_id = analysis_id_from_path(path)
+    file_type = file_type or (analysis or {}).get("content_type") or infer_file_type(analysis_id, path)
+    summary = json.dumps(build_summary(analysis), ensure_ascii=False) if analysis else None
+
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO analyses (id, file_type, mtime, path, summary)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    file_type = excluded.file_type,
+                    mtime = excluded.mtime,
+                    path = excluded.path,
+                    summary = COALESCE(excluded.summary, analyses.summary)
+                """,
+                (analysis_id, file_type, path.stat().st_mtime, str(path), summary),
+            )
+    except Exception as e:
+        # The catalogue is an index, never a reason to fail a write
+        print(f"[WARN] Could not update analysis catalogue for {path.name}: {e}")
+
+
+def recent_analyses(limit: int = 10) -> List[Dict[str, Any]]:
+    """Most recent analyses, newest first"""
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT * FROM analyses ORDER BY mtime DESC LIMIT ?", (limit,)
+        ).fetchall()
+    return [_row_to_entry(row) for row in rows]
+
+
+def find_analysis(analysis_id: str) -> Optional[Dict[str, Any]]:
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT * FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+    return _row_to_entry(row) if row else None
+
+
+def sync_catalog(analysis_dir: Path = ANALYSIS_DIR) -> int:
+    """
+    Reconcile the catalogue with the analysis directory.
+    Run once at startup to pick up files written before the catalogue existed
+    (or by hand); only stats files, summaries are filled in on the next write.
+    Returns the number of rows added or refreshed.
+    """
+    on_disk = {}
+    # .json first so a .toon with the same id wins, as in the old directory listing
+    for pattern in ("*_analysis.json", "*_analysis.toon"):
+        for path in analysis_dir.glob(pattern):
+            on_disk[analysis_id_from_path(path)] = path
+
+    with closing(_connect()) as conn, conn:
+        known = {
+            row["id"]: (row["mtime"], row["path"])
+            for row in conn.execute("SELECT id, mtime, path FROM analyses")
+        }
+
+        stale = [(analysis_id,) for analysis_id in known if analysis_id not in on_disk]
+        conn.executemany("DELETE FROM analyses WHERE id = ?", stale)
+
+        changed = []
+        for analysis_id, path in on_disk.items():
+            mtime = path.stat().st_mtime
+            if known.get(analysis_id) != (mtime, str(path)):
+                changed.append((analysis_id, infer_file_type(analysis_id, path), mtime, str(path)))
+
+        conn.executemany(
+            """
+            INSERT INTO analyses (id, file_type, mtime, path) VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                file_type = excluded.file_type,
+                mtime = excluded.mtime,
+                path = excluded.path
+            """,
+            changed,
+        )
+
+    if changed or stale:
+        print(f"[INFO] Analysis catalogue synced: {len(changed)} updated, {len(stale)} removed")
+    return len(changed)
+
+# ===========================
+# Decoded analysis cache
+# ===========================
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _decode_analysis(path_str: str, mtime: float) -> Dict[str, Any]:
+    # mtime is part of the key only, so a rewritten file is decoded again
+    path = Path(path_str)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".toon":
+        from toon import decode
+        return decode(text)
+    return json.loads(text)
+
+
+def load_analysis(path: Path) -> Dict[str, Any]:
+    """
+    Decode an analysis file, served from the LRU while the file is unchanged.
+    Callers must treat the returned dict as read-only; it is shared.
+    """
+    path = Path(path)
+    return _decode_analysis(str(path), path.stat().st_mtime)
+
+
+def clear_cache() -> None:
+    _decode_analysis.cache_clear()
@@ -34,6 +34,11 @@ import pytesseract  # pip install pytesseract
 
 from toon import encode, decode  # pip install python-toon
 
+try:
+    from ml.scripts.analysis_catalog import record_analysis
+except ImportError:  # run directly as a script
+    from analysis_catalog import record_analysis
+
 # Face detection
 import face_recognition  # pip install face-recognition
 
@@ -439,6 +444,7 @@ def save_analysis_to_toon(file_id: str, analysis: Dict[str, Any]) -> Path:
     data = sanitize_for_toon(analysis)
     toon_str = encode(data)
     out.write_text(toon_str, encoding="utf-8")
+    record_analysis(out, data)
     print(f"[OK] Saved TOON → {out.name}")
     return out
 
@@ -18,6 +18,16 @@ SCREENSHOT_TIMES = [1, 3, 6]
 
 MAX_ADS = 20   
 
+# Incremental discovery: stop scrolling after this many already-collected
+# creatives in a row (roughly one screen of the advertiser grid)
+KNOWN_SCREEN_SIZE = 12
+KNOWN_IDS_INDEX = "known_creatives.json"
+
+POSSIBLE_CTAS = [
+    "Learn more", "Shop now", "Sign up", "Download",
+    "Apply now", "Watch now", "Get started"
+]
+
 os.makedirs(BASE_DIR, exist_ok=True)
 
 
@@ -35,73 +45,152 @@ def extract_ids(url):
     return advertiser_id, creative_id
 
 
+# ========================
+# KNOWN CREATIVES INDEX
+# ========================
+
+def load_known_creative_ids(advertiser_dir):
+    """
+    creative_ids already collected for an advertiser.
+    Read from the index file; on first use it is rebuilt from the
+    <creative_id>/metadata.json tree left by earlier runs.
+    """
+    index_path = os.path.join(advertiser_dir, KNOWN_IDS_INDEX)
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            return set(json.load(f))
+
+    known_ids = set()
+    if os.path.isdir(advertiser_dir):
+        known_ids = {
+            entry.name for entry in os.scandir(advertiser_dir)
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "metadata.json"))
+        }
+    save_known_creative_ids(advertiser_dir, known_ids)
+    return known_ids
+
+
+def save_known_creative_ids(advertiser_dir, known_ids):
+    os.makedirs(advertiser_dir, exist_ok=True)
+    with open(os.path.join(advertiser_dir, KNOWN_IDS_INDEX), "w", encoding="utf-8") as f:
+        json.dump(sorted(known_ids), f)
+
+
 # ========================
 # PHASE 1: COLLECT CREATIVE URLS
 # ========================
 
-def collect_creative_urls(page):
-    creative_urls = []
+class CreativeDiscovery:
+    """
+    Accumulates creative URLs across scrolls with O(1) de-duplication.
+    With known_ids, already-collected creatives are skipped and discovery
+    stops after KNOWN_SCREEN_SIZE of them in a row, so a refresh only
+    touches the new ads at the top of the advertiser page.
+    """
+
+    def __init__(self, known_ids=None, max_ads=MAX_ADS):
+        self.known_ids = known_ids or set()
+        self.max_ads = max_ads
+        self.creative_urls = []
+        self._seen = set()
+        self._known_run = 0
+
+    def add(self, href):
+        if not href:
+            return self.done
+        if href.startswith("/"):
+            href = "https://adstransparency.google.com" + href
+        if href in self._seen:
+            return self.done
+        self._seen.add(href)
+
+        _, creative_id = extract_ids(href)
+        if creative_id in self.known_ids:
+            self._known_run += 1
+        else:
+            self._known_run = 0
+            self.creative_urls.append(href)
+        return self.done
+
+    @property
+    def done(self):
+        if self.max_ads and len(self.creative_urls) >= self.max_ads:
+            return True
+        return bool(self.known_ids) and self._known_run >= KNOWN_SCREEN_SIZE
+
+    @property
+    def result(self):
+        return self.creative_urls[:self.max_ads] if self.max_ads else self.creative_urls
+
+
+def collect_creative_urls(page, known_ids=None):
+    discovery = CreativeDiscovery(known_ids)
 
     for _ in range(SCROLL_COUNT):
-        links = page.query_selector_all("a[href*='/creative/']")
-        for link in links:
-            href = link.get_attribute("href")
-            if href:
-                if href.startswith("/"):
-                    href = "https://adstransparency.google.com" + href
-                if href not in creative_urls:
-                    creative_urls.append(href)
-
-                # 🔥 STOP once we have 20 ads
-                if len(creative_urls) >= MAX_ADS:
-                    return creative_urls
+        hrefs = page.eval_on_selector_all(
+            "a[href*='/creative/']", "els => els.map(e => e.getAttribute('href'))"
+        )
+        for href in hrefs:
+            # 🔥 STOP once we have 20 new ads or a screen of known ones
+            if discovery.add(href):
+                return discovery.result
 
         page.mouse.wheel(0, 3000)
         page.wait_for_timeout(SCROLL_DELAY * 1000)
 
-    return creative_urls[:MAX_ADS]
+    return discovery.result
 
 
 # ========================
 # PHASE 2: EXTRACT AD DATA
 # ========================
 
-def extract_ad_data(page, url):
-    advertiser_id, creative_id = extract_ids(url)
-
-    raw_text = page.inner_text("body")
+def parse_ad_text(raw_text):
     lines = [l.strip() for l in raw_text.split("\n") if l.strip()]
 
     headline = lines[0] if lines else ""
     description = " ".join(lines[1:4]) if len(lines) > 4 else ""
+    cta = next((l for l in lines if l in POSSIBLE_CTAS), "")
 
-    possible_ctas = [
-        "Learn more", "Shop now", "Sign up", "Download",
-        "Apply now", "Watch now", "Get started"
-    ]
-    cta = next((l for l in lines if l in possible_ctas), "")
+    return {"headline": headline, "description": description, "cta": cta}
 
-    is_video = False
-    try:
-        page.locator("video").first.wait_for(timeout=3000)
-        is_video = True
-    except:
-        pass
+
+def build_ad_data(url, text, is_video, source="ads_transparency_ui"):
+    advertiser_id, creative_id = extract_ids(url)
 
     return {
         "platform": "google",
-        "source": "ads_transparency_ui",
+        "source": source,
         "advertiser_id": advertiser_id,
         "creative_id": creative_id,
         "ad_url": url,
-        "headline": headline,
-        "description": description,
-        "cta": cta,
+        "headline": text["headline"],
+        "description": text["description"],
+        "cta": text["cta"],
         "is_video": is_video,
         "date_collected": datetime.utcnow().isoformat()
     }
 
 
+def extract_ad_data(page, url):
+    text = parse_ad_text(page.inner_text("body"))
+
+    is_video = False
+    try:
+        page.locator("video").first.wait_for(timeout=3000)
+        is_video = True
+    except:
+        pass
+
+    return build_ad_data(url, text, is_video)
+
+
+def save_metadata(ad_dir, ad_data):
+    os.makedirs(ad_dir, exist_ok=True)
+    with open(os.path.join(ad_dir, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(ad_data, f, indent=2)
+
+
 # ========================
 # VIDEO SCREENSHOTS
 # ========================
@@ -161,10 +250,12 @@ def estimate_reach(ad_data, creative_index):
 # MAIN
 # ========================
 
-def main():
+def main_headed():
+    """Original sequential, headed run - handy for watching the scraper work"""
     advertiser_id, _ = extract_ids(ADVERTISER_URL)
     advertiser_dir = os.path.join(BASE_DIR, advertiser_id)
     os.makedirs(advertiser_dir, exist_ok=True)
+    known_ids = load_known_creative_ids(advertiser_dir)
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False, slow_mo=100)
@@ -174,8 +265,8 @@ def main():
         page.goto(ADVERTISER_URL, timeout=60000)
         page.wait_for_timeout(4000)
 
-        creative_urls = collect_creative_urls(page)
-        print(f"🔍 Processing {len(creative_urls)} ads (limit = {MAX_ADS})")
+        creative_urls = collect_creative_urls(page, known_ids)
+        print(f"🔍 Processing {len(creative_urls)} new ads (limit = {MAX_ADS}, {len(known_ids)} already collected)")
 
         # ---- Phase 2 ----
         for idx, url in enumerate(creative_urls, start=1):
@@ -195,8 +286,8 @@ def main():
             # Add estimated reach
             ad_data.update(estimate_reach(ad_data, creative_index=idx))
 
-            with open(os.path.join(ad_dir, "metadata.json"), "w", encoding="utf-8") as f:
-                json.dump(ad_data, f, indent=2)
+            save_metadata(ad_dir, ad_data)
+            known_ids.add(creative_id)
 
             if ad_data["is_video"]:
                 capture_video_frames(page, frames_dir)
@@ -205,8 +296,20 @@ def main():
 
         browser.close()
 
+    save_known_creative_ids(advertiser_dir, known_ids)
     print("✅ Finished extracting 20 ads successfully")
 
 
+def main():
+    # Headless engine: a pool of browser contexts with event-driven waits
+    import asyncio
+    try:
+        from ml.scripts.google_ads_engine import scrape_advertiser
+    except ImportError:  # run directly as a script
+        from google_ads_engine import scrape_advertiser
+
+    asyncio.run(scrape_advertiser(ADVERTISER_URL))
+
+
 if __name__ == "__main__":
     main()
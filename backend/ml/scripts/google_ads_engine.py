@@ -0,0 +1,536 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+try:
+    from ml.scripts.google_ads import (
+        ADVERTISER_URL, BASE_DIR, MAX_ADS, SCREENSHOT_TIMES, POSSIBLE_CTAS, CreativeDiscovery,
+        extract_ids, parse_ad_text, build_ad_data, estimate_reach, save_metadata,
+        load_known_creative_ids, save_known_creative_ids,
+    )
+except ImportError:  # run directly as a script
+    from google_ads import (
+        ADVERTISER_URL, BASE_DIR, MAX_ADS, SCREENSHOT_TIMES, POSSIBLE_CTAS, CreativeDiscovery,
+        extract_ids, parse_ad_text, build_ad_data, estimate_reach, save_metadata,
+        load_known_creative_ids, save_known_creative_ids,
+    )
+
+# ========================
+# CONFIG
+# ========================
+
+# Number of browser contexts pulling creative URLs from the queue
+CONCURRENCY = int(os.environ.get("GOOGLE_ADS_CONCURRENCY", "4"))
+
+# Politeness: at most this many pages in flight per host, and a minimum
+# gap between navigations to the same host
+HOST_CONCURRENCY = int(os.environ.get("GOOGLE_ADS_HOST_CONCURRENCY", "4"))
+HOST_MIN_INTERVAL = float(os.environ.get("GOOGLE_ADS_HOST_MIN_INTERVAL", "0.5"))
+
+NAV_TIMEOUT_MS = 60000
+READY_TIMEOUT_MS = 15000
+IDLE_TIMEOUT_MS = 10000
+SCROLL_TIMEOUT_MS = 5000
+MAX_RETRIES = 1
+
+CREATIVE_LINK_SELECTOR = "a[href*='/creative/']"
+CREATIVE_READY_SELECTOR = "creative-details, creative-preview, video, iframe"
+PLAY_BUTTON_SELECTOR = "button[aria-label='Play']"
+
+# Extraction mode:
+#   "dom"     - read the rendered page text (original behaviour)
+#   "network" - parse the page's own RPC responses and block heavy resources
+EXTRACTION_MODE = os.environ.get("GOOGLE_ADS_EXTRACTION_MODE", "dom")
+
+# Only the creative-details RPC is captured. Its response is protobuf-JSON
+# keyed by field number; CREATIVE_RPC_FIELDS is where each field sits
+# (creative -> first variation -> text / media). If the Transparency Center
+# changes its schema, update the paths here; until then the DOM fallback runs.
+RPC_URL_MARKERS = ("/rpc/LookupService/GetCreativeById",)
+CREATIVE_RPC_FIELDS = {
+    "headline": ("1", "5", 0, "3", "1"),
+    "description": ("1", "5", 0, "3", "2"),
+    "cta": ("1", "5", 0, "3", "3"),
+    "video_url": ("1", "5", 0, "2", "4"),
+}
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+XSSI_PREFIX = ")]}'"
+
+
+# ========================
+# HOST THROTTLE
+# ========================
+
+class HostThrottle:
+    """Per-host concurrency cap plus a minimum interval between request starts"""
+
+    def __init__(self, concurrency=HOST_CONCURRENCY, min_interval=HOST_MIN_INTERVAL):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self._semaphores = {}
+        self._locks = {}
+        self._last_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url):
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        lock = self._locks.setdefault(host, asyncio.Lock())
+
+        async with semaphore:
+            async with lock:
+                wait = self._last_start.get(host, 0) + self.min_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[host] = time.monotonic()
+            yield
+
+
+# ========================
+# EVENT-DRIVEN WAITS
+# ========================
+
+async def wait_until_ready(page, selector=CREATIVE_READY_SELECTOR):
+    # Wait for the creative itself, then for the network to settle.
+    # Either can legitimately time out (text-only ads, long-polling pages).
+    try:
+        await page.wait_for_selector(selector, state="attached", timeout=READY_TIMEOUT_MS)
+    except PlaywrightTimeoutError:
+        pass
+
+    try:
+        await page.wait_for_load_state("networkidle", timeout=IDLE_TIMEOUT_MS)
+    except PlaywrightTimeoutError:
+        pass
+
+
+# ========================
+# PHASE 1: COLLECT CREATIVE URLS
+# ========================
+
+async def collect_creative_urls_async(page, max_ads=MAX_ADS, known_ids=None):
+    """Scroll until max_ads new creatives are found, a screen of known ones is seen, or the list stops growing"""
+    discovery = CreativeDiscovery(known_ids, max_ads)
+
+    while True:
+        hrefs = await page.eval_on_selector_all(
+            CREATIVE_LINK_SELECTOR, "els => els.map(e => e.getAttribute('href'))"
+        )
+        for href in hrefs:
+            if discovery.add(href):
+                return discovery.result
+
+        await page.mouse.wheel(0, 3000)
+        try:
+            await page.wait_for_function(
+                "([sel, n]) => document.querySelectorAll(sel).length > n",
+                arg=[CREATIVE_LINK_SELECTOR, len(hrefs)],
+                timeout=SCROLL_TIMEOUT_MS,
+            )
+        except PlaywrightTimeoutError:
+            # Nothing new loaded after scrolling: end of the advertiser's list
+            return discovery.result
+
+
+# ========================
+# PHASE 2: EXTRACT AD DATA
+# ========================
+
+async def extract_ad_data_async(page, url):
+    text = parse_ad_text(await page.inner_text("body"))
+    is_video = await page.query_selector("video") is not None
+    return build_ad_data(url, text, is_video)
+
+
+async def capture_video_frames_async(page, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+
+    try:
+        await page.click(PLAY_BUTTON_SELECTOR, timeout=3000)
+    except PlaywrightTimeoutError:
+        pass
+
+    # Screenshot when playback actually reaches each timestamp, not after a fixed sleep
+    for t in SCREENSHOT_TIMES:
+        try:
+            await page.wait_for_function(
+                "t => { const v = document.querySelector('video'); return !!v && (v.currentTime >= t || v.ended); }",
+                arg=t,
+                timeout=(t + 10) * 1000,
+            )
+        except PlaywrightTimeoutError:
+            pass
+        await page.screenshot(path=os.path.join(out_dir, f"frame_{t}s.png"), full_page=False)
+
+
+# ========================
+# NETWORK-INTERCEPTION MODE
+# ========================
+
+async def block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def parse_rpc_body(text):
+    text = text.strip()
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def rpc_field(payload, path):
+    """Value at `path` (keys / list indexes) in a protobuf-JSON payload, or None"""
+    for key in path:
+        try:
+            payload = payload[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return payload
+
+
+def _rpc_text(value):
+    if isinstance(value, list):
+        value = " ".join(v.strip() for v in value if isinstance(v, str) and v.strip())
+    return value.strip() if isinstance(value, str) else ""
+
+
+def parse_creative_payloads(payloads):
+    """
+    Pull creative metadata out of captured creative-details RPC payloads,
+    reading each field from its position (CREATIVE_RPC_FIELDS).
+    The most recent payload with a headline or a video URL wins.
+    Returns None when nothing usable was captured.
+    """
+    for payload in reversed(payloads):
+        fields = {name: _rpc_text(rpc_field(payload, path)) for name, path in CREATIVE_RPC_FIELDS.items()}
+        if not (fields["headline"] or fields["video_url"]):
+            continue
+
+        return {
+            "text": {
+                "headline": fields["headline"],
+                "description": fields["description"],
+                "cta": fields["cta"] if fields["cta"] in POSSIBLE_CTAS else "",
+            },
+            "video_url": fields["video_url"] or None,
+        }
+    return None
+
+
+class ResponseCapture:
+    """
+    Collects JSON bodies of the page's creative RPC responses as they arrive.
+    Each response is tagged with the capture generation it arrived in, so a
+    read that finishes after reset() (a late response from the previous
+    creative) is dropped instead of mixed into the next creative's payloads.
+    """
+
+    def __init__(self, page):
+        self.payloads = []
+        self._pending = set()
+        self._generation = 0
+        page.on("response", self._on_response)
+
+    async def reset(self):
+        """Start a new creative: let in-flight reads finish, then discard everything captured so far"""
+        self._generation += 1
+        await self.drain()
+        self.payloads = []
+
+    def _on_response(self, response):
+        if any(marker in response.url for marker in RPC_URL_MARKERS):
+            task = asyncio.ensure_future(self._read(response, self._generation))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response, generation):
+        try:
+            payload = parse_rpc_body(await response.text())
+        except Exception:
+            return
+        if payload is not None and generation == self._generation:
+            self.payloads.append(payload)
+
+    async def drain(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+async def extract_ad_data_network(page, url, capture):
+    await capture.drain()
+    fields = parse_creative_payloads(capture.payloads)
+    if fields is None:
+        # No RPC traffic recognised (layout change?) - fall back to the DOM
+        return await extract_ad_data_async(page, url)
+
+    # The <video> element still exists even though its media is blocked
+    is_video = fields["video_url"] is not None or await page.query_selector("video") is not None
+    ad_data = build_ad_data(url, fields["text"], is_video, source="ads_transparency_rpc")
+    ad_data["video_url"] = fields["video_url"]
+    return ad_data
+
+
+def sample_video_frames(video_path, out_dir):
+    """Save the frames at SCREENSHOT_TIMES, named like the DOM-mode playback screenshots (frame_<t>s.png)"""
+    import cv2  # heavy - only imported once a video actually needs sampling
+
+    os.makedirs(out_dir, exist_ok=True)
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video {video_path}")
+
+    try:
+        frame = None
+        for t in SCREENSHOT_TIMES:
+            cap.set(cv2.CAP_PROP_POS_MSEC, t * 1000)
+            ok, next_frame = cap.read()
+            if ok:
+                frame = next_frame
+            # Past the end of a short clip, keep the last frame read (playback would have ended there)
+            if frame is not None:
+                cv2.imwrite(os.path.join(out_dir, f"frame_{t}s.png"), frame)
+    finally:
+        cap.release()
+
+
+async def video_src(page):
+    """Media URL named by the page's <video> element, if any"""
+    try:
+        src = await page.eval_on_selector("video", "v => v.currentSrc || v.src || (v.querySelector('source') || {}).src")
+    except Exception:
+        return None
+    return src if isinstance(src, str) and src.startswith("http") else None
+
+
+async def download_and_sample_video(page, video_url, ad_dir):
+    """Fetch the creative's media once and sample frames locally instead of screenshotting playback"""
+    response = await page.context.request.get(video_url, timeout=NAV_TIMEOUT_MS)
+    if not response.ok:
+        print(f"⚠️ Video download failed ({response.status}): {video_url}")
+        return None
+
+    ext = ".webm" if ".webm" in video_url else ".mp4"
+    video_path = os.path.join(ad_dir, f"video{ext}")
+    with open(video_path, "wb") as f:
+        f.write(await response.body())
+
+    await asyncio.to_thread(sample_video_frames, video_path, os.path.join(ad_dir, "frames"))
+    return video_path
+
+
+# ========================
+# PER-CREATIVE PIPELINE
+# ========================
+
+async def scrape_creative(page, url, creative_index, advertiser_dir, throttle,
+                          capture_frames=True, capture=None):
+    _, creative_id = extract_ids(url)
+    if not creative_id:
+        return None
+
+    ad_dir = os.path.join(advertiser_dir, creative_id)
+
+    if capture:
+        await capture.reset()
+
+    async with throttle.slot(url):
+        await page.goto(url, timeout=NAV_TIMEOUT_MS, wait_until="domcontentloaded")
+        await wait_until_ready(page)
+
+    if capture:
+        ad_data = await extract_ad_data_network(page, url, capture)
+    else:
+        ad_data = await extract_ad_data_async(page, url)
+    ad_data.update(estimate_reach(ad_data, creative_index=creative_index))
+    save_metadata(ad_dir, ad_data)
+
+    if capture_frames and ad_data["is_video"]:
+        video_url = ad_data.get("video_url")
+        if capture and not video_url:
+            # Not in the RPC payload; the <video> element may still name it
+            video_url = await video_src(page)
+
+        if video_url:
+            await download_and_sample_video(page, video_url, ad_dir)
+        elif capture:
+            # Media is blocked in network mode, so playback screenshots are not an option
+            print(f"⚠️ No video URL found for {creative_id}, frames skipped")
+        else:
+            await capture_video_frames_async(page, os.path.join(ad_dir, "frames"))
+
+    return ad_data
+
+
+# ========================
+# WORKER POOL
+# ========================
+
+async def _new_context(browser, mode):
+    context = await browser.new_context()
+    if mode == "network":
+        await context.route("**/*", block_heavy_resources)
+    return context
+
+
+async def _new_page(context, mode):
+    page = await context.new_page()
+    capture = ResponseCapture(page) if mode == "network" else None
+    return page, capture
+
+
+async def _close_quietly(target):
+    if target is None:
+        return
+    try:
+        await target.close()
+    except Exception:
+        pass
+
+
+async def _open_page(browser, context, mode):
+    """A fresh page on `context`, replacing the context itself if it can no longer open pages"""
+    if context is not None:
+        try:
+            page, capture = await _new_page(context, mode)
+            return context, page, capture
+        except Exception as e:
+            print(f"⚠️ Browser context unusable ({e}), opening a new one")
+            await _close_quietly(context)
+
+    context = await _new_context(browser, mode)
+    try:
+        page, capture = await _new_page(context, mode)
+    except Exception:
+        await _close_quietly(context)
+        raise
+    return context, page, capture
+
+
+async def _worker(name, browser, queue, throttle, advertiser_dir, results, capture_frames, mode):
+    context = page = capture = None
+
+    try:
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+
+                creative_index, url = item
+                for attempt in range(MAX_RETRIES + 1):
+                    try:
+                        if page is None:
+                            context, page, capture = await _open_page(browser, context, mode)
+                        ad_data = await scrape_creative(
+                            page, url, creative_index, advertiser_dir, throttle, capture_frames, capture
+                        )
+                        if ad_data:
+                            results.append(ad_data)
+                        break
+                    except Exception as e:
+                        print(f"⚠️ [{name}] Attempt {attempt + 1} failed for {url}: {e}")
+                        # A crashed or wedged page is replaced before the next attempt.
+                        # Opening the replacement happens inside the try above, so a
+                        # browser that cannot open pages fails this creative, not the worker.
+                        await _close_quietly(page)
+                        page = capture = None
+            finally:
+                queue.task_done()
+    finally:
+        await _close_quietly(context)
+
+
+async def scrape_advertiser(advertiser_url=ADVERTISER_URL, concurrency=CONCURRENCY,
+                            max_ads=MAX_ADS, capture_frames=True, mode=EXTRACTION_MODE,
+                            incremental=True):
+    """
+    Headless scrape of one advertiser: collect creative URLs, then fan them
+    out to `concurrency` browser contexts through an asyncio queue.
+    `mode` selects DOM text extraction or RPC response interception.
+    With `incremental`, creatives already on disk are skipped.
+    Returns the list of ad metadata dicts written to disk.
+    """
+    advertiser_id, _ = extract_ids(advertiser_url)
+    advertiser_dir = os.path.join(BASE_DIR, advertiser_id)
+    os.makedirs(advertiser_dir, exist_ok=True)
+    known_ids = load_known_creative_ids(advertiser_dir)
+    # A full run re-collects everything but still adds to the index, never replaces it
+    skip_ids = known_ids if incremental else set()
+
+    throttle = HostThrottle()
+    results = []
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            # ---- Phase 1 ----
+            context = await browser.new_context()
+            page = await context.new_page()
+            async with throttle.slot(advertiser_url):
+                await page.goto(advertiser_url, timeout=NAV_TIMEOUT_MS, wait_until="domcontentloaded")
+                await wait_until_ready(page, CREATIVE_LINK_SELECTOR)
+            creative_urls = await collect_creative_urls_async(page, max_ads, skip_ids)
+            await context.close()
+
+            # ---- Phase 2 ----
+            workers = max(1, min(concurrency, len(creative_urls)))
+            print(f"🔍 Processing {len(creative_urls)} ads with {workers} browser context(s), mode={mode}")
+
+            queue = asyncio.Queue()
+            for item in enumerate(creative_urls, start=1):
+                queue.put_nowait(item)
+            for _ in range(workers):
+                queue.put_nowait(None)
+
+            await asyncio.gather(*(
+                _worker(f"ctx-{i}", browser, queue, throttle, advertiser_dir, results, capture_frames, mode)
+                for i in range(workers)
+            ))
+        finally:
+            await browser.close()
+
+    known_ids.update(ad_data["creative_id"] for ad_data in results)
+    save_known_creative_ids(advertiser_dir, known_ids)
+    print(f"✅ Finished extracting {len(results)} ads successfully")
+    return results
+
+
+# ========================
+# MAIN
+# ========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Google Ads Transparency scraper")
+    parser.add_argument("advertiser_url", nargs="?", default=ADVERTISER_URL)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--max-ads", type=int, default=MAX_ADS, help="0 = no limit")
+    parser.add_argument("--no-frames", action="store_true", help="Skip video frame capture")
+    parser.add_argument("--full", action="store_true", help="Re-collect creatives already on disk")
+    parser.add_argument("--mode", choices=["dom", "network"], default=EXTRACTION_MODE,
+                        help="network = parse RPC responses and block images/fonts/media")
+    args = parser.parse_args()
+
+    asyncio.run(scrape_advertiser(
+        args.advertiser_url,
+        concurrency=args.concurrency,
+        max_ads=args.max_ads,
+        capture_frames=not args.no_frames,
+        mode=args.mode,
+        incremental=not args.full,
+    ))
+
+
+if __name__ == "__main__":
+    main()
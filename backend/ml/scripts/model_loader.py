@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+model_loader.py
+
+Lazy, thread-safe loading of the heavy analysis stack:
+- Modules (analyze_ads pulls in cv2, moviepy, scenedetect, sklearn, whisper,
+  face_recognition, pytesseract) are imported on first use, not at startup
+- The Whisper model is loaded once, on first use, and shared
+- An optional background warm-up thread loads everything ahead of the first
+  analysis request without delaying the read-only endpoints
+- Every load is timed so startup and first-use costs can be reported
+"""
+
+import importlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# ===========================
+# Config
+# ===========================
+
+WHISPER_MODEL_NAME = os.environ.get("WHISPER_MODEL_NAME", "small")
+
+# Read-only endpoints should be serving within this many seconds of process start
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "1.0"))
+
+ANALYZE_ADS_MODULE = "ml.scripts.analyze_ads"
+CREATIVE_REPORT_MODULE = "ml.scripts.creative_reverse_engineering"
+
+# ===========================
+# Registry
+# ===========================
+
+_registry_lock = threading.Lock()
+_locks: Dict[str, threading.Lock] = {}
+_loaded: Dict[str, Any] = {}
+_timings: Dict[str, float] = {}
+_startup: Dict[str, float] = {}
+_warm_up_thread: Optional[threading.Thread] = None
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _registry_lock:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+def load(key: str, factory: Callable[[], Any]) -> Any:
+    """
+    Return the object registered under `key`, building it with `factory` on first use.
+    Concurrent callers for the same key wait for a single load; different keys load independently.
+    """
+    if key in _loaded:
+        return _loaded[key]
+
+    with _lock_for(key):
+        if key not in _loaded:
+            print(f"[INFO] Loading {key}...")
+            started = time.perf_counter()
+            _loaded[key] = factory()
+            _timings[key] = time.perf_counter() - started
+            print(f"[INFO] Loaded {key} in {_timings[key]:.2f}s")
+    return _loaded[key]
+
+
+def is_loaded(key: str) -> bool:
+    return key in _loaded
+
+
+def module(name: str) -> Any:
+    """Import a module on first use"""
+    return load(name, lambda: importlib.import_module(name))
+
+
+def analyze_ads():
+    return module(ANALYZE_ADS_MODULE)
+
+
+def creative_report():
+    return module(CREATIVE_REPORT_MODULE)
+
+
+def whisper_model():
+    """Shared Whisper model, loaded on first use"""
+    return load(
+        f"whisper:{WHISPER_MODEL_NAME}",
+        lambda: module("whisper").load_model(WHISPER_MODEL_NAME),
+    )
+
+# ===========================
+# Warm-up
+# ===========================
+
+DEFAULT_WARM_UP: List[Callable[[], Any]] = [analyze_ads, creative_report, whisper_model]
+
+
+def start_warm_up(loaders: Optional[List[Callable[[], Any]]] = None) -> threading.Thread:
+    """Load models in a daemon thread; requests arriving meanwhile wait only on what they need"""
+    global _warm_up_thread
+
+    def run():
+        for loader in loaders or DEFAULT_WARM_UP:
+            try:
+                loader()
+            except Exception as e:
+                print(f"[WARN] Warm-up failed for {getattr(loader, '__name__', loader)}: {e}")
+        print("[INFO] Warm-up complete")
+
+    with _registry_lock:
+        if _warm_up_thread is None or not _warm_up_thread.is_alive():
+            _warm_up_thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+# ===========================
+# Budget report
+# ===========================
+
+def mark_ready(started_at: float) -> float:
+    """Record how long the process took to become ready to serve, from a perf_counter() start"""
+    elapsed = time.perf_counter() - started_at
+    _startup["ready_seconds"] = elapsed
+    status = "OK" if elapsed <= STARTUP_BUDGET_SECONDS else "OVER BUDGET"
+    print(f"[INFO] Ready to serve in {elapsed:.2f}s (budget {STARTUP_BUDGET_SECONDS:.2f}s) - {status}")
+    return elapsed
+
+
+def budget_report() -> Dict[str, Any]:
+    ready = _startup.get("ready_seconds")
+    return {
+        "budget_seconds": STARTUP_BUDGET_SECONDS,
+        "ready_seconds": ready,
+        "within_budget": ready is not None and ready <= STARTUP_BUDGET_SECONDS,
+        "loaded": {key: round(seconds, 3) for key, seconds in _timings.items()},
+        "warming_up": _warm_up_thread is not None and _warm_up_thread.is_alive(),
+    }
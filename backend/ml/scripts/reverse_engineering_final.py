@@ -2,8 +2,12 @@
 """
 Flask backend for Video Analysis Dashboard
 """
+import time
+_STARTED_AT = time.perf_counter()
+
 import os
 import json
+import datetime
 from pathlib import Path
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
@@ -12,8 +16,8 @@ import sys
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ml.scripts.analyze_ads import analyze_video, analyze_image
-from ml.scripts.creative_reverse_engineering import analyze_file
+# Heavy analysis modules (cv2, whisper, ...) are loaded on first use via model_loader
+from ml.scripts import analysis_catalog, model_loader
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -30,11 +34,12 @@ REPORT_DIR = DATA_DIR / "reports"
 for dir_path in [RAW_VIDEO_DIR, ANALYSIS_DIR, REPORT_DIR]:
     dir_path.mkdir(parents=True, exist_ok=True)
 
-# Load Whisper model once at startup
-print("[INFO] Loading Whisper model...")
-import whisper
-whisper_model = whisper.load_model("small")
-print("[INFO] Whisper model loaded")
+# Pick up analyses written while the server was down (or by the batch pipeline)
+analysis_catalog.sync_catalog(ANALYSIS_DIR)
+
+# Load Whisper and the analysis stack in the background instead of blocking startup
+if os.environ.get("WARM_UP_MODELS", "1") == "1":
+    model_loader.start_warm_up()
 
 @app.route('/')
 def home():
@@ -61,11 +66,10 @@ def analyze_video_endpoint():
         if video_path.suffix.lower() in supported_video:
             # Analyze video
             print(f"[API] Analyzing video: {video_path}")
-            analysis = analyze_video(video_path, whisper_model)
+            analysis = model_loader.analyze_ads().analyze_video(video_path, model_loader.whisper_model())
             
             # Save analysis as TOON
             from toon import encode
-            import datetime
             analysis_id = f"video_{video_path.stem}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
             toon_path = ANALYSIS_DIR / f"{analysis_id}_analysis.toon"
             
@@ -83,9 +87,10 @@ def analyze_video_endpoint():
             sanitized_analysis = convert_paths(analysis)
             toon_str = encode(sanitized_analysis)
             toon_path.write_text(toon_str, encoding="utf-8")
+            analysis_catalog.record_analysis(toon_path, sanitized_analysis, file_type='video')
             
             # Generate creative report
-            report = analyze_file(toon_path)
+            report = model_loader.creative_report().analyze_file(toon_path)
             
             return jsonify({
                 'success': True,
@@ -98,7 +103,7 @@ def analyze_video_endpoint():
         elif video_path.suffix.lower() in supported_image:
             # Analyze image
             print(f"[API] Analyzing image: {video_path}")
-            analysis = analyze_image(video_path)
+            analysis = model_loader.analyze_ads().analyze_image(video_path)
             
             # Save analysis as JSON (for consistency)
             analysis_id = f"image_{video_path.stem}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -106,6 +111,7 @@ def analyze_video_endpoint():
             
             with open(json_path, 'w', encoding='utf-8') as f:
                 json.dump(analysis, f, indent=2, ensure_ascii=False)
+            analysis_catalog.record_analysis(json_path, analysis, file_type='image')
             
             # For images, we don't generate creative report, use analysis directly
             return jsonify({
@@ -127,42 +133,34 @@ def analyze_video_endpoint():
 def get_analysis(analysis_id):
     """Get analysis by ID"""
     try:
-        # Look for TOON file
-        toon_path = ANALYSIS_DIR / f"{analysis_id}_analysis.toon"
-        if toon_path.exists():
-            from toon import decode
-            toon_str = toon_path.read_text(encoding="utf-8")
-            analysis = decode(toon_str)
-            
-            # Look for report
+        entry = analysis_catalog.find_analysis(analysis_id)
+        if entry and Path(entry['path']).exists():
+            analysis_path = Path(entry['path'])
+        else:
+            # Not catalogued yet - fall back to the naming convention
+            toon_path = ANALYSIS_DIR / f"{analysis_id}_analysis.toon"
+            json_path = ANALYSIS_DIR / f"{analysis_id}_analysis.json"
+            analysis_path = toon_path if toon_path.exists() else json_path
+            if not analysis_path.exists():
+                return jsonify({'error': 'Analysis not found'}), 404
+            analysis_catalog.record_analysis(analysis_path)
+        
+        analysis = analysis_catalog.load_analysis(analysis_path)
+        
+        # Reports only exist for videos (TOON analyses)
+        report = None
+        if analysis_path.suffix == '.toon':
             report_path = REPORT_DIR / f"{analysis_id}_report.json"
             if report_path.exists():
                 with open(report_path, 'r', encoding='utf-8') as f:
                     report = json.load(f)
-            else:
-                report = None
-            
-            return jsonify({
-                'success': True,
-                'analysis_id': analysis_id,
-                'raw_analysis': analysis,
-                'creative_report': report
-            })
         
-        # Look for JSON file (for images)
-        json_path = ANALYSIS_DIR / f"{analysis_id}_analysis.json"
-        if json_path.exists():
-            with open(json_path, 'r', encoding='utf-8') as f:
-                analysis = json.load(f)
-            
-            return jsonify({
-                'success': True,
-                'analysis_id': analysis_id,
-                'raw_analysis': analysis,
-                'creative_report': None
-            })
-        
-        return jsonify({'error': 'Analysis not found'}), 404
+        return jsonify({
+            'success': True,
+            'analysis_id': analysis_id,
+            'raw_analysis': analysis,
+            'creative_report': report
+        })
         
     except Exception as e:
         print(f"[ERROR] Failed to get analysis: {e}")
@@ -172,46 +170,24 @@ def get_analysis(analysis_id):
 def get_recent_analyses():
     """Get list of recent analyses"""
     try:
-        analyses = []
-        
-        # Get TOON files
-        for toon_file in ANALYSIS_DIR.glob("*_analysis.toon"):
-            analysis_id = toon_file.stem.replace("_analysis", "")
-            file_type = "video" if "video_" in analysis_id else "unknown"
-            
-            analyses.append({
-                'id': analysis_id,
-                'file_type': file_type,
-                'created_at': toon_file.stat().st_mtime,
-                'path': str(toon_file)
-            })
-        
-        # Get JSON files (images)
-        for json_file in ANALYSIS_DIR.glob("*_analysis.json"):
-            analysis_id = json_file.stem.replace("_analysis", "")
-            file_type = "image" if "image_" in analysis_id else "unknown"
-            
-            analyses.append({
-                'id': analysis_id,
-                'file_type': file_type,
-                'created_at': json_file.stat().st_mtime,
-                'path': str(json_file)
-            })
-        
-        # Sort by creation time (newest first)
-        analyses.sort(key=lambda x: x['created_at'], reverse=True)
+        analyses = analysis_catalog.recent_analyses(limit=10)
         
         # Convert timestamps
         for analysis in analyses:
-            from datetime import datetime
-            analysis['created_at'] = datetime.fromtimestamp(analysis['created_at']).isoformat()
+            analysis['created_at'] = datetime.datetime.fromtimestamp(analysis['created_at']).isoformat()
         
-        return jsonify({'success': True, 'analyses': analyses[:10]})  # Last 10
+        return jsonify({'success': True, 'analyses': analyses})
         
     except Exception as e:
         print(f"[ERROR] Failed to get recent analyses: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/startup-report', methods=['GET'])
+def get_startup_report():
+    """Startup time against budget and per-model load times"""
+    return jsonify({'success': True, 'report': model_loader.budget_report()})
+
 if __name__ == '__main__':
+    model_loader.mark_ready(_STARTED_AT)
     print("[INFO] Starting Flask server on http://localhost:5000")
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app.run(debug=True, port=5000)
\ No newline at end of file
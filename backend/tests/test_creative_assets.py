@@ -0,0 +1,96 @@
+"""
+Tests for the AutoCreate creative-assets blueprint (app/api/AutoCreate/creative_assets.py)
+
+Runway is never called: task creation, the reference uploader and the poller
+are replaced per test, and campaigns live in the default in-memory store.
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("PIL")
+
+# AutoCreate modules import their siblings by name
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app', 'api', 'AutoCreate')))
+
+from flask import Flask  # noqa: E402
+
+import creative_assets  # noqa: E402
+from creative_store import MemoryCreativeStore  # noqa: E402
+
+CAMPAIGN_ID = "campaign-1"
+
+
+class FakeUploader:
+    def reference_uri(self, filepath, content_hash=None):
+        return "data:image/jpeg;base64,AAAA"
+
+
+class FakePoller:
+    def __init__(self):
+        self.tracked = []
+
+    def track(self, task_id):
+        self.tracked.append(task_id)
+
+
+class NoLimit:
+    def wait(self):
+        pass
+
+
+@pytest.fixture
+def poller(monkeypatch):
+    poller = FakePoller()
+    store = MemoryCreativeStore()
+    store.save_campaign(CAMPAIGN_ID, {"campaign_id": CAMPAIGN_ID, "filepath": "product.jpg", "content_hash": None})
+
+    monkeypatch.setattr(creative_assets, "RUNWAY_API_KEY", "test-key")
+    monkeypatch.setattr(creative_assets, "creative_store", store)
+    monkeypatch.setattr(creative_assets, "submit_limiter", NoLimit())
+    monkeypatch.setattr(creative_assets, "get_reference_uploader", lambda: FakeUploader())
+    monkeypatch.setattr(creative_assets, "get_runway_poller", lambda: poller)
+    return poller
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(creative_assets.creative_assets_bp)
+    return app.test_client()
+
+
+def test_generate_assets_keeps_the_variations_that_were_created(client, poller, monkeypatch):
+    def create_task(image_uri, prompt_text, variation_number=1, aspect_ratio=None):
+        if variation_number == 2:
+            raise RuntimeError("Runway rejected the task")
+        return f"task-{variation_number}"
+
+    monkeypatch.setattr(creative_assets, "create_image_generation_task", create_task)
+
+    response = client.post("/api/generate-assets", json={
+        "campaign_id": CAMPAIGN_ID, "asset_type": "image", "variations": 3,
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["task_ids"] == ["task-1", "task-3"]
+    assert body["variations"] == 2
+    assert sorted(poller.tracked) == ["task-1", "task-3"]
+
+
+def test_generate_assets_fails_when_no_variation_was_created(client, poller, monkeypatch):
+    def create_task(image_uri, prompt_text, variation_number=1, aspect_ratio=None):
+        raise RuntimeError("Runway is down")
+
+    monkeypatch.setattr(creative_assets, "create_image_generation_task", create_task)
+
+    response = client.post("/api/generate-assets", json={
+        "campaign_id": CAMPAIGN_ID, "asset_type": "image", "variations": 2,
+    })
+
+    assert response.status_code == 500
+    assert response.get_json()["error"] == "Failed to create any generation tasks"
+    assert poller.tracked == []
@@ -0,0 +1,110 @@
+"""
+Tests for the AutoCreate creative store backends and the Runway poller
+(app/api/AutoCreate/creative_store.py, runway_poller.py)
+
+Both backends run against the same assertions; the SQL backend uses a SQLite
+file under tmp_path. Runway is replaced by a fake status function.
+"""
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+# AutoCreate modules import their siblings by name
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app', 'api', 'AutoCreate')))
+
+from creative_store import MemoryCreativeStore, SQLCreativeStore  # noqa: E402
+from runway_poller import RunwayPoller  # noqa: E402
+
+CAMPAIGN_ID = "campaign-1"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryCreativeStore()
+    else:
+        store = SQLCreativeStore(f"sqlite:///{tmp_path / 'creative.db'}")
+    store.save_campaign(CAMPAIGN_ID, {"campaign_id": CAMPAIGN_ID})
+    return store
+
+
+def add_task(store, task_id, **fields):
+    store.add_task({"task_id": task_id, "campaign_id": CAMPAIGN_ID, "asset_type": "image",
+                    "status": "processing", "started_at": time.time(), **fields})
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+# ========================
+# STORE
+# ========================
+
+def test_update_task_keeps_keys_set_to_none(store):
+    add_task(store, "task-1", error="earlier error", meta={"a": 1})
+
+    store.update_task("task-1", error=None, meta={"b": [1, "2"]})
+
+    task = store.get_task("task-1")
+    assert "error" in task and task["error"] is None
+    assert task["meta"] == {"b": [1, "2"]}  # replaced, not deep-merged
+
+
+def test_claim_task_only_applies_from_the_expected_status(store):
+    add_task(store, "task-1")
+
+    assert store.claim_task("task-1", "processing", status="downloading")
+    assert not store.claim_task("task-1", "processing", status="failed")
+    assert store.get_task("task-1")["status"] == "downloading"
+
+
+def test_pending_task_ids_lists_unpolled_runway_tasks(store):
+    long_ago = time.time() - 600
+    add_task(store, "orphan", started_at=long_ago)
+    add_task(store, "recently-polled", started_at=long_ago, polled_at=time.time())
+    add_task(store, "done", started_at=long_ago, status="completed")
+    add_task(store, "sequence", started_at=long_ago, kind="sequence")
+
+    assert store.pending_task_ids(time.time() - 60) == ["orphan"]
+
+
+# ========================
+# POLLER
+# ========================
+
+def test_pollers_adopt_orphaned_tasks_and_finalize_them_once(tmp_path):
+    url = f"sqlite:///{tmp_path / 'creative.db'}"
+    submitted_by_dead_worker = SQLCreativeStore(url)
+    submitted_by_dead_worker.save_campaign(CAMPAIGN_ID, {"campaign_id": CAMPAIGN_ID})
+    add_task(submitted_by_dead_worker, "task-1", started_at=time.time() - 5)
+
+    finalized = []
+    lock = threading.Lock()
+
+    def on_success(task_info, output_url):
+        with lock:
+            finalized.append(task_info["task_id"])
+        store.update_task(task_info["task_id"], status="completed")
+
+    # Two workers restart against the same store
+    store = SQLCreativeStore(url)
+    pollers = [
+        RunwayPoller(SQLCreativeStore(url), lambda task_id: {"status": "SUCCEEDED", "output": ["https://x/1.png"]},
+                     on_success, orphan_after=1)
+        for _ in range(2)
+    ]
+    for poller in pollers:
+        poller.start()
+
+    assert wait_for(lambda: store.get_task("task-1")["status"] == "completed")
+    time.sleep(0.2)
+    assert finalized == ["task-1"]
@@ -0,0 +1,356 @@
+"""
+Tests for the headless Google Ads Transparency engine (ml/scripts/google_ads_engine.py)
+
+The advertiser grid and creative pages are local HTML fixtures served with
+http.server on localhost, so the real browser code paths run without
+touching adstransparency.google.com. Browser tests need playwright and its
+Chromium build (`playwright install chromium`) and are skipped otherwise.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+# Add backend/ to path, as the other scripts in this tree do
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+playwright_api = pytest.importorskip("playwright.async_api")
+
+from ml.scripts import google_ads_engine as engine  # noqa: E402
+from ml.scripts.google_ads import KNOWN_IDS_INDEX  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "google_ads")
+ADVERTISER_ID = "AR0000000000000000001"
+
+
+# ========================
+# FIXTURE SERVER
+# ========================
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, FixtureHandler)
+        self.creative_delay = 0.0
+        self.creative_hits = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def advertiser_url(self, total, batch=10):
+        return f"{self.base_url}/advertiser/{ADVERTISER_ID}?total={total}&batch={batch}"
+
+    def creative_url(self, creative_id):
+        return f"{self.base_url}/advertiser/{ADVERTISER_ID}/creative/{creative_id}?region=ALL"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if "/creative/" in path:
+            self._serve_creative(path.rsplit("/", 1)[1])
+        elif path.startswith("/advertiser/"):
+            self._send_fixture("advertiser.html")
+        else:
+            self.send_error(404)
+
+    def _serve_creative(self, creative_id):
+        server = self.server
+        with server._lock:
+            server.creative_hits.append(creative_id)
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            time.sleep(server.creative_delay)
+            self._send_fixture("creative.html", creative_id=creative_id)
+        finally:
+            with server._lock:
+                server.in_flight -= 1
+
+    def _send_fixture(self, name, **values):
+        with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+            html = f.read()
+        for key, value in values.items():
+            html = html.replace("{" + key + "}", value)
+
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = FixtureServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@pytest.fixture(scope="module")
+def chromium():
+    async def launch():
+        async with playwright_api.async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            await browser.close()
+
+    try:
+        asyncio.run(launch())
+    except Exception as e:
+        pytest.skip(f"Chromium is not available: {e}")
+
+
+@pytest.fixture(autouse=True)
+def fast_engine(monkeypatch, tmp_path):
+    # Keep end-of-list detection short and write scraped ads under tmp_path
+    monkeypatch.setattr(engine, "SCROLL_TIMEOUT_MS", 1000)
+    monkeypatch.setattr(engine, "BASE_DIR", str(tmp_path))
+
+
+def run_with_browser(test):
+    """Run `test(browser)` on a fresh headless Chromium"""
+    async def main():
+        async with playwright_api.async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                return await test(browser)
+            finally:
+                await browser.close()
+
+    return asyncio.run(main())
+
+
+def creative_ids(urls):
+    return [engine.extract_ids(url)[1] for url in urls]
+
+
+def run_workers(browser, urls, advertiser_dir, workers):
+    """Feed `urls` to `workers` _worker tasks exactly as scrape_advertiser does"""
+    async def main():
+        queue = asyncio.Queue()
+        for item in enumerate(urls, start=1):
+            queue.put_nowait(item)
+        for _ in range(workers):
+            queue.put_nowait(None)
+
+        results = []
+        throttle = engine.HostThrottle(concurrency=workers, min_interval=0)
+        await asyncio.gather(*(
+            engine._worker(f"ctx-{i}", browser, queue, throttle, advertiser_dir, results, False, "dom")
+            for i in range(workers)
+        ))
+        await asyncio.wait_for(queue.join(), timeout=1)
+        return results
+
+    return main()
+
+
+# ========================
+# PHASE 1: COLLECT CREATIVE URLS
+# ========================
+
+def _collect(server, total, max_ads, known_ids=None):
+    async def test(browser):
+        page = await browser.new_page()
+        await page.goto(server.advertiser_url(total))
+        urls = await engine.collect_creative_urls_async(page, max_ads=max_ads, known_ids=known_ids)
+        links = await page.eval_on_selector_all(engine.CREATIVE_LINK_SELECTOR, "els => els.length")
+        return urls, links
+
+    return run_with_browser(test)
+
+
+def test_collect_scrolls_until_the_list_stops_growing(chromium, server):
+    urls, links = _collect(server, total=25, max_ads=0)
+
+    assert creative_ids(urls) == [f"CR{n:03d}" for n in range(1, 26)]
+    assert links == 25
+    assert all(url.startswith(server.base_url) for url in urls)
+
+
+def test_collect_stops_at_max_ads(chromium, server):
+    urls, links = _collect(server, total=30, max_ads=5)
+
+    assert creative_ids(urls) == ["CR001", "CR002", "CR003", "CR004", "CR005"]
+    assert links == 10  # the first batch was enough, no scrolling
+
+
+def test_collect_skips_known_and_stops_after_a_screen_of_them(chromium, server):
+    known = {f"CR{n:03d}" for n in range(4, 31)}
+
+    urls, links = _collect(server, total=30, max_ads=0, known_ids=known)
+
+    assert creative_ids(urls) == ["CR001", "CR002", "CR003"]
+    assert links < 30  # stopped before reaching the end of the grid
+
+
+# ========================
+# PHASE 2: WORKER POOL
+# ========================
+
+def test_workers_drain_the_queue_concurrently(chromium, server, tmp_path):
+    server.creative_delay = 0.5
+    urls = [server.creative_url(f"CR{n:03d}") for n in range(1, 7)]
+
+    results = run_with_browser(lambda browser: run_workers(browser, urls, str(tmp_path), workers=3))
+
+    assert sorted(ad["creative_id"] for ad in results) == creative_ids(urls)
+    assert sorted(server.creative_hits) == creative_ids(urls)
+    assert server.peak_in_flight >= 2
+
+    with open(tmp_path / "CR001" / "metadata.json", encoding="utf-8") as f:
+        metadata = json.load(f)
+    assert metadata["headline"] == "Headline for CR001"
+    assert metadata["cta"] == "Learn more"
+
+
+def test_worker_keeps_going_when_the_page_cannot_be_replaced(chromium, server, tmp_path, monkeypatch):
+    urls = [server.creative_url(f"CR{n:03d}") for n in range(1, 4)]
+
+    # The first scrape crashes the page, then the next two attempts to open a
+    # replacement fail as well; the worker must give up on CR001 only
+    scrape_calls = []
+    original_scrape = engine.scrape_creative
+
+    async def crashing_scrape(*args, **kwargs):
+        scrape_calls.append(args[1])
+        if len(scrape_calls) == 1:
+            raise RuntimeError("page crashed")
+        return await original_scrape(*args, **kwargs)
+
+    page_calls = []
+    original_new_page = engine._new_page
+
+    async def failing_new_page(context, mode):
+        page_calls.append(mode)
+        if len(page_calls) in (2, 3):
+            raise RuntimeError("cannot open page")
+        return await original_new_page(context, mode)
+
+    monkeypatch.setattr(engine, "scrape_creative", crashing_scrape)
+    monkeypatch.setattr(engine, "_new_page", failing_new_page)
+
+    results = run_with_browser(lambda browser: run_workers(browser, urls, str(tmp_path), workers=1))
+
+    assert sorted(ad["creative_id"] for ad in results) == ["CR002", "CR003"]
+
+
+# ========================
+# NETWORK-INTERCEPTION MODE
+# ========================
+
+def _rpc_fixture():
+    with open(os.path.join(FIXTURES_DIR, "get_creative_by_id.txt"), encoding="utf-8") as f:
+        return engine.parse_rpc_body(f.read())
+
+
+def test_parse_creative_payloads_reads_fields_by_position():
+    fields = engine.parse_creative_payloads([_rpc_fixture()])
+
+    assert fields["text"] == {
+        "headline": "Fixture video headline",
+        "description": "First description line Second description line",
+        "cta": "Shop now",
+    }
+    assert fields["video_url"].startswith("https://video.example.test/videoplayback")
+
+
+def test_parse_creative_payloads_ignores_unrelated_strings():
+    # Advertiser name and ids are human-readable strings, but not ad text
+    unrelated = {"1": {"3": "Fixture Advertiser with spaces", "7": ["Some other label"]}}
+
+    assert engine.parse_creative_payloads([unrelated]) is None
+    assert engine.parse_creative_payloads([unrelated, _rpc_fixture()])["text"]["headline"] == "Fixture video headline"
+
+
+class _FakeResponse:
+    def __init__(self, url, body, delay):
+        self.url = url
+        self._body = body
+        self._delay = delay
+
+    async def text(self):
+        await asyncio.sleep(self._delay)
+        return self._body
+
+
+class _FakePage:
+    def on(self, event, handler):
+        self.handler = handler
+
+
+def test_response_capture_drops_reads_from_the_previous_creative():
+    async def main():
+        page = _FakePage()
+        capture = engine.ResponseCapture(page)
+        rpc_url = "https://adstransparency.google.com/anji/_/rpc/LookupService/GetCreativeById"
+
+        # A slow response for creative A is still being read when creative B starts
+        page.handler(_FakeResponse(rpc_url, '{"creative": "A"}', delay=0.05))
+        await capture.reset()
+        page.handler(_FakeResponse(rpc_url, '{"creative": "B"}', delay=0))
+        await capture.drain()
+        return capture.payloads
+
+    assert asyncio.run(main()) == [{"creative": "B"}]
+
+
+# ========================
+# INCREMENTAL RUNS
+# ========================
+
+def _scrape(server, total, incremental=True):
+    # scrape_advertiser launches its own browser
+    return asyncio.run(engine.scrape_advertiser(
+        server.advertiser_url(total), concurrency=2, max_ads=0,
+        capture_frames=False, mode="dom", incremental=incremental,
+    ))
+
+
+def _known_index(tmp_path):
+    with open(tmp_path / ADVERTISER_ID / KNOWN_IDS_INDEX, encoding="utf-8") as f:
+        return set(json.load(f))
+
+
+def test_incremental_run_only_scrapes_new_creatives(chromium, server, tmp_path):
+    first = _scrape(server, total=5)
+    assert sorted(ad["creative_id"] for ad in first) == [f"CR{n:03d}" for n in range(1, 6)]
+
+    server.creative_hits.clear()
+    second = _scrape(server, total=7)
+
+    assert sorted(ad["creative_id"] for ad in second) == ["CR006", "CR007"]
+    assert sorted(server.creative_hits) == ["CR006", "CR007"]
+    assert _known_index(tmp_path) == {f"CR{n:03d}" for n in range(1, 8)}
+
+
+def test_full_run_keeps_earlier_creatives_in_the_index(chromium, server, tmp_path):
+    _scrape(server, total=7)
+
+    server.creative_hits.clear()
+    full = _scrape(server, total=3, incremental=False)
+
+    assert sorted(ad["creative_id"] for ad in full) == ["CR001", "CR002", "CR003"]
+    assert sorted(server.creative_hits) == ["CR001", "CR002", "CR003"]
+    assert _known_index(tmp_path) == {f"CR{n:03d}" for n in range(1, 8)}